@@ -1,26 +1,128 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from app.models.test_models import (
+    BatchAnalysisItem,
+    BatchAnalysisRequest,
+    BatchAnalysisResponse,
+    BatchGenerationItem,
+    BatchValidationItem,
+    BatchValidationRequest,
+    BatchValidationResponse,
     CodeAnalysisRequest,
+    DeltaAnalysisRequest,
+    TestFileValidationRequest,
     TestValidationRequest,
+    TestAnalysisDeltaResponse,
     TestAnalysisResponse,
     TestValidationResponse,
     TestFramework,
+    ValidationIssue,
 )
 from app.services.test_analyzer import TestAnalyzer
 from app.services.test_generator import TestGenerator
-from app.services.test_validator import TestValidator
-from app.core.mcp_context import MCPContext
-from typing import Optional
+from app.services.test_validator import TestValidator, mean_score
+from app.services.project_analyzer import (
+    ProjectAnalyzer,
+    ProjectSource,
+    ProjectTooLargeError,
+    load_tarball,
+)
+from app.core.config import settings
+from app.core.mcp_context import MCPContext, mcp_context as shared_mcp_context
+from app.core.http_metrics import InstrumentedRoute
+from app.core.parsed_module import ParsedModule
+from app.core.project_index import ProjectIndex
+from app.core.responses import ModelJSONResponse
+from app.core.worker_pool import WorkerPoolBusyError, batch_worker_pool
+from typing import AsyncIterator, List, Optional
+import asyncio
+import functools
+import json
+import tarfile
 import uuid
 
-router = APIRouter()
-analyzer = TestAnalyzer()
-generator = TestGenerator()
-validator = TestValidator()
-mcp_context = MCPContext()
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Corpo dos endpoints ``/raw``: o código fonte sem envelope JSON
+RAW_SOURCE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "text/x-python": {"schema": {"type": "string"}},
+            "application/octet-stream": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+# Corpo de ``/project``: o projeto empacotado em um arquivo tar
+PROJECT_ARCHIVE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-tar": {"schema": {"type": "string", "format": "binary"}},
+            "application/gzip": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+router = APIRouter(
+    route_class=InstrumentedRoute, default_response_class=ModelJSONResponse
+)
+
+
+class EndpointServices:
+    """Serviços usados pelos endpoints, criados no primeiro uso.
+
+    Importar o módulo (e o ``main``) apenas registra as rotas: analisadores,
+    geradores e validadores só são construídos quando a primeira requisição
+    precisa deles, o que mantém curta a partida de workers efêmeros.
+    """
+
+    @functools.cached_property
+    def analyzer(self) -> TestAnalyzer:
+        return TestAnalyzer(mcp_context=shared_mcp_context)
+
+    @functools.cached_property
+    def generator(self) -> TestGenerator:
+        return TestGenerator()
+
+    @functools.cached_property
+    def validator(self) -> TestValidator:
+        return TestValidator(mcp_context=shared_mcp_context)
+
+    @functools.cached_property
+    def batch_analyzer(self) -> TestAnalyzer:
+        return TestAnalyzer(
+            worker_pool=batch_worker_pool, mcp_context=shared_mcp_context
+        )
+
+    @functools.cached_property
+    def batch_validator(self) -> TestValidator:
+        return TestValidator(
+            worker_pool=batch_worker_pool, mcp_context=shared_mcp_context
+        )
+
+    @functools.cached_property
+    def batch_generator(self) -> TestGenerator:
+        return TestGenerator(worker_pool=batch_worker_pool)
+
+    @functools.cached_property
+    def project_analyzer(self) -> ProjectAnalyzer:
+        return ProjectAnalyzer()
+
+
+services = EndpointServices()
+
+
+def get_mcp_context() -> MCPContext:
+    """Retorna o contexto MCP compartilhado pela aplicação."""
+    return shared_mcp_context
 
 
-async def get_session_id(session_id: Optional[str] = None) -> str:
+async def get_session_id(
+    session_id: Optional[str] = None,
+    mcp_context: MCPContext = Depends(get_mcp_context),
+) -> str:
     """Obtém ou cria um ID de sessão."""
     if not session_id:
         session_id = str(uuid.uuid4())
@@ -28,59 +130,371 @@ async def get_session_id(session_id: Optional[str] = None) -> str:
     return session_id
 
 
+async def read_raw_source(request: Request) -> str:
+    """Lê o código enviado como corpo bruto (``text/x-python``).
+
+    O corpo pode vir com ``Content-Encoding: gzip``; a descompactação e o
+    limite de tamanho ficam a cargo do ``RequestBodyMiddleware``.
+    """
+    body = await request.body()
+    if len(body) > settings.MAX_CODE_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Código maior que {settings.MAX_CODE_SIZE} bytes",
+        )
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="O código deve estar em UTF-8")
+
+
 @router.post("/analyze", response_model=TestAnalysisResponse)
 async def analyze_code(
-    request: CodeAnalysisRequest, session_id: str = Depends(get_session_id)
+    request: CodeAnalysisRequest,
+    session_id: str = Depends(get_session_id),
+    mcp_context: MCPContext = Depends(get_mcp_context),
 ):
     """
     Analisa o código fonte e sugere casos de teste.
     """
     try:
-        test_suite = await analyzer.analyze_code(request.code, request.framework)
+        return ModelJSONResponse(
+            await _analyze_request(request, services.analyzer, mcp_context, session_id)
+        )
+    except WorkerPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/analyze/raw", response_model=TestAnalysisResponse, openapi_extra=RAW_SOURCE_BODY
+)
+async def analyze_raw(
+    framework: TestFramework = TestFramework.PYTEST,
+    file_path: Optional[str] = None,
+    code: str = Depends(read_raw_source),
+    session_id: str = Depends(get_session_id),
+    mcp_context: MCPContext = Depends(get_mcp_context),
+):
+    """
+    Analisa o código enviado como corpo bruto, sem o escape do JSON.
+    """
+    request = CodeAnalysisRequest.model_construct(
+        code=code, framework=framework, file_path=file_path
+    )
+    return await analyze_code(request, session_id, mcp_context)
+
+
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(
+    request: BatchAnalysisRequest,
+    session_id: str = Depends(get_session_id),
+    mcp_context: MCPContext = Depends(get_mcp_context),
+):
+    """
+    Analisa vários arquivos em paralelo, reportando erros por arquivo.
+    """
+    _check_batch_size(request.items, settings.BATCH_MAX_ITEMS)
+
+    # Mantém o pool ocupado sem enfileirar o lote inteiro de uma vez
+    semaphore = asyncio.Semaphore(batch_worker_pool.max_workers)
+
+    async def analyze_item(index: int, item: CodeAnalysisRequest):
+        async with semaphore:
+            try:
+                result = await _analyze_request(
+                    item, services.batch_analyzer, mcp_context, session_id
+                )
+            except Exception as e:
+                return BatchAnalysisItem(
+                    index=index, file_path=item.file_path, error=str(e)
+                )
+        return BatchAnalysisItem(index=index, file_path=item.file_path, result=result)
 
-        # Armazena o contexto da análise
-        for test_case in test_suite.test_cases:
-            await mcp_context.learn_from_success(test_case)
+    results = await asyncio.gather(
+        *(analyze_item(index, item) for index, item in enumerate(request.items))
+    )
+    failed = sum(1 for item in results if item.error is not None)
+    return ModelJSONResponse(
+        BatchAnalysisResponse(
+            results=results, succeeded=len(results) - failed, failed=failed
+        )
+    )
+
+
+def _check_batch_size(items: List, max_items: int) -> None:
+    """Rejeita lotes acima do limite configurado."""
+    if len(items) > max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo de {max_items} arquivos por lote",
+        )
+
+
+async def _analyze_request(
+    request: CodeAnalysisRequest,
+    test_analyzer: TestAnalyzer,
+    mcp_context: MCPContext,
+    session_id: str,
+) -> TestAnalysisResponse:
+    """Analisa um arquivo e monta a resposta com as sugestões do MCP."""
+    module = ParsedModule.from_source(request.code, lazy=True)
+    analysis = await test_analyzer.analyze(module, request.framework)
+
+    # Armazena o contexto da análise
+    await mcp_context.learn_from_test_cases(session_id, analysis.test_suite.test_cases)
+
+    return TestAnalysisResponse(
+        test_suite=analysis.test_suite.to_model(),
+        coverage_estimate=analysis.coverage_estimate,
+        suggestions=await mcp_context.get_test_suggestions(session_id, module),
+        complexity_score=analysis.complexity_score,
+        function_metrics=analysis.function_metrics,
+        digest=module.digest,
+    )
+
+
+@router.post("/analyze/delta", response_model=TestAnalysisDeltaResponse)
+async def analyze_delta(
+    request: DeltaAnalysisRequest,
+    session_id: str = Depends(get_session_id),
+    mcp_context: MCPContext = Depends(get_mcp_context),
+):
+    """
+    Reanalisa um arquivo editado, retornando só os casos de teste que mudaram.
+
+    ``base_digest`` é o ``digest`` retornado pela análise anterior. Se essa
+    análise não estiver mais disponível, a diferença vem com ``full=true`` e
+    todos os casos em ``added``.
+    """
+    try:
+        module = ParsedModule.from_source(request.code, lazy=True)
+        analysis, delta = await services.analyzer.analyze_delta(
+            module, request.framework, request.base_digest
+        )
 
-        return TestAnalysisResponse(
-            test_suite=test_suite,
-            coverage_estimate=0.8,  # Valor exemplo, deve ser calculado
-            suggestions=await mcp_context.get_test_suggestions(request.code),
-            complexity_score=1.0,  # Valor exemplo, deve ser calculado
+        await mcp_context.learn_from_test_cases(
+            session_id, analysis.test_suite.test_cases
         )
+
+        return ModelJSONResponse(
+            TestAnalysisDeltaResponse(
+                digest=module.digest,
+                base_digest=request.base_digest,
+                delta=delta,
+                coverage_estimate=analysis.coverage_estimate,
+                suggestions=await mcp_context.get_test_suggestions(session_id, module),
+                complexity_score=analysis.complexity_score,
+                function_metrics=analysis.function_metrics,
+            )
+        )
+    except WorkerPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/generate")
 async def generate_tests(
-    request: CodeAnalysisRequest, session_id: str = Depends(get_session_id)
+    request: CodeAnalysisRequest,
+    stream: bool = False,
+    session_id: str = Depends(get_session_id),
 ):
     """
     Gera uma suite de testes completa para o código fornecido.
+
+    Com ``stream=true`` a resposta é NDJSON: uma linha ``{"test_code": ...}``
+    por parte renderizada (cabeçalho, cada caso de teste e rodapé) e uma
+    linha final com o ``session_id``.
     """
     try:
-        test_code = await generator.generate_test_suite(request.code, request.framework)
-        return {"test_code": test_code, "session_id": session_id}
+        if stream:
+            parts = services.generator.iter_test_suite(request.code, request.framework)
+            # A primeira parte é aguardada aqui para que erros virem 400/503
+            try:
+                first_part = await parts.__anext__()
+            except StopAsyncIteration:
+                first_part = None
+            return StreamingResponse(
+                _stream_generated_parts(first_part, parts, session_id),
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+
+        test_code = await services.generator.generate_test_suite(
+            request.code, request.framework
+        )
+        return ModelJSONResponse({"test_code": test_code, "session_id": session_id})
+    except WorkerPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/generate/raw", openapi_extra=RAW_SOURCE_BODY)
+async def generate_raw(
+    framework: TestFramework = TestFramework.PYTEST,
+    stream: bool = False,
+    code: str = Depends(read_raw_source),
+    session_id: str = Depends(get_session_id),
+):
+    """
+    Gera a suite de testes para o código enviado como corpo bruto.
+    """
+    request = CodeAnalysisRequest.model_construct(code=code, framework=framework)
+    return await generate_tests(request, stream, session_id)
+
+
+@router.post("/generate/batch")
+async def generate_batch(
+    request: BatchAnalysisRequest, session_id: str = Depends(get_session_id)
+):
+    """
+    Gera testes para vários arquivos, em NDJSON.
+
+    Cada linha é um ``BatchGenerationItem`` emitido assim que o arquivo
+    fica pronto (fora da ordem da requisição; use ``index``).
+    """
+    _check_batch_size(request.items, settings.BATCH_MAX_ITEMS)
+    return StreamingResponse(
+        _stream_batch_generation(request.items), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.post("/project", openapi_extra=PROJECT_ARCHIVE_BODY)
+async def generate_project(
+    request: Request, framework: TestFramework = TestFramework.PYTEST
+):
+    """
+    Gera testes para todos os módulos de um projeto enviado como tar, em NDJSON.
+
+    Um índice de símbolos de todo o projeto define os imports de cada suite
+    e as fixtures que substituem por mocks as classes e funções de outros
+    módulos. Cada linha é um ``ProjectGenerationItem``, emitido assim que
+    o módulo fica pronto.
+    """
+    try:
+        # A descompactação do arquivo não bloqueia o event loop
+        sources = await asyncio.to_thread(
+            load_tarball,
+            await request.body(),
+            settings.PROJECT_MAX_MODULES,
+            settings.PROJECT_MAX_BYTES,
+        )
+    except ProjectTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (tarfile.TarError, EOFError, OSError):
+        raise HTTPException(status_code=400, detail="Arquivo tar inválido")
+    try:
+        index = await services.project_analyzer.build_index(sources)
+    except WorkerPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        _stream_project_generation(sources, framework, index),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+async def _stream_project_generation(
+    sources: List[ProjectSource], framework: TestFramework, index: ProjectIndex
+) -> AsyncIterator[str]:
+    """Serializa os módulos gerados do projeto como linhas NDJSON."""
+    async for item in services.project_analyzer.iter_generate(
+        sources, framework, index
+    ):
+        yield item.model_dump_json() + "\n"
+
+
+async def _stream_generated_parts(
+    first_part: Optional[str], parts: AsyncIterator[str], session_id: str
+) -> AsyncIterator[str]:
+    """Serializa as partes da suite gerada como linhas NDJSON.
+
+    ``first_part`` é ``None`` quando o gerador não produziu nenhuma parte;
+    nesse caso a resposta traz apenas a linha do ``session_id``.
+    """
+    if first_part is not None:
+        yield json.dumps({"test_code": first_part}) + "\n"
+    try:
+        async for part in parts:
+            yield json.dumps({"test_code": part}) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+        return
+    yield json.dumps({"session_id": session_id}) + "\n"
+
+
+async def _stream_batch_generation(
+    items: List[CodeAnalysisRequest],
+) -> AsyncIterator[str]:
+    """Gera os arquivos com concorrência limitada, emitindo cada um ao terminar.
+
+    A fila limitada faz com que um cliente lento segure os workers em vez de
+    acumular resultados em memória. Um erro inesperado em um worker encerra
+    a resposta com esse erro em vez de deixá-la esperando para sempre.
+    """
+    concurrency = batch_worker_pool.max_workers
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    pending_items = iter(enumerate(items))
+    stopped = asyncio.Event()
+
+    async def worker() -> None:
+        try:
+            for index, item in pending_items:
+                try:
+                    test_code = await services.batch_generator.generate_test_suite(
+                        item.code, item.framework
+                    )
+                    result = BatchGenerationItem(
+                        index=index, file_path=item.file_path, test_code=test_code
+                    )
+                except Exception as e:
+                    result = BatchGenerationItem(
+                        index=index, file_path=item.file_path, error=str(e)
+                    )
+                await queue.put(result.model_dump_json() + "\n")
+        finally:
+            # Sem consumidor (resposta encerrada) ninguém esvazia a fila
+            if not stopped.is_set():
+                await queue.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        finished = 0
+        while finished < len(workers):
+            line = await queue.get()
+            if line is None:
+                finished += 1
+            else:
+                yield line
+        # Propaga o erro de um worker que terminou antes da hora
+        await asyncio.gather(*workers)
+    finally:
+        stopped.set()
+        for task in workers:
+            task.cancel()
+
+
 @router.post("/validate", response_model=TestValidationResponse)
 async def validate_test(
-    request: TestValidationRequest, session_id: str = Depends(get_session_id)
+    request: TestValidationRequest,
+    session_id: str = Depends(get_session_id),
+    mcp_context: MCPContext = Depends(get_mcp_context),
 ):
     """
     Valida um teste unitário e fornece sugestões de melhoria.
     """
     try:
-        validation_response = await validator.validate_test(
-            request.test_code, request.source_code
+        test_module = ParsedModule.from_source(request.test_code, lazy=True)
+        validation_response = await services.validator.validate_test(
+            test_module, request.source_code, session_id
         )
 
         # Adiciona sugestões do MCP
         if validation_response.is_valid:
-            suggestions = await mcp_context.get_test_suggestions(request.test_code)
+            suggestions = await mcp_context.get_test_suggestions(
+                session_id, test_module
+            )
             if suggestions:
                 validation_response.issues.extend(
                     [
@@ -94,11 +508,78 @@ async def validate_test(
                     ]
                 )
 
-        return validation_response
+        return ModelJSONResponse(validation_response)
+    except WorkerPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post(
+    "/validate/raw",
+    response_model=TestValidationResponse,
+    openapi_extra=RAW_SOURCE_BODY,
+)
+async def validate_raw(
+    framework: TestFramework = TestFramework.PYTEST,
+    test_code: str = Depends(read_raw_source),
+    session_id: str = Depends(get_session_id),
+    mcp_context: MCPContext = Depends(get_mcp_context),
+):
+    """
+    Valida o teste enviado como corpo bruto.
+    """
+    request = TestValidationRequest.model_construct(
+        test_code=test_code, source_code=None, framework=framework
+    )
+    return await validate_test(request, session_id, mcp_context)
+
+
+@router.post("/validate/batch", response_model=BatchValidationResponse)
+async def validate_batch(request: BatchValidationRequest):
+    """
+    Valida todas as funções de teste de vários arquivos em paralelo.
+
+    Cada arquivo traz o resultado de cada ``test_*`` e a média das suas
+    pontuações de isolamento e manutenibilidade; as pontuações do lote são
+    a média de todos os testes validados.
+    """
+    _check_batch_size(request.items, settings.VALIDATION_BATCH_MAX_ITEMS)
+
+    semaphore = asyncio.Semaphore(batch_worker_pool.max_workers)
+
+    async def validate_item(index: int, item: TestFileValidationRequest):
+        async with semaphore:
+            try:
+                result = await services.batch_validator.validate_test_file(
+                    item.test_code
+                )
+            except Exception as e:
+                return BatchValidationItem(
+                    index=index, file_path=item.file_path, error=str(e)
+                )
+        return BatchValidationItem(index=index, file_path=item.file_path, result=result)
+
+    results = await asyncio.gather(
+        *(validate_item(index, item) for index, item in enumerate(request.items))
+    )
+    tests = [test for item in results if item.result for test in item.result.tests]
+    failed = sum(1 for item in results if item.error is not None)
+    return ModelJSONResponse(
+        BatchValidationResponse(
+            results=results,
+            succeeded=len(results) - failed,
+            failed=failed,
+            test_count=len(tests),
+            invalid_tests=sum(1 for test in tests if not test.is_valid),
+            isolation_score=mean_score(test.isolation_score for test in tests),
+            maintainability_score=mean_score(
+                test.maintainability_score for test in tests
+            ),
+        )
+    )
+
+
 @router.get("/frameworks")
 async def list_frameworks():
     """
@@ -159,13 +640,23 @@ class TestExample(unittest.TestCase):
 
 
 @router.get("/context/{session_id}/suggestions")
-async def get_context_suggestions(session_id: str):
+async def get_context_suggestions(
+    session_id: str, mcp_context: MCPContext = Depends(get_mcp_context)
+):
     """
     Obtém sugestões do contexto MCP para uma sessão específica.
     """
     try:
-        await mcp_context.create_session(session_id)
-        suggestions = await mcp_context.get_test_suggestions("")
+        await mcp_context.open_session(session_id)
+        suggestions = await mcp_context.get_test_suggestions(session_id, "")
         return {"suggestions": suggestions}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/context/stats")
+async def get_context_stats(mcp_context: MCPContext = Depends(get_mcp_context)):
+    """
+    Retorna métricas de ocupação das sessões MCP.
+    """
+    return mcp_context.test_context.stats()
@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.models.test_models import TestFramework
+
+
+class AnalysisCacheEntry:
+    """Resultados armazenados para um par (código, framework)."""
+
+    __slots__ = (
+        "analysis",
+        "rendered",
+        "analysis_size",
+        "rendered_size",
+        "expires_at",
+    )
+
+    def __init__(self, expires_at: float):
+        self.analysis: Any = None
+        self.rendered: Optional[str] = None
+        # Tamanho aproximado, em bytes, de cada valor guardado
+        self.analysis_size = 0
+        self.rendered_size = 0
+        self.expires_at = expires_at
+
+
+class AnalysisCache:
+    """Cache LRU com TTL endereçado pelo hash do código fonte.
+
+    Guarda o resultado do analisador (a ``TestSuite`` com métricas e perfis
+    de função usados nas sugestões MCP) e o código renderizado pelo motor de
+    templates, evitando parse e geração para código repetido. Resultados
+    independentes do framework são armazenados com ``framework=None``.
+
+    Além do número de entradas, ``max_bytes`` limita a soma dos tamanhos
+    aproximados dos valores (o texto renderizado e o tamanho informado em
+    ``store_analysis``); valores maiores que o limite não são guardados.
+    ``max_bytes=0`` deixa apenas o limite de entradas.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], AnalysisCacheEntry]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get_analysis(
+        self, digest: Optional[str], framework: Optional[TestFramework]
+    ) -> Any:
+        """Retorna o resultado de análise armazenado ou ``None``."""
+        return self._get(digest, framework, "analysis")
+
+    def get_rendered(
+        self, digest: Optional[str], framework: Optional[TestFramework]
+    ) -> Optional[str]:
+        """Retorna o código de teste renderizado ou ``None``."""
+        return self._get(digest, framework, "rendered")
+
+    def store_analysis(
+        self,
+        digest: Optional[str],
+        framework: Optional[TestFramework],
+        analysis: Any,
+        size: int = 0,
+    ) -> None:
+        """Armazena o resultado de análise do código.
+
+        ``size`` é o tamanho aproximado do resultado em bytes, contado no
+        limite ``max_bytes``.
+        """
+        self._store(digest, framework, "analysis", analysis, size)
+
+    def store_rendered(
+        self, digest: Optional[str], framework: Optional[TestFramework], rendered: str
+    ) -> None:
+        """Armazena o código de teste renderizado para o código."""
+        self._store(digest, framework, "rendered", rendered, len(rendered))
+
+    def clear(self) -> None:
+        """Remove todas as entradas e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna os contadores do cache."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _key(self, digest: str, framework: Optional[TestFramework]) -> Tuple[str, str]:
+        # Resultados que não dependem do framework usam a chave vazia
+        if framework is None:
+            return digest, ""
+        return digest, TestFramework(framework).value
+
+    def _get(
+        self, digest: Optional[str], framework: Optional[TestFramework], field: str
+    ) -> Any:
+        if not self.enabled or digest is None:
+            return None
+
+        key = self._key(digest, framework)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                entry = None
+            value = getattr(entry, field) if entry is not None else None
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _store(
+        self,
+        digest: Optional[str],
+        framework: Optional[TestFramework],
+        field: str,
+        value: Any,
+        size: int,
+    ) -> None:
+        if not self.enabled or digest is None:
+            return
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        key = self._key(digest, framework)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                entry = AnalysisCacheEntry(expires_at=now + self.ttl_seconds)
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            setattr(entry, field, value)
+            self.bytes += size - getattr(entry, f"{field}_size")
+            setattr(entry, f"{field}_size", size)
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self.bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.analysis_size + entry.rendered_size
+
+
+analysis_cache = AnalysisCache(
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    max_bytes=settings.ANALYSIS_CACHE_MAX_BYTES,
+)
+
+# Testes gerados por definição, endereçados pelo hash de cada classe/função
+definition_cache = AnalysisCache(
+    max_entries=settings.DEFINITION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    max_bytes=settings.DEFINITION_CACHE_MAX_BYTES,
+)
@@ -22,8 +22,66 @@ class Settings(BaseSettings):
     # Configurações de teste
     TEST_FRAMEWORKS: list[str] = ["pytest", "unittest"]
     MAX_CODE_SIZE: int = 1000000  # 1MB
+    # Limites do corpo das requisições, verificados antes do parse do JSON
+    MAX_REQUEST_SIZE: int = 2 * 1024 * 1024  # folga para o escape do JSON
+    MAX_BATCH_REQUEST_SIZE: int = 64 * 1024 * 1024
     DEFAULT_TEST_TEMPLATE: str = "pytest"
 
+    # Configurações do cache de análise
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 512  # 0 desativa o cache
+    ANALYSIS_CACHE_TTL_SECONDS: float = 3600.0
+    DEFINITION_CACHE_MAX_ENTRIES: int = 4096  # testes por classe/função
+    # Tamanho aproximado total dos valores guardados; 0 limita só as entradas
+    ANALYSIS_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    DEFINITION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Suites geradas com stream=true maiores que isso não vão para o cache
+    STREAM_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+
+    # Configurações do pool de workers
+    WORKER_POOL_MODE: str = "thread"  # thread, process ou inline
+    WORKER_POOL_SIZE: int = 0  # 0 usa o número de CPUs
+    WORKER_POOL_MAX_PENDING: int = 64
+
+    # Configurações das sessões MCP
+    SESSION_MAX_COUNT: int = 1000
+    SESSION_IDLE_TTL_SECONDS: float = 1800.0
+
+    # Configurações da memória MCP
+    MCP_MEMORY_BACKEND: str = "memory"  # memory ou sqlite
+    MCP_MEMORY_PATH: str = "mcp_memory.db"
+    MCP_MEMORY_BATCH_SIZE: int = 64
+    MCP_MEMORY_FLUSH_INTERVAL_SECONDS: float = 1.0
+    MCP_MEMORY_SYNC_INTERVAL_SECONDS: float = 1.0
+    MCP_CONTEXT_LOCK_SHARDS: int = 64
+
+    # Configurações das métricas (/metrics)
+    METRICS_ENABLED: bool = False  # latência por etapa e por requisição
+
+    # Configurações do profiling por requisição
+    PROFILING_ENABLED: bool = False
+    PROFILING_ALLOWED_CLIENTS: list[str] = ["127.0.0.1", "::1"]
+    PROFILING_SAMPLE_RATE: int = 0  # perfila 1 a cada N requisições; 0 desativa
+    PROFILING_OUTPUT_DIR: str = "profiles"
+    PROFILING_TOP_FUNCTIONS: int = 20
+    PROFILING_MAX_PROFILES: int = 100  # perfis mantidos em disco; 0 sem limite
+
+    # Configurações da análise em lote
+    BATCH_WORKER_POOL_MODE: str = "process"
+    BATCH_WORKER_POOL_SIZE: int = 0  # 0 usa o número de CPUs
+    BATCH_WORKER_POOL_MAX_PENDING: int = 256
+    BATCH_MAX_ITEMS: int = 1000
+    VALIDATION_BATCH_MAX_ITEMS: int = 10000  # arquivos de teste por lote
+
+    # Configurações do modo projeto (vários módulos com índice de símbolos)
+    PROJECT_INDEX_PATH: str = "project_index.db"  # vazio mantém só em memória
+    PROJECT_MAX_MODULES: int = 20000
+    PROJECT_MAX_BYTES: int = 256 * 1024 * 1024  # tar descompactado
+    PROJECT_INDEX_MAX_MODULES: int = 100000  # versões guardadas no índice
+
+    # Configurações do modo de observação (watch.py)
+    WATCH_POLL_INTERVAL_SECONDS: float = 0.25
+    WATCH_DEBOUNCE_SECONDS: float = 0.2  # espera sem alterações antes de gerar
+
     class Config:
         case_sensitive = True
 
@@ -0,0 +1,94 @@
+import asyncio
+import contextvars
+import functools
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+
+from app.core.metrics import MetricsRegistry, metrics
+
+# Estado da requisição HTTP em andamento, preenchido pela rota instrumentada
+_request_state: contextvars.ContextVar[
+    Optional[Dict[str, Any]]
+] = contextvars.ContextVar("request_metrics_state", default=None)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede a duração de cada requisição HTTP.
+
+    Para rotas registradas com ``InstrumentedRoute`` também mede a etapa
+    ``serialize``: o tempo entre o retorno do endpoint e o início da
+    resposta (validação do ``response_model`` e serialização JSON). Rotas
+    que retornam a própria ``Response`` serializam dentro do endpoint.
+    """
+
+    def __init__(self, app: Callable, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        state: Dict[str, Any] = {}
+        token = _request_state.set(state)
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message: Dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                endpoint_end = state.get("endpoint_end")
+                if endpoint_end is not None:
+                    self.registry.stage_duration.observe(
+                        ("http", "serialize"), time.perf_counter() - endpoint_end
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_state.reset(token)
+            route = state.get("route")
+            if route is None:
+                endpoint = scope.get("endpoint")
+                route = endpoint.__name__ if endpoint is not None else "unmatched"
+            self.registry.request_duration.observe(
+                (scope["method"], route, status), time.perf_counter() - start
+            )
+
+
+class InstrumentedRoute(APIRoute):
+    """Rota que informa ao ``MetricsMiddleware`` o seu caminho e o fim do endpoint.
+
+    O caminho da rota (``/api/v1/tests/analyze``) é usado como rótulo no
+    lugar do caminho da requisição, mantendo a cardinalidade limitada. Com
+    as métricas desativadas o endpoint é registrado sem alterações.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        if metrics.enabled and asyncio.iscoroutinefunction(endpoint):
+            endpoint = _instrument_endpoint(path, endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _instrument_endpoint(path: str, endpoint: Callable) -> Callable:
+    # ``include_router`` recria a rota com o prefixo; o endpoint original é
+    # envolvido uma única vez, com o caminho completo
+    endpoint = getattr(endpoint, "__instrumented__", endpoint)
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        state = _request_state.get()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            if state is not None:
+                state["route"] = path
+                state["endpoint_end"] = time.perf_counter()
+
+    wrapper.__instrumented__ = endpoint
+    return wrapper
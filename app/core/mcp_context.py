@@ -1,53 +1,278 @@
-from typing import Dict, List, Optional
-from pydantic import BaseModel
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 import ast
-from app.models.test_models import TestCase, TestSuite, ValidationIssue
+import asyncio
+import bisect
+import heapq
+import threading
+import time
+import uuid
+from app.models.test_models import ValidationIssue
+from app.models.test_data import IssueData, TestCaseData
+from app.core.config import settings
+from app.core.memory_backend import MemoryBackend, memory_backend as default_backend
+from app.core.metrics import metrics
+from app.core.parsed_module import CodeFeatures, ParsedModule, as_parsed_module
+from app.core.session_store import SessionStore
+
+T = TypeVar("T")
 
 
 class MCPContext:
-    """Gerenciador de contexto MCP para testes."""
+    """Gerenciador de contexto MCP para testes.
 
-    def __init__(self):
-        self.test_context: Dict[str, TestContext] = {}
-        self.memory_store: Dict[str, MemoryItem] = {}
-        self.current_session: Optional[str] = None
+    Uma única instância é compartilhada pela aplicação (``mcp_context``) e
+    cada chamada informa explicitamente a sessão a que pertence. O estado de
+    cada sessão é protegido por um lock escolhido pelo hash do ID da sessão
+    entre ``lock_shards`` locks, de modo que sessões distintas raramente
+    disputam o mesmo lock.
+
+    Com um ``MemoryBackend`` persistente, o que é aprendido em cada sessão é
+    gravado no backend e relido pelos demais processos (e após reinícios) a
+    cada ``sync_interval`` segundos, no máximo; essas operações rodam em
+    threads, fora do event loop. Sessões criadas para requisições sem
+    ``session_id`` só são gravadas se o cliente voltar a usá-las.
+    """
+
+    def __init__(
+        self,
+        session_store: Optional[SessionStore] = None,
+        memory_backend: Optional[MemoryBackend] = None,
+        sync_interval: Optional[float] = None,
+        lock_shards: Optional[int] = None,
+    ):
+        self.test_context = (
+            session_store
+            if session_store is not None
+            else SessionStore(
+                max_sessions=settings.SESSION_MAX_COUNT,
+                idle_ttl_seconds=settings.SESSION_IDLE_TTL_SECONDS,
+            )
+        )
+        self.memory_backend = (
+            memory_backend if memory_backend is not None else default_backend
+        )
+        self.sync_interval = (
+            sync_interval
+            if sync_interval is not None
+            else settings.MCP_MEMORY_SYNC_INTERVAL_SECONDS
+        )
+        self._locks = [
+            threading.Lock()
+            for _ in range(lock_shards or settings.MCP_CONTEXT_LOCK_SHARDS)
+        ]
+        # Identifica os eventos gravados por este contexto no backend
+        self.writer_id = uuid.uuid4().hex
 
     async def create_session(self, session_id: str) -> None:
-        """Cria uma nova sessão de teste."""
-        self.test_context[session_id] = TestContext()
-        self.current_session = session_id
+        """Cria uma sessão para uma requisição sem ``session_id``.
+
+        A sessão só é gravada no backend se o cliente voltar a usá-la
+        (``open_session``); até lá nada do que ela aprende é persistido.
+        """
+        with self._session_lock(session_id):
+            self._create_context(session_id, persisted=False)
+
+    async def open_session(self, session_id: str) -> None:
+        """Reabre a sessão informada, criando-a apenas se não existir."""
+        await self._run_locked(session_id, self._open_context, session_id)
 
     async def store_test_result(
-        self, test_case: TestCase, result: bool, issues: List[ValidationIssue]
+        self,
+        session_id: Optional[str],
+        test_case: TestCaseData,
+        result: bool,
+        issues: List[ValidationIssue],
     ) -> None:
-        """Armazena o resultado de um teste na memória."""
-        if not self.current_session:
+        """Armazena o resultado de um teste na memória da sessão."""
+        if not session_id:
             return
 
-        context = self.test_context[self.current_session]
         memory_item = MemoryItem(
             test_case=test_case,
             success=result,
-            issues=issues,
+            issues=[IssueData.from_issue(issue) for issue in issues],
             improvements=self._generate_improvements(issues),
         )
-        context.add_memory(test_case.name, memory_item)
+        with metrics.stage("mcp", "store_result"):
+            await self._run_locked(
+                session_id, self._store_memory, session_id, test_case.name, memory_item
+            )
 
-    async def get_test_suggestions(self, code: str) -> List[str]:
-        """Gera sugestões de teste baseadas no histórico."""
-        if not self.current_session:
+    async def get_test_suggestions(
+        self, session_id: Optional[str], code: Union[str, ParsedModule]
+    ) -> List[str]:
+        """Gera sugestões de teste baseadas no histórico da sessão."""
+        if not session_id:
             return []
 
-        context = self.test_context[self.current_session]
-        return context.generate_suggestions(code)
+        with metrics.stage("mcp", "suggestions"):
+            return await self._run_locked(
+                session_id, self._generate_suggestions, session_id, code
+            )
 
-    async def learn_from_success(self, test_case: TestCase) -> None:
+    async def learn_from_success(
+        self, session_id: Optional[str], test_case: TestCaseData
+    ) -> None:
         """Aprende com testes bem-sucedidos."""
-        if not self.current_session:
+        await self.learn_from_test_cases(session_id, [test_case])
+
+    async def learn_from_test_cases(
+        self, session_id: Optional[str], test_cases: List[TestCaseData]
+    ) -> None:
+        """Aprende com vários testes bem-sucedidos, consultando a sessão uma vez."""
+        if not session_id:
+            return
+
+        with metrics.stage("mcp", "learn"):
+            await self._run_locked(
+                session_id, self._learn_patterns, session_id, test_cases
+            )
+
+    def flush(self) -> None:
+        """Grava no backend os eventos ainda pendentes."""
+        self.memory_backend.flush()
+
+    def _session_lock(self, session_id: str) -> threading.Lock:
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    async def _run_locked(
+        self, session_id: str, func: Callable[..., T], *args: Any
+    ) -> T:
+        """Executa ``func(*args)`` com o lock da sessão.
+
+        Com um backend persistente a leitura e a gravação de eventos fazem
+        I/O, por isso a execução vai para uma thread, fora do event loop.
+        """
+        if not self.memory_backend.persistent:
+            with self._session_lock(session_id):
+                return func(*args)
+        return await asyncio.to_thread(self._call_locked, session_id, func, *args)
+
+    def _call_locked(self, session_id: str, func: Callable[..., T], *args: Any) -> T:
+        with self._session_lock(session_id):
+            return func(*args)
+
+    def _open_context(self, session_id: str) -> None:
+        context = self._get_context(session_id)
+        if context is None:
+            self._create_context(session_id, persisted=True)
+        elif not context.persisted:
+            # O cliente voltou a uma sessão criada pelo servidor: grava o que
+            # ela aprendeu até aqui
+            context.persisted = True
+            for pattern in context.patterns:
+                self._record(session_id, context, "pattern", pattern.to_dict())
+            for test_name, memory_item in context.memories.items():
+                self._record_memory(session_id, context, test_name, memory_item)
+
+    def _store_memory(
+        self, session_id: str, test_name: str, memory_item: "MemoryItem"
+    ) -> None:
+        context = self._get_context(session_id)
+        if context is None:
             return
+        context.add_memory(test_name, memory_item)
+        self._record_memory(session_id, context, test_name, memory_item)
+
+    def _generate_suggestions(
+        self, session_id: str, code: Union[str, ParsedModule]
+    ) -> List[str]:
+        context = self._get_context(session_id)
+        if context is None:
+            return []
+        return context.generate_suggestions(code)
 
-        context = self.test_context[self.current_session]
-        context.learn_pattern(test_case)
+    def _learn_patterns(self, session_id: str, test_cases: List[TestCaseData]) -> None:
+        context = self._get_context(session_id)
+        if context is None:
+            return
+        for test_case in test_cases:
+            pattern = context.learn_pattern(test_case)
+            # Só padrões novos são gravados; ``occurrences`` é local
+            if pattern.occurrences == 1:
+                self._record(session_id, context, "pattern", pattern.to_dict())
+
+    def _create_context(self, session_id: str, persisted: bool) -> "TestContext":
+        # Nenhum evento é gravado: a sessão passa a existir no backend com o
+        # primeiro padrão ou resultado aprendido
+        context = TestContext()
+        context.persisted = persisted
+        self.test_context.set(session_id, context)
+        return context
+
+    def _get_context(self, session_id: str) -> Optional["TestContext"]:
+        """Retorna o contexto da sessão, restaurando-o do backend se preciso.
+
+        Deve ser chamado com o lock da sessão.
+        """
+        context = self.test_context.get(session_id)
+        if not self.memory_backend.persistent:
+            return context
+
+        if context is None:
+            # Sessão criada por outro processo, expirada ou anterior a um
+            # reinício: reconstruída com todos os eventos, inclusive os deste
+            # contexto, que não estão mais em memória
+            context = TestContext()
+            self._sync(session_id, context, writer="")
+            if not context.cursor:
+                return None
+            self.test_context.set(session_id, context)
+        elif time.monotonic() - context.synced_at >= self.sync_interval:
+            self._sync(session_id, context)
+        return context
+
+    def _sync(
+        self, session_id: str, context: "TestContext", writer: Optional[str] = None
+    ) -> None:
+        """Aplica ao contexto os eventos gravados por outros processos.
+
+        Eventos do ``writer`` informado (por padrão, este contexto) são
+        omitidos; ``writer`` vazio aplica todos.
+        """
+        context.cursor, events = self.memory_backend.load(
+            session_id,
+            context.cursor,
+            self.writer_id if writer is None else writer,
+        )
+        context.synced_at = time.monotonic()
+        for kind, payload in events:
+            context.apply_event(kind, payload)
+
+    def _record(
+        self,
+        session_id: str,
+        context: "TestContext",
+        kind: str,
+        payload: Dict[str, Any],
+    ) -> None:
+        if self.memory_backend.persistent and context.persisted:
+            self.memory_backend.append(session_id, self.writer_id, kind, payload)
+
+    def _record_memory(
+        self,
+        session_id: str,
+        context: "TestContext",
+        test_name: str,
+        memory_item: "MemoryItem",
+    ) -> None:
+        self._record(
+            session_id,
+            context,
+            "memory",
+            {"test_name": test_name, "item": memory_item.to_dict()},
+        )
 
     def _generate_improvements(self, issues: List[ValidationIssue]) -> List[str]:
         """Gera sugestões de melhoria baseadas nos problemas encontrados."""
@@ -75,78 +300,244 @@ class TestContext:
 
     def __init__(self):
         self.memories: Dict[str, MemoryItem] = {}
-        self.patterns: List[TestPattern] = []
+        self.patterns = PatternIndex()
+        # Sessões criadas pelo servidor só são gravadas se forem reutilizadas
+        self.persisted = True
+        # Posição no log do backend já aplicada e momento da última leitura
+        self.cursor = 0
+        self.synced_at = 0.0
 
     def add_memory(self, test_name: str, memory: "MemoryItem") -> None:
         """Adiciona uma memória ao contexto."""
         self.memories[test_name] = memory
 
-    def learn_pattern(self, test_case: TestCase) -> None:
+    def learn_pattern(self, test_case: TestCaseData) -> "TestPattern":
         """Aprende um padrão de teste bem-sucedido."""
-        pattern = TestPattern.from_test_case(test_case)
-        if pattern not in self.patterns:
-            self.patterns.append(pattern)
+        return self.patterns.add(TestPattern.from_test_case(test_case))
 
-    def generate_suggestions(self, code: str) -> List[str]:
+    def apply_event(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Aplica um evento lido do backend de memória."""
+        if kind == "pattern":
+            self.patterns.add(TestPattern.from_dict(payload))
+        elif kind == "memory":
+            self.add_memory(payload["test_name"], MemoryItem.from_dict(payload["item"]))
+
+    def generate_suggestions(self, code: Union[str, ParsedModule]) -> List[str]:
         """Gera sugestões baseadas em padrões aprendidos."""
         suggestions = []
-        ast_tree = ast.parse(code)
-
-        # Analisa o código em busca de padrões conhecidos
-        for pattern in self.patterns:
-            if pattern.matches(ast_tree):
-                suggestions.append(
-                    f"Considere adicionar um teste similar a '{pattern.name}' "
-                    f"para validar {pattern.description}"
-                )
+        if not self.patterns:
+            return suggestions
+        features = as_parsed_module(code).features
+
+        # Busca no índice os padrões compatíveis com o código
+        for pattern in self.patterns.match(features):
+            suggestions.append(
+                f"Considere adicionar um teste similar a '{pattern.name}' "
+                f"para validar {pattern.description}"
+            )
 
         return suggestions
 
 
-class MemoryItem(BaseModel):
-    """Item de memória para armazenar resultados de teste."""
+class MemoryItem:
+    """Item de memória para armazenar resultados de teste.
+
+    Fica na sessão enquanto ela existir; os campos são guardados em
+    ``__slots__`` e tuplas em vez de modelos do pydantic.
+    """
+
+    __slots__ = ("test_case", "success", "issues", "improvements")
 
-    test_case: TestCase
-    success: bool
-    issues: List[ValidationIssue]
-    improvements: List[str]
+    def __init__(
+        self,
+        test_case: TestCaseData,
+        success: bool,
+        issues: Iterable[IssueData],
+        improvements: Iterable[str],
+    ):
+        self.test_case = test_case
+        self.success = success
+        self.issues = tuple(issues)
+        self.improvements = tuple(improvements)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "test_case": self.test_case.to_dict(),
+            "success": self.success,
+            "issues": [issue.to_dict() for issue in self.issues],
+            "improvements": list(self.improvements),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MemoryItem":
+        return cls(
+            test_case=TestCaseData.from_dict(data["test_case"]),
+            success=data["success"],
+            issues=[IssueData(**issue) for issue in data["issues"]],
+            improvements=data["improvements"],
+        )
 
 
 class TestPattern:
     """Padrão de teste aprendido."""
 
-    def __init__(self, name: str, description: str, structure: Dict):
+    __slots__ = (
+        "name",
+        "description",
+        "has_setup",
+        "assertion_count",
+        "has_dependencies",
+        "occurrences",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        has_setup: bool,
+        assertion_count: int,
+        has_dependencies: bool,
+    ):
         self.name = name
         self.description = description
-        self.structure = structure
+        self.has_setup = has_setup
+        self.assertion_count = assertion_count
+        self.has_dependencies = has_dependencies
+        self.occurrences = 1
+
+    @property
+    def structure(self) -> Dict[str, Any]:
+        """Estrutura do teste que originou o padrão."""
+        return {
+            "has_setup": self.has_setup,
+            "assertion_count": self.assertion_count,
+            "has_dependencies": self.has_dependencies,
+        }
+
+    @property
+    def signature(self) -> "PatternSignature":
+        """Assinatura da estrutura, usada como chave no ``PatternIndex``."""
+        return (self.has_setup, self.assertion_count, self.has_dependencies)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "structure": self.structure,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TestPattern":
+        return cls(
+            name=data["name"], description=data["description"], **data["structure"]
+        )
 
     @classmethod
-    def from_test_case(cls, test_case: TestCase) -> "TestPattern":
+    def from_test_case(cls, test_case: TestCaseData) -> "TestPattern":
         """Cria um padrão a partir de um caso de teste."""
-        structure = {
-            "has_setup": bool(test_case.setup),
-            "assertion_count": len(test_case.assertions),
-            "has_dependencies": bool(test_case.dependencies),
-        }
         return cls(
-            name=test_case.name, description=test_case.description, structure=structure
+            name=test_case.name,
+            description=test_case.description,
+            has_setup=bool(test_case.setup),
+            assertion_count=len(test_case.assertions),
+            has_dependencies=bool(test_case.dependencies),
         )
 
-    def matches(self, tree: ast.AST) -> bool:
+    def matches(self, module: Union[ast.AST, ParsedModule]) -> bool:
         """Verifica se um código corresponde ao padrão."""
-        # Implementação básica de correspondência de padrões
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                if self.structure["has_setup"] and not any(
-                    isinstance(stmt, ast.FunctionDef) and stmt.name == "setUp"
-                    for stmt in node.body
-                ):
-                    return False
-
-                assertion_count = sum(
-                    1 for stmt in ast.walk(node) if isinstance(stmt, ast.Assert)
-                )
-                if assertion_count < self.structure["assertion_count"]:
-                    return False
+        return self.matches_features(as_parsed_module(module).features)
+
+    def matches_features(self, features: CodeFeatures) -> bool:
+        """Verifica se as características de um código atendem ao padrão."""
+        # Módulos sem funções atendem a qualquer padrão
+        if features.min_assertion_count is None:
+            return True
+        if self.has_setup and not features.all_have_setup:
+            return False
+        return features.min_assertion_count >= self.assertion_count
+
+
+PatternSignature = Tuple[bool, int, bool]
+PatternKey = Tuple[PatternSignature, str, str]
+
+
+class PatternIndex:
+    """Padrões aprendidos agrupados pela assinatura de estrutura.
+
+    Um padrão repetido (mesma assinatura, nome e descrição) é deduplicado:
+    o primeiro aprendido é mantido e ``occurrences`` é incrementado. A busca
+    consulta apenas os grupos cuja assinatura é compatível com o código, de
+    modo que padrões incompatíveis não são percorridos.
+    """
+
+    def __init__(self):
+        self._patterns: Dict[PatternKey, TestPattern] = {}
+        # Padrões de cada assinatura, com a ordem em que foram aprendidos
+        self._buckets: Dict[PatternSignature, List[Tuple[int, TestPattern]]] = {}
+        # Contagens de asserções com grupos, em ordem, para cada ``has_setup``
+        self._assertion_counts: Dict[bool, List[int]] = {False: [], True: []}
+
+    def add(self, pattern: TestPattern) -> TestPattern:
+        """Adiciona o padrão, retornando o registro existente se houver."""
+        signature = pattern.signature
+        key = (signature, pattern.name, pattern.description)
+        existing = self._patterns.get(key)
+        if existing is not None:
+            existing.occurrences += 1
+            return existing
+
+        self._patterns[key] = pattern
+        bucket = self._buckets.get(signature)
+        if bucket is None:
+            bucket = self._buckets[signature] = []
+            counts = self._assertion_counts[pattern.has_setup]
+            position = bisect.bisect_left(counts, pattern.assertion_count)
+            if position == len(counts) or counts[position] != pattern.assertion_count:
+                counts.insert(position, pattern.assertion_count)
+        bucket.append((len(self._patterns), pattern))
+        return pattern
+
+    def match(self, features: CodeFeatures) -> List[TestPattern]:
+        """Retorna os padrões compatíveis, na ordem em que foram aprendidos."""
+        buckets = [
+            self._buckets[signature]
+            for signature in self._matching_signatures(features)
+            if signature in self._buckets
+        ]
+        if len(buckets) == 1:
+            return [pattern for _, pattern in buckets[0]]
+        return [pattern for _, pattern in heapq.merge(*buckets, key=_learned_order)]
+
+    def _matching_signatures(
+        self, features: CodeFeatures
+    ) -> Iterator[PatternSignature]:
+        """Assinaturas compatíveis com as características do código.
+
+        Módulos sem funções atendem a qualquer padrão; nos demais, padrões
+        com setup exigem setup em todas as funções e a contagem de asserções
+        não pode passar da menor contagem do código.
+        """
+        if features.min_assertion_count is None:
+            yield from self._buckets
+            return
+
+        setups = (False, True) if features.all_have_setup else (False,)
+        for has_setup in setups:
+            counts = self._assertion_counts[has_setup]
+            limit = bisect.bisect_right(counts, features.min_assertion_count)
+            for assertion_count in counts[:limit]:
+                yield has_setup, assertion_count, False
+                yield has_setup, assertion_count, True
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __iter__(self) -> Iterator[TestPattern]:
+        return iter(self._patterns.values())
+
+
+def _learned_order(item: Tuple[int, TestPattern]) -> int:
+    return item[0]
+
 
-        return True
+mcp_context = MCPContext()
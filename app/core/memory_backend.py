@@ -0,0 +1,273 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BACKENDS = ("memory", "sqlite")
+
+MemoryEvent = Tuple[str, Dict[str, Any]]
+
+
+class MemoryBackend:
+    """Armazenamento da memória MCP compartilhado entre processos.
+
+    A memória de cada sessão é um log de eventos (``kind``, ``payload``)
+    que os processos acrescentam e releem a partir de um cursor. Esta
+    implementação padrão não persiste nada: a memória fica apenas nos
+    contextos do próprio processo.
+    """
+
+    persistent = False
+
+    def append(
+        self, session_id: str, writer: str, kind: str, payload: Dict[str, Any]
+    ) -> None:
+        """Registra um evento da sessão."""
+
+    def load(
+        self, session_id: str, after: int, writer: str
+    ) -> Tuple[int, List[MemoryEvent]]:
+        """Retorna o novo cursor e os eventos da sessão posteriores a ``after``.
+
+        Eventos gravados pelo próprio ``writer`` já estão aplicados em memória
+        e são omitidos; com ``writer`` vazio todos os eventos são retornados.
+        """
+        return after, []
+
+    def flush(self) -> None:
+        """Grava os eventos pendentes."""
+
+    def close(self) -> None:
+        """Grava os eventos pendentes e libera os recursos."""
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """Log de eventos em SQLite no modo WAL, com escrita em lotes.
+
+    Vários workers podem abrir o mesmo arquivo: o WAL permite leituras
+    concorrentes com um escritor, e o índice compartilhado é mapeado em
+    memória (``mmap_size``). Os eventos são acumulados e gravados em uma
+    única transação ao chegar a ``batch_size`` eventos ou, por uma thread
+    de fundo, a cada ``flush_interval`` segundos.
+
+    Com ``retention_seconds``, a mesma thread remove periodicamente os
+    eventos das sessões que não recebem eventos novos há mais tempo que
+    isso (o TTL de inatividade das sessões).
+    """
+
+    persistent = True
+
+    # Intervalo mínimo entre duas remoções de sessões expiradas
+    purge_interval = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        mmap_size: int = 64 * 1024 * 1024,
+        retention_seconds: float = 0.0,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.mmap_size = mmap_size
+        self.retention_seconds = retention_seconds
+        self._pending: List[Tuple[str, str, str, str]] = []
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def append(
+        self, session_id: str, writer: str, kind: str, payload: Dict[str, Any]
+    ) -> None:
+        with self._lock:
+            self._pending.append((session_id, writer, kind, json.dumps(payload)))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            else:
+                self._start_flusher()
+
+    def load(
+        self, session_id: str, after: int, writer: str
+    ) -> Tuple[int, List[MemoryEvent]]:
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT id, writer, kind, payload FROM mcp_events "
+                    "WHERE session_id = ? AND id > ? ORDER BY id",
+                    (session_id, after),
+                )
+                .fetchall()
+            )
+
+        cursor = after
+        events = []
+        for event_id, event_writer, kind, payload in rows:
+            cursor = event_id
+            if event_writer != writer:
+                events.append((kind, json.loads(payload)))
+        return cursor, events
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def purge_expired(self) -> int:
+        """Remove os eventos das sessões inativas há mais de ``retention_seconds``.
+
+        Retorna o número de sessões removidas.
+        """
+        if not self.retention_seconds:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            self._last_purge = time.monotonic()
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                expired = [
+                    (session_id,)
+                    for (session_id,) in connection.execute(
+                        "SELECT session_id FROM mcp_sessions WHERE last_event < ?",
+                        (cutoff,),
+                    )
+                ]
+                connection.executemany(
+                    "DELETE FROM mcp_events WHERE session_id = ?", expired
+                )
+                connection.executemany(
+                    "DELETE FROM mcp_sessions WHERE session_id = ?", expired
+                )
+        return len(expired)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self._lock:
+            self._flush_locked()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Aberta no primeiro uso: importar o módulo não toca no disco e cada
+        # processo criado por fork abre a sua própria conexão
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            connection.execute("PRAGMA busy_timeout=5000")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS mcp_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    writer TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS mcp_events_session "
+                "ON mcp_events (session_id, id)"
+            )
+            # Momento do último evento de cada sessão, usado na retenção
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS mcp_sessions ("
+                "session_id TEXT PRIMARY KEY, last_event REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS mcp_sessions_last_event "
+                "ON mcp_sessions (last_event)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        now = time.time()
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT INTO mcp_events (session_id, writer, kind, payload) "
+                "VALUES (?, ?, ?, ?)",
+                self._pending,
+            )
+            connection.executemany(
+                "INSERT INTO mcp_sessions (session_id, last_event) VALUES (?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET last_event = ?",
+                [
+                    (session_id, now, now)
+                    for session_id in {event[0] for event in self._pending}
+                ],
+            )
+        # Em caso de erro os eventos continuam pendentes para a próxima gravação
+        self._pending = []
+
+    def _start_flusher(self) -> None:
+        # Iniciada no primeiro evento de cada processo (e após um fork)
+        if self._flusher is None or not self._flusher.is_alive():
+            self._stop.clear()
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="mcp-memory-flush", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.monotonic() - self._last_purge >= self.purge_interval:
+                    self.purge_expired()
+            except sqlite3.Error:
+                logger.exception("Falha ao gravar a memória MCP em %s", self.path)
+
+
+def create_memory_backend(
+    backend: str,
+    path: str,
+    batch_size: int,
+    flush_interval: float,
+    retention_seconds: float = 0.0,
+) -> MemoryBackend:
+    """Cria o backend de memória MCP configurado."""
+    if backend not in MEMORY_BACKENDS:
+        raise ValueError(
+            f"Backend de memória inválido '{backend}'. Use um de {MEMORY_BACKENDS}"
+        )
+    if backend == "sqlite":
+        return SQLiteMemoryBackend(
+            path,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            retention_seconds=retention_seconds,
+        )
+    return MemoryBackend()
+
+
+memory_backend = create_memory_backend(
+    settings.MCP_MEMORY_BACKEND,
+    settings.MCP_MEMORY_PATH,
+    settings.MCP_MEMORY_BATCH_SIZE,
+    settings.MCP_MEMORY_FLUSH_INTERVAL_SECONDS,
+    # Eventos de sessões inativas além do TTL das sessões são removidos
+    retention_seconds=settings.SESSION_IDLE_TTL_SECONDS,
+)
@@ -0,0 +1,177 @@
+import bisect
+import contextlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from app.core.config import settings
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# O charset é acrescentado pelo ``PlainTextResponse``
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Histogram:
+    """Histograma cumulativo com rótulos, no formato do Prometheus."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        """Registra uma observação para a combinação de rótulos."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Contagem por bucket (mais o +Inf), soma e total
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [
+                    0.0,
+                    0,
+                ]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+
+        for labels, values in sorted(series.items()):
+            label_text = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield (
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.label_names + ('le',), labels + (le,))} "
+                    f"{cumulative}"
+                )
+            yield f"{self.name}_sum{label_text} {values[-2]!r}"
+            yield f"{self.name}_count{label_text} {values[-1]}"
+
+
+class MetricsRegistry:
+    """Métricas da aplicação expostas em ``/metrics``.
+
+    Com ``enabled=False`` os temporizadores retornam um gerenciador de
+    contexto nulo compartilhado, de modo que a instrumentação custa apenas
+    uma chamada de função e um teste booleano.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.stage_duration = Histogram(
+            "mcp_stage_duration_seconds",
+            "Duração de cada etapa das operações de análise, geração e validação",
+            ("operation", "stage"),
+        )
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Duração das requisições HTTP",
+            ("method", "route", "status"),
+        )
+        self._collectors: List[Tuple[str, str, frozenset, Callable[[], Dict]]] = []
+
+    def stage(self, operation: str, stage: str):
+        """Mede a duração de uma etapa de ``operation``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self.stage_duration, (operation, stage))
+
+    def register_collector(
+        self,
+        prefix: str,
+        documentation: str,
+        collect: Callable[[], Dict[str, Any]],
+        counters: Sequence[str] = (),
+    ) -> None:
+        """Expõe os valores numéricos de ``collect()`` como métricas.
+
+        ``collect`` é chamado a cada coleta; cada chave numérica vira a
+        métrica ``{prefix}_{chave}``, do tipo gauge, ou ``{prefix}_{chave}_total``
+        para as chaves listadas em ``counters``.
+        """
+        self._collectors.append((prefix, documentation, frozenset(counters), collect))
+
+    def render(self) -> str:
+        """Gera as métricas no formato de exposição de texto do Prometheus."""
+        lines = []
+        for histogram in (self.stage_duration, self.request_duration):
+            lines.append(f"# HELP {histogram.name} {histogram.documentation}")
+            lines.append(f"# TYPE {histogram.name} histogram")
+            lines.extend(histogram.samples())
+
+        for prefix, documentation, counters, collect in self._collectors:
+            for key, value in collect().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                if key in counters:
+                    name, metric_type = f"{prefix}_{key}_total", "counter"
+                else:
+                    name, metric_type = f"{prefix}_{key}", "gauge"
+                lines.append(f"# HELP {name} {documentation}: {key}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(self.labels, time.perf_counter() - self.start)
+
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
@@ -0,0 +1,410 @@
+import ast
+import hashlib
+import re
+from collections import defaultdict
+from operator import attrgetter, itemgetter
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+DEFINITION_TYPES = (ast.ClassDef,) + FUNCTION_TYPES
+
+# Mesmas quebras de linha consideradas pelo ast ao numerar as linhas
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+class FunctionProfile(NamedTuple):
+    """Características de uma função usadas na correspondência de padrões."""
+
+    has_setup: bool
+    assertion_count: int
+
+
+class CodeFeatures(NamedTuple):
+    """Resumo dos perfis de função de um módulo.
+
+    Um padrão corresponde ao módulo quando todas as funções satisfazem suas
+    exigências, o que depende apenas de ``all_have_setup`` e do menor número
+    de asserções (``None`` quando o módulo não tem funções).
+    """
+
+    all_have_setup: bool
+    min_assertion_count: Optional[int]
+
+    @classmethod
+    def from_profiles(cls, profiles: List[FunctionProfile]) -> "CodeFeatures":
+        return cls(
+            all_have_setup=all(profile.has_setup for profile in profiles),
+            min_assertion_count=min(
+                (profile.assertion_count for profile in profiles), default=None
+            ),
+        )
+
+
+class FunctionStats:
+    """Métricas de uma função acumuladas durante a indexação."""
+
+    __slots__ = ("qualname", "complexity", "assertion_count")
+
+    def __init__(self, qualname: str):
+        self.qualname = qualname
+        self.complexity = 1
+        self.assertion_count = 0
+
+
+class DefinitionSymbol:
+    """Classe ou função registrada na tabela de símbolos do módulo.
+
+    ``kind`` é ``class``, ``method`` (função no corpo de uma classe) ou
+    ``function``; ``local`` indica uma definição dentro do corpo de uma
+    função, inacessível a partir do módulo. ``names`` reúne os nomes
+    (``ast.Name``) referenciados em toda a definição, incluindo decoradores,
+    argumentos e definições aninhadas.
+    """
+
+    __slots__ = (
+        "node",
+        "kind",
+        "qualname",
+        "parent",
+        "depth",
+        "local",
+        "methods",
+        "names",
+    )
+
+    def __init__(
+        self,
+        node: ast.AST,
+        kind: str,
+        qualname: str,
+        parent: Optional["DefinitionSymbol"],
+        depth: int,
+        local: bool,
+    ):
+        self.node = node
+        self.kind = kind
+        self.qualname = qualname
+        self.parent = parent
+        self.depth = depth
+        self.local = local
+        self.methods: List[DefinitionSymbol] = []
+        self.names: Set[str] = set()
+
+    @property
+    def name(self) -> str:
+        return self.node.name
+
+    @property
+    def is_async(self) -> bool:
+        return isinstance(self.node, ast.AsyncFunctionDef)
+
+
+class SymbolTable:
+    """Classes, métodos e funções do módulo, montados na indexação.
+
+    ``classes`` e ``functions`` trazem apenas as definições acessíveis a
+    partir do módulo (não locais), na ordem de ``ast.walk``; métodos ficam
+    em ``DefinitionSymbol.methods`` e nunca aparecem como funções livres.
+    """
+
+    def __init__(self, symbols: Dict[int, DefinitionSymbol]):
+        self._symbols = symbols
+        ordered = sorted(symbols.values(), key=attrgetter("depth"))
+        self.classes = [
+            symbol for symbol in ordered if symbol.kind == "class" and not symbol.local
+        ]
+        self.functions = [
+            symbol
+            for symbol in ordered
+            if symbol.kind == "function" and not symbol.local
+        ]
+
+    def get(self, node: ast.AST) -> Optional[DefinitionSymbol]:
+        """Retorna o símbolo de uma definição do módulo."""
+        return self._symbols.get(id(node))
+
+    def __iter__(self) -> Iterator[DefinitionSymbol]:
+        """Todas as definições, em pré-ordem."""
+        return iter(self._symbols.values())
+
+
+def _definition_symbol(
+    node: ast.AST, depth: int, scope: str, parent: Optional[DefinitionSymbol]
+) -> DefinitionSymbol:
+    """Cria o símbolo de uma definição, ligando os métodos à sua classe.
+
+    Uma função é método quando está no corpo da classe (mesmo dentro de um
+    ``if``), e uma definição é local quando alguma função a envolve.
+    """
+    local = parent is not None and (parent.local or parent.kind != "class")
+    if isinstance(node, ast.ClassDef):
+        kind = "class"
+    elif parent is not None and parent.kind == "class":
+        kind = "method"
+    else:
+        kind = "function"
+    symbol = DefinitionSymbol(node, kind, scope + node.name, parent, depth, local)
+    if kind == "method":
+        parent.methods.append(symbol)
+    return symbol
+
+
+def decision_weight(node: ast.AST) -> int:
+    """Quanto o nó acrescenta à complexidade ciclomática."""
+    if isinstance(node, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
+        return 1
+    if isinstance(node, ast.BoolOp):
+        return len(node.values) - 1
+    return 0
+
+
+class ParsedModule:
+    """Código fonte analisado uma única vez, com índices de nós pré-calculados.
+
+    O mesmo objeto é repassado ao analisador, ao contexto MCP e ao validador
+    para que uma requisição nunca execute ``ast.parse`` mais de uma vez.
+    """
+
+    def __init__(self, tree: Optional[ast.AST] = None, source: Optional[str] = None):
+        self._tree = tree
+        self.source = source
+        self._digest: Optional[str] = None
+        self._node_entries: Dict[Type[ast.AST], List[Tuple[int, ast.AST]]] = {}
+        self._nodes_by_type: Optional[Dict[Type[ast.AST], List[ast.AST]]] = None
+        self._function_stats: Optional[Dict[int, FunctionStats]] = None
+        self._function_profiles: Optional[List[FunctionProfile]] = None
+        self._units: Optional[List[Tuple[ast.AST, List[ast.AST]]]] = None
+        self._symbols: Optional[SymbolTable] = None
+        self._source_lines: Optional[List[str]] = None
+
+    @classmethod
+    def from_source(cls, source: str, lazy: bool = False) -> "ParsedModule":
+        """Cria o módulo a partir do código fonte.
+
+        Com ``lazy=True`` o parse só acontece no primeiro acesso à árvore, de
+        modo que um acerto de cache não paga o custo do ``ast.parse``. Caso
+        contrário ``SyntaxError`` é propagado imediatamente.
+        """
+        module = cls(source=source)
+        if not lazy:
+            module.tree
+        return module
+
+    def __getstate__(self) -> Dict:
+        # Entre processos basta o código fonte; a árvore é refeita sob demanda
+        if self.source is None:
+            return self.__dict__
+        return {
+            "_tree": None,
+            "source": self.source,
+            "_digest": self._digest,
+            "_node_entries": {},
+            "_nodes_by_type": None,
+            "_function_stats": None,
+            "_function_profiles": self._function_profiles,
+            "_units": None,
+            "_symbols": None,
+            "_source_lines": None,
+        }
+
+    @property
+    def tree(self) -> ast.AST:
+        if self._tree is None:
+            self._tree = ast.parse(self.source)
+        return self._tree
+
+    @property
+    def digest(self) -> Optional[str]:
+        """Hash do código fonte, usado como chave de conteúdo."""
+        if self._digest is None and self.source is not None:
+            self._digest = hashlib.blake2b(
+                self.source.encode("utf-8"), digest_size=16
+            ).hexdigest()
+        return self._digest
+
+    def nodes(self, node_type: Type[ast.AST]) -> List[ast.AST]:
+        """Retorna os nós do tipo informado, na ordem de ``ast.walk``."""
+        if self._nodes_by_type is None:
+            self._build_index()
+        nodes = self._nodes_by_type.get(node_type)
+        if nodes is None:
+            # A pré-ordem ordenada (de forma estável) pela profundidade é a
+            # ordem em largura produzida por ast.walk
+            entries = sorted(self._node_entries.get(node_type, ()), key=itemgetter(0))
+            nodes = self._nodes_by_type[node_type] = [node for _, node in entries]
+        return nodes
+
+    def function_stats(self, node: ast.AST) -> FunctionStats:
+        """Retorna nome qualificado, complexidade e asserções da função."""
+        if self._function_stats is None:
+            self._build_index()
+        return self._function_stats[id(node)]
+
+    @property
+    def symbols(self) -> SymbolTable:
+        """Tabela de classes, métodos e funções, montada na indexação."""
+        if self._symbols is None:
+            self._build_index()
+        return self._symbols
+
+    def definition_units(self) -> List[Tuple[ast.AST, List[ast.AST]]]:
+        """Comandos de nível superior que contêm classes ou funções.
+
+        Cada item traz o comando e as definições contidas nele (incluindo o
+        próprio comando), em pré-ordem. Para uma árvore que não é um
+        ``ast.Module`` a única unidade é a própria raiz.
+        """
+        if self._units is None:
+            self._build_index()
+        return [unit for unit in self._units if unit[1]]
+
+    def fingerprint(self, node: ast.AST) -> str:
+        """Hash do código de uma definição, usado como chave de conteúdo.
+
+        Espaços no fim das linhas e linhas em branco são ignorados, e a
+        posição da definição no arquivo não participa do hash.
+        """
+        if self.source is None:
+            text = ast.dump(node)
+        else:
+            if self._source_lines is None:
+                self._source_lines = _LINE_BREAK.split(self.source)
+            start = min(
+                [node.lineno]
+                + [
+                    decorator.lineno
+                    for decorator in getattr(node, "decorator_list", ())
+                ]
+            )
+            text = "\n".join(
+                line.rstrip()
+                for line in self._source_lines[start - 1 : node.end_lineno]
+                if line.strip()
+            )
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _build_index(self) -> None:
+        """Indexa os nós, os símbolos e as métricas de função em uma única travessia.
+
+        Os pontos de decisão e asserções de um nó são somados a todas as
+        funções que o envolvem, como em ``ComplexityCalculator``, e cada
+        nome referenciado a todas as definições que o envolvem.
+        """
+        entries: Dict[Type[ast.AST], List[Tuple[int, ast.AST]]] = defaultdict(list)
+        stats: Dict[int, FunctionStats] = {}
+        units: List[Tuple[ast.AST, List[ast.AST]]] = []
+        symbols: Dict[int, DefinitionSymbol] = {}
+        unit_depth = 1 if isinstance(self.tree, ast.Module) else 0
+        # (nó, profundidade, funções envolventes, escopo, unidade,
+        #  definições envolventes)
+        stack = [(self.tree, 0, (), "", None, ())]
+
+        while stack:
+            node, depth, functions, scope, unit, definitions = stack.pop()
+            entries[type(node)].append((depth, node))
+
+            if depth == unit_depth:
+                unit = []
+                units.append((node, unit))
+
+            if isinstance(node, ast.Name):
+                for definition in definitions:
+                    definition.names.add(node.id)
+
+            if functions:
+                weight = decision_weight(node)
+                is_assert = isinstance(node, ast.Assert)
+                if weight or is_assert:
+                    for function_stats in functions:
+                        function_stats.complexity += weight
+                        function_stats.assertion_count += is_assert
+
+            if isinstance(node, DEFINITION_TYPES):
+                if unit is not None:
+                    unit.append(node)
+                symbol = _definition_symbol(
+                    node, depth, scope, definitions[-1] if definitions else None
+                )
+                symbols[id(node)] = symbol
+                definitions = definitions + (symbol,)
+
+                if isinstance(node, ast.ClassDef):
+                    scope = f"{symbol.qualname}."
+                else:
+                    function_stats = FunctionStats(symbol.qualname)
+                    stats[id(node)] = function_stats
+                    functions = functions + (function_stats,)
+                    scope = f"{symbol.qualname}.<locals>."
+
+            children = list(ast.iter_child_nodes(node))
+            for child in reversed(children):
+                stack.append((child, depth + 1, functions, scope, unit, definitions))
+
+        self._node_entries = entries
+        self._nodes_by_type = {}
+        self._function_stats = stats
+        self._units = units
+        self._symbols = SymbolTable(symbols)
+
+    @property
+    def classes(self) -> List[ast.ClassDef]:
+        return self.nodes(ast.ClassDef)
+
+    @property
+    def functions(self) -> List[ast.FunctionDef]:
+        return self.nodes(ast.FunctionDef)
+
+    @property
+    def all_functions(self) -> List[ast.AST]:
+        """Funções síncronas seguidas das assíncronas."""
+        return self.nodes(ast.FunctionDef) + self.nodes(ast.AsyncFunctionDef)
+
+    @property
+    def function_profiles(self) -> List[FunctionProfile]:
+        """Perfil de cada função, na mesma ordem de ``functions``.
+
+        Pode ser atribuído a partir de um resultado calculado em outro
+        processo ou guardado em cache, dispensando o parse local.
+        """
+        if self._function_profiles is None:
+            self._function_profiles = [
+                FunctionProfile(
+                    has_setup=any(
+                        isinstance(stmt, ast.FunctionDef) and stmt.name == "setUp"
+                        for stmt in node.body
+                    ),
+                    assertion_count=self.function_stats(node).assertion_count,
+                )
+                for node in self.functions
+            ]
+        return self._function_profiles
+
+    @function_profiles.setter
+    def function_profiles(self, profiles: List[FunctionProfile]) -> None:
+        self._function_profiles = profiles
+
+    @property
+    def features(self) -> CodeFeatures:
+        """Características usadas na busca de padrões aprendidos."""
+        return CodeFeatures.from_profiles(self.function_profiles)
+
+
+def as_parsed_module(
+    value: Union[str, ast.AST, ParsedModule], lazy: bool = False
+) -> ParsedModule:
+    """Normaliza código fonte, árvore AST ou módulo já analisado."""
+    if isinstance(value, ParsedModule):
+        return value
+    if isinstance(value, ast.AST):
+        return ParsedModule(value)
+    return ParsedModule.from_source(value, lazy=lazy)
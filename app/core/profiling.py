@@ -0,0 +1,326 @@
+import asyncio
+import contextvars
+import cProfile
+import itertools
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_LINK_HEADER = b"x-profile-url"
+
+# Perfis salvos são identificados apenas por hexadecimais (sem caminhos)
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Estatísticas do cProfile no formato de ``pstats.Stats.stats``
+ProfileStats = Dict[Tuple[str, int, str], Tuple]
+
+# Indica que a requisição atual pediu para ser perfilada
+_profiling_active: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "profiling_active", default=False
+)
+
+# Estatísticas das tarefas do pool da requisição sorteada em andamento
+_worker_profiles: contextvars.ContextVar[
+    Optional[List[ProfileStats]]
+] = contextvars.ContextVar("worker_profiles", default=None)
+
+
+def profiling_active() -> bool:
+    """Indica se a requisição em andamento pediu para ser perfilada.
+
+    O ``WorkerPool`` executa as tarefas no próprio event loop enquanto isso
+    for verdade, para que o cProfile (que só observa a thread em que foi
+    ativado) enxergue o parse, a análise e a renderização.
+    """
+    return _profiling_active.get()
+
+
+def worker_profiles() -> Optional[List[ProfileStats]]:
+    """Lista que recebe os perfis das tarefas do pool, ou ``None``.
+
+    Requisições sorteadas pela amostragem mantêm o trabalho no pool: cada
+    tarefa roda sob ``run_profiled`` no próprio worker e as estatísticas
+    são somadas ao perfil da requisição.
+    """
+    return _worker_profiles.get()
+
+
+def run_profiled(
+    func: Callable[..., Any], *args: Any
+) -> Tuple[Any, Optional[ProfileStats]]:
+    """Executa ``func(*args)`` sob o cProfile no worker (thread ou processo).
+
+    Retorna o resultado e as estatísticas coletadas, ou ``None`` quando o
+    interpretador não permite outro profiler ativo ao mesmo tempo.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return func(*args), None
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats
+
+
+class RequestProfiler:
+    """Perfila requisições com o cProfile e grava os resultados em disco.
+
+    Uma requisição é perfilada quando pede explicitamente (cabeçalho
+    ``X-Profile: 1`` ou ``?profile=1``) a partir de um cliente em
+    ``allowed_clients``, ou por amostragem, uma a cada ``sample_rate``
+    requisições. Cada perfil gera um ``<id>.prof`` (formato ``pstats``) e
+    um ``<id>.json`` com as funções mais caras de ``app/services``, gravados
+    em uma thread; apenas os ``max_profiles`` perfis mais recentes são
+    mantidos em ``output_dir``.
+
+    O cProfile observa toda a thread do event loop, então requisições
+    concorrentes aparecem no mesmo perfil; apenas um perfil é coletado por
+    vez. Nos perfis pedidos explicitamente as tarefas do pool rodam no
+    event loop; nos sorteados elas continuam no pool, perfiladas em cada
+    worker, e as estatísticas são somadas às do event loop.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        allowed_clients: List[str],
+        sample_rate: int,
+        output_dir: str,
+        top_functions: int = 20,
+        module_filter: str = os.path.join("app", "services", ""),
+        max_profiles: int = 100,
+    ):
+        self.enabled = enabled
+        self.allowed_clients = set(allowed_clients)
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.top_functions = top_functions
+        self.module_filter = module_filter
+        self.max_profiles = max_profiles
+        self._counter = itertools.count(1)
+        self._lock: Optional[asyncio.Lock] = None
+
+    def is_allowed(self, scope: Dict) -> bool:
+        """Indica se o cliente da requisição pode pedir e consultar perfis."""
+        client = scope.get("client")
+        return client is not None and client[0] in self.allowed_clients
+
+    def requested(self, scope: Dict) -> bool:
+        """Indica se a requisição pediu para ser perfilada."""
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER.encode() and _is_truthy(value.decode()):
+                return True
+        query = parse_qs(scope.get("query_string", b"").decode())
+        return any(_is_truthy(value) for value in query.get(PROFILE_QUERY_PARAM, ()))
+
+    def sampled(self) -> bool:
+        """Sorteia a requisição para a amostragem de 1 em ``sample_rate``."""
+        return self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0
+
+    async def profile(
+        self,
+        scope: Dict,
+        call: Callable[[], Any],
+        wait: bool,
+        profile_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Executa ``call()`` sob o cProfile e retorna o ID do perfil salvo.
+
+        ``wait`` indica um perfil pedido explicitamente: ele aguarda o perfil
+        em andamento e executa as tarefas do pool no próprio event loop.
+        Sem ``wait`` (amostragem), retorna ``None`` sem perfilar caso outro
+        perfil já esteja em andamento, e as tarefas do pool são perfiladas
+        nos workers.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if not wait and self._lock.locked():
+            await call()
+            return None
+
+        profile_id = profile_id or uuid.uuid4().hex
+        async with self._lock:
+            profiler = cProfile.Profile()
+            collected: List[ProfileStats] = []
+            token = _profiling_active.set(wait)
+            workers_token = _worker_profiles.set(None if wait else collected)
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                await call()
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+                _worker_profiles.reset(workers_token)
+                _profiling_active.reset(token)
+        # Gravação, resumo pelo pstats e rotação fora do event loop
+        await asyncio.to_thread(
+            self._save, profile_id, profiler, collected, scope, elapsed
+        )
+        return profile_id
+
+    def load_summary(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna o resumo de um perfil salvo, ou ``None`` se não existir."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.output_dir, f"{profile_id}.json")
+        try:
+            with open(path, encoding="utf-8") as summary_file:
+                return json.load(summary_file)
+        except FileNotFoundError:
+            return None
+
+    def summarize(self, stats: pstats.Stats) -> Dict[str, List[Dict[str, Any]]]:
+        """Lista as funções de ``app/services`` mais caras.
+
+        ``top_functions`` ordena pelo tempo acumulado (incluindo as chamadas
+        internas) e ``top_self_time`` pelo tempo gasto na própria função.
+        """
+        functions = []
+        for (filename, line, name), entry in stats.stats.items():
+            _, calls, total, cumulative, _ = entry
+            if self.module_filter not in filename:
+                continue
+            relative = filename[filename.index(self.module_filter) :]
+            functions.append(
+                {
+                    "function": f"{relative}:{line}({name})",
+                    "calls": calls,
+                    "total_time": total,
+                    "cumulative_time": cumulative,
+                }
+            )
+        return {
+            ranking: sorted(functions, key=lambda item: item[key], reverse=True)[
+                : self.top_functions
+            ]
+            for ranking, key in (
+                ("top_functions", "cumulative_time"),
+                ("top_self_time", "total_time"),
+            )
+        }
+
+    def _save(
+        self,
+        profile_id: str,
+        profiler: cProfile.Profile,
+        worker_stats: List[ProfileStats],
+        scope: Dict,
+        elapsed: float,
+    ) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stats = pstats.Stats(profiler)
+        for collected in worker_stats:
+            stats.add(_CollectedStats(collected))
+        stats.dump_stats(os.path.join(self.output_dir, f"{profile_id}.prof"))
+        summary = {
+            "id": profile_id,
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "timestamp": time.time(),
+            "duration": elapsed,
+            **self.summarize(stats),
+        }
+        path = os.path.join(self.output_dir, f"{profile_id}.json")
+        with open(path, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+        self._rotate()
+
+    def _rotate(self) -> None:
+        """Remove os perfis mais antigos além de ``max_profiles``."""
+        if self.max_profiles <= 0:
+            return
+        profiles = []
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                profile_id, extension = os.path.splitext(entry.name)
+                if extension == ".json" and _PROFILE_ID.match(profile_id):
+                    profiles.append((entry.stat().st_mtime, profile_id))
+        profiles.sort()
+        for _, profile_id in profiles[: -self.max_profiles]:
+            for extension in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(self.output_dir, profile_id + extension))
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que perfila as requisições pedidas ou sorteadas.
+
+    Requisições perfiladas a pedido recebem o cabeçalho ``X-Profile-Url``
+    com o endereço do resumo do perfil.
+    """
+
+    def __init__(self, app: Callable, profiler: RequestProfiler, summary_url: str):
+        self.app = app
+        self.profiler = profiler
+        self.summary_url = summary_url
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = self.profiler.requested(scope) and self.profiler.is_allowed(scope)
+        if not requested and not self.profiler.sampled():
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex if requested else None
+
+        async def send_wrapper(message: Dict) -> None:
+            if profile_id is not None and message["type"] == "http.response.start":
+                link = f"{self.summary_url}/{profile_id}".encode()
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (PROFILE_LINK_HEADER, link),
+                    ],
+                }
+            await send(message)
+
+        await self.profiler.profile(
+            scope,
+            lambda: self.app(scope, receive, send_wrapper),
+            wait=requested,
+            profile_id=profile_id,
+        )
+
+
+class _CollectedStats:
+    """Estatísticas vindas de um worker, no formato aceito por ``pstats.Stats``."""
+
+    def __init__(self, stats: ProfileStats):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+request_profiler = RequestProfiler(
+    enabled=settings.PROFILING_ENABLED,
+    allowed_clients=settings.PROFILING_ALLOWED_CLIENTS,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    output_dir=settings.PROFILING_OUTPUT_DIR,
+    top_functions=settings.PROFILING_TOP_FUNCTIONS,
+    max_profiles=settings.PROFILING_MAX_PROFILES,
+)
@@ -0,0 +1,349 @@
+import ast
+import json
+import sqlite3
+import threading
+import time
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from app.core.config import settings
+from app.core.parsed_module import DEFINITION_TYPES, ParsedModule
+
+# Limite de reexportações seguidas ao resolver um nome importado
+MAX_REEXPORT_DEPTH = 16
+
+# Pares (caminho, digest) por consulta, abaixo do limite de 999 parâmetros
+# das versões antigas do SQLite
+STORE_QUERY_CHUNK = 400
+
+
+class ModuleSymbols:
+    """Definições e imports de nível de módulo de um arquivo do projeto.
+
+    ``definitions`` associa cada classe ou função de nível superior ao seu
+    tipo (``class``, ``function`` ou ``async_function``); ``imports`` associa
+    cada nome importado ao caminho absoluto de onde vem (``pkg.models.User``);
+    ``references`` são os nomes importados usados dentro das definições.
+    """
+
+    __slots__ = ("path", "name", "digest", "definitions", "imports", "references")
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        digest: str,
+        definitions: Dict[str, str],
+        imports: Dict[str, str],
+        references: Iterable[str] = (),
+    ):
+        self.path = path
+        self.name = name
+        self.digest = digest
+        self.definitions = definitions
+        self.imports = imports
+        self.references = tuple(references)
+
+    def __repr__(self) -> str:
+        return f"ModuleSymbols(name={self.name!r})"
+
+    def to_dict(self) -> Dict:
+        return {
+            "path": self.path,
+            "name": self.name,
+            "digest": self.digest,
+            "definitions": self.definitions,
+            "imports": self.imports,
+            "references": list(self.references),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ModuleSymbols":
+        return cls(
+            path=data["path"],
+            name=data["name"],
+            digest=data["digest"],
+            definitions=data["definitions"],
+            imports=data["imports"],
+            references=data["references"],
+        )
+
+
+class ProjectSymbol(NamedTuple):
+    """Definição de outro módulo do projeto usada pelo módulo analisado."""
+
+    local_name: str
+    module: str
+    name: str
+    kind: str
+
+
+class ProjectIndex:
+    """Índice de símbolos de todos os módulos de um projeto.
+
+    ``indexed`` e ``reused`` contam os módulos analisados nesta construção e
+    os aproveitados do índice persistido.
+    """
+
+    def __init__(
+        self, modules: Iterable[ModuleSymbols], indexed: int = 0, reused: int = 0
+    ):
+        self.modules = {module.name: module for module in modules}
+        self.indexed = indexed
+        self.reused = reused
+
+    def get(self, name: str) -> Optional[ModuleSymbols]:
+        return self.modules.get(name)
+
+    def resolve(self, qualified_name: str) -> Optional[Tuple[str, str, str]]:
+        """Localiza a definição apontada por um caminho como ``pkg.models.User``.
+
+        Reexportações (``from .models import User`` em um ``__init__.py``)
+        são seguidas até o módulo que define o nome. Retorna ``(módulo,
+        nome, tipo)`` ou ``None`` para nomes de fora do projeto e módulos.
+        """
+        for _ in range(MAX_REEXPORT_DEPTH):
+            module_name, _, name = qualified_name.rpartition(".")
+            module = self.modules.get(module_name)
+            if module is None:
+                return None
+            kind = module.definitions.get(name)
+            if kind is not None:
+                return module.name, name, kind
+            qualified_name = module.imports.get(name)
+            if qualified_name is None:
+                return None
+        return None
+
+    def dependencies(self, module: ModuleSymbols) -> List[ProjectSymbol]:
+        """Definições de outros módulos do projeto usadas por ``module``."""
+        dependencies = []
+        for local_name in module.references:
+            resolved = self.resolve(module.imports[local_name])
+            if resolved is not None and resolved[0] != module.name:
+                dependencies.append(ProjectSymbol(local_name, *resolved))
+        return dependencies
+
+
+def module_name_for(path: str) -> Tuple[str, bool]:
+    """Nome importável de um caminho relativo (``pkg/models.py``) e se é pacote."""
+    parts = path[: -len(".py")].split("/")
+    is_package = parts[-1] == "__init__"
+    if is_package:
+        parts.pop()
+    return ".".join(parts), is_package
+
+
+def index_module(path: str, source: str) -> ModuleSymbols:
+    """Extrai as definições e imports de nível de módulo de um arquivo.
+
+    Só os comandos do módulo e o corpo das definições de nível superior são
+    percorridos, sem a indexação completa de ``ParsedModule``: o índice
+    precisa apenas dos nomes. ``SyntaxError`` é propagado.
+    """
+    tree = ast.parse(source)
+    name, is_package = module_name_for(path)
+    package = name if is_package else name.rpartition(".")[0]
+
+    imports: Dict[str, str] = {}
+    definitions: Dict[str, str] = {}
+    used_names = set()
+    for statement in _module_statements(tree.body):
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname:
+                    imports[alias.asname] = alias.name
+                else:
+                    top_level = alias.name.partition(".")[0]
+                    imports[top_level] = top_level
+        elif isinstance(statement, ast.ImportFrom):
+            base = _absolute_module(package, statement.module, statement.level)
+            if base is None:
+                continue
+            for alias in statement.names:
+                if alias.name != "*":
+                    imports[alias.asname or alias.name] = f"{base}.{alias.name}"
+        elif isinstance(statement, DEFINITION_TYPES):
+            if isinstance(statement, ast.ClassDef):
+                definitions[statement.name] = "class"
+            elif isinstance(statement, ast.AsyncFunctionDef):
+                definitions[statement.name] = "async_function"
+            else:
+                definitions[statement.name] = "function"
+            used_names.update(
+                node.id for node in ast.walk(statement) if isinstance(node, ast.Name)
+            )
+
+    return ModuleSymbols(
+        path,
+        name,
+        ParsedModule(source=source).digest,
+        definitions,
+        imports,
+        sorted(used_names.intersection(imports)),
+    )
+
+
+def index_modules(
+    sources: Sequence[Tuple[str, str]]
+) -> List[Tuple[str, Optional[ModuleSymbols]]]:
+    """Indexa um lote de ``(caminho, código)``; executado no pool de workers.
+
+    Módulos com erro de sintaxe ficam de fora do índice (``None``).
+    """
+    results = []
+    for path, source in sources:
+        try:
+            results.append((path, index_module(path, source)))
+        except (SyntaxError, ValueError):
+            results.append((path, None))
+    return results
+
+
+def _module_statements(statements: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """Comandos executados no nível do módulo, incluindo os de ``if``/``try``."""
+    for statement in statements:
+        yield statement
+        if isinstance(statement, DEFINITION_TYPES):
+            continue
+        for field in ("body", "orelse", "finalbody"):
+            yield from _module_statements(getattr(statement, field, ()))
+        for handler in getattr(statement, "handlers", ()):
+            yield from _module_statements(handler.body)
+
+
+def _absolute_module(package: str, module: Optional[str], level: int) -> Optional[str]:
+    """Resolve o módulo de um ``from ... import`` relativo ao pacote atual."""
+    if not level:
+        return module
+    parts = package.split(".") if package else []
+    if level - 1 > len(parts):
+        return None
+    parts = parts[: len(parts) - (level - 1)]
+    if module:
+        parts.append(module)
+    return ".".join(parts) or None
+
+
+class ProjectIndexStore:
+    """Símbolos dos módulos indexados, persistidos em SQLite.
+
+    Cada módulo é guardado pelo caminho e pelo ``digest`` do código
+    indexado, de modo que projetos diferentes com os mesmos caminhos não
+    substituem as entradas uns dos outros; um módulo só é indexado
+    novamente quando o seu conteúdo muda. Acima de ``max_modules`` entradas
+    (``0`` sem limite) as menos usadas recentemente são removidas. O arquivo
+    é aberto no primeiro uso, e ``path`` vazio mantém o índice apenas em
+    memória. Os métodos fazem I/O síncrono: fora de scripts, chame-os em
+    uma thread.
+    """
+
+    def __init__(self, path: str, max_modules: int = 0):
+        self.path = path
+        self.max_modules = max_modules
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[str, ModuleSymbols]:
+        """Retorna, por caminho, os símbolos guardados com o mesmo ``digest``.
+
+        Os pares são consultados em lotes de ``IN (...)``, dentro do limite de
+        parâmetros do SQLite, e as entradas encontradas são marcadas como
+        usadas.
+        """
+        keys = list(keys)
+        found = {}
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for start in range(0, len(keys), STORE_QUERY_CHUNK):
+                    chunk = keys[start : start + STORE_QUERY_CHUNK]
+                    pairs = ", ".join("(?, ?)" for _ in chunk)
+                    parameters = [value for key in chunk for value in key]
+                    rows = connection.execute(
+                        "SELECT symbols FROM indexed_modules "
+                        f"WHERE (path, digest) IN (VALUES {pairs})",
+                        parameters,
+                    ).fetchall()
+                    if not rows:
+                        continue
+                    connection.execute(
+                        "UPDATE indexed_modules SET used = ? "
+                        f"WHERE (path, digest) IN (VALUES {pairs})",
+                        [now, *parameters],
+                    )
+                    for (symbols,) in rows:
+                        module = ModuleSymbols.from_dict(json.loads(symbols))
+                        found[module.path] = module
+        return found
+
+    def store_many(self, modules: Iterable[ModuleSymbols]) -> None:
+        """Grava os símbolos e remove as entradas que passam de ``max_modules``."""
+        now = time.time()
+        rows = [
+            (module.path, module.digest, json.dumps(module.to_dict()), now)
+            for module in modules
+        ]
+        if not rows:
+            return
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO indexed_modules "
+                    "(path, digest, symbols, used) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                if self.max_modules:
+                    connection.execute(
+                        "DELETE FROM indexed_modules WHERE rowid IN ("
+                        "SELECT rowid FROM indexed_modules "
+                        "ORDER BY used DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                        (self.max_modules,),
+                    )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.path or ":memory:", check_same_thread=False
+            )
+            if self.path:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA busy_timeout=5000")
+            with self._connection:
+                self._connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS indexed_modules (
+                        path TEXT NOT NULL,
+                        digest TEXT NOT NULL,
+                        symbols TEXT NOT NULL,
+                        used REAL NOT NULL,
+                        PRIMARY KEY (path, digest)
+                    )
+                    """
+                )
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS indexed_modules_used "
+                    "ON indexed_modules (used)"
+                )
+        return self._connection
+
+
+project_index_store = ProjectIndexStore(
+    settings.PROJECT_INDEX_PATH, settings.PROJECT_INDEX_MAX_MODULES
+)
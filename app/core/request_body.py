@@ -0,0 +1,180 @@
+import zlib
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+
+# Codificações aceitas em ``Content-Encoding``
+SUPPORTED_ENCODINGS = ("identity", "gzip")
+
+# Tamanho máximo de cada bloco descompactado entregue por vez
+_DECOMPRESS_CHUNK = 256 * 1024
+
+
+class RequestBodyError(Exception):
+    """Corpo rejeitado antes de chegar à aplicação."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class RequestBodyMiddleware:
+    """Middleware ASGI que limita e descompacta o corpo das requisições.
+
+    O limite é verificado pelo ``Content-Length`` antes de qualquer leitura
+    e, durante o streaming, a cada bloco recebido, de modo que um corpo
+    acima do limite é rejeitado com 413 sem ser lido por inteiro nem
+    decodificado como JSON. Corpos com ``Content-Encoding: gzip`` são
+    descompactados aqui, com o limite aplicado ao tamanho descompactado.
+
+    ``limits`` associa sufixos de caminho a limites próprios (por exemplo,
+    os endpoints em lote); os demais caminhos usam ``default_limit``.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        default_limit: int,
+        limits: Sequence[Tuple[str, int]] = (),
+    ):
+        self.app = app
+        self.default_limit = default_limit
+        self.limits = tuple(limits)
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            result = await self._read_body(scope, receive)
+        except RequestBodyError as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code)
+            await response(scope, receive, send)
+            return
+        if result is None:
+            # Cliente desconectou antes de terminar de enviar o corpo
+            return
+        scope, body = result
+
+        replayed = False
+
+        async def replay_receive() -> Dict:
+            # O corpo já lido é entregue de uma vez; as chamadas seguintes
+            # (por exemplo, a espera por ``http.disconnect``) vão ao servidor
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, replay_receive, send)
+
+    def limit_for(self, path: str) -> int:
+        """Retorna o limite de corpo para o caminho."""
+        for suffix, limit in self.limits:
+            if path.endswith(suffix):
+                return limit
+        return self.default_limit
+
+    async def _read_body(
+        self, scope: Dict, receive: Callable
+    ) -> Optional[Tuple[Dict, bytes]]:
+        limit = self.limit_for(scope["path"])
+        content_length, encoding = _body_headers(scope)
+        if encoding not in SUPPORTED_ENCODINGS:
+            raise RequestBodyError(
+                415, f"Content-Encoding não suportado: {encoding or 'vazio'}"
+            )
+        if content_length is not None and content_length > limit:
+            raise _too_large(limit)
+
+        decompressor = (
+            zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == "gzip" else None
+        )
+        chunks: List[bytes] = []
+        received = size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunk = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            received += len(chunk)
+            if received > limit:
+                raise _too_large(limit)
+            if decompressor is not None:
+                size = _decompress(decompressor, chunk, chunks, size, limit)
+            elif chunk:
+                chunks.append(chunk)
+
+        if decompressor is not None:
+            size = _decompress(decompressor, b"", chunks, size, limit, final=True)
+            scope = _decoded_scope(scope, size)
+
+        return scope, b"".join(chunks)
+
+
+def _decompress(
+    decompressor: "zlib._Decompress",
+    data: bytes,
+    chunks: List[bytes],
+    size: int,
+    limit: int,
+    final: bool = False,
+) -> int:
+    """Descompacta ``data`` em blocos, interrompendo ao passar do limite.
+
+    Com ``final`` acrescenta o que restou no descompactador e exige que o
+    conteúdo gzip esteja completo.
+    """
+    try:
+        while data:
+            block = decompressor.decompress(data, _DECOMPRESS_CHUNK)
+            size += len(block)
+            if size > limit:
+                raise _too_large(limit)
+            chunks.append(block)
+            data = decompressor.unconsumed_tail
+        if final:
+            block = decompressor.flush()
+            size += len(block)
+            if size > limit:
+                raise _too_large(limit)
+            chunks.append(block)
+            if not decompressor.eof:
+                raise RequestBodyError(400, "Corpo gzip incompleto")
+    except zlib.error:
+        raise RequestBodyError(400, "Corpo gzip inválido")
+    return size
+
+
+def _body_headers(scope: Dict) -> Tuple[Optional[int], str]:
+    content_length = None
+    encoding = "identity"
+    for name, value in scope.get("headers", ()):
+        if name == b"content-length":
+            try:
+                content_length = int(value)
+            except ValueError:
+                raise RequestBodyError(400, "Content-Length inválido")
+        elif name == b"content-encoding":
+            encoding = value.decode("latin-1").strip().lower()
+    return content_length, encoding
+
+
+def _decoded_scope(scope: Dict, size: int) -> Dict:
+    """Cabeçalhos do corpo já descompactado."""
+    headers = [
+        (name, value)
+        for name, value in scope.get("headers", ())
+        if name not in (b"content-encoding", b"content-length")
+    ]
+    headers.append((b"content-length", str(size).encode("latin-1")))
+    return {**scope, "headers": headers}
+
+
+def _too_large(limit: int) -> RequestBodyError:
+    return RequestBodyError(413, f"Corpo da requisição maior que {limit} bytes")
@@ -0,0 +1,18 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class ModelJSONResponse(JSONResponse):
+    """Resposta JSON serializada diretamente pelo pydantic-core.
+
+    Quando o endpoint retorna o ``response_model`` dentro desta resposta, o
+    FastAPI não converte o modelo em dicionário, não o valida novamente
+    nem passa o resultado pelo ``jsonable_encoder`` antes do ``json.dumps``:
+    o modelo, já validado na construção, é escrito em bytes de uma só vez.
+    Dicionários e listas também são aceitos.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
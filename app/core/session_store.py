@@ -0,0 +1,142 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class SessionStore:
+    """Armazena os contextos de sessão com limite de tamanho e expiração.
+
+    Sessões sem acesso há mais de ``idle_ttl_seconds`` expiram e, quando o
+    limite ``max_sessions`` é atingido, a sessão usada há mais tempo é
+    descartada (LRU). Assim a memória do servidor tem um teto previsível.
+    """
+
+    def __init__(self, max_sessions: int, idle_ttl_seconds: float):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._sessions: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Retorna o contexto da sessão, renovando seu último acesso."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._sessions.get(session_id)
+            if item is None:
+                return None
+            context, last_access = item
+            if now - last_access > self.idle_ttl_seconds:
+                del self._sessions[session_id]
+                self.expirations += 1
+                return None
+            self._sessions[session_id] = (context, now)
+            self._sessions.move_to_end(session_id)
+            return context
+
+    def set(self, session_id: str, context: Any) -> None:
+        """Armazena o contexto da sessão, descartando sessões antigas."""
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (context, now)
+            self._sessions.move_to_end(session_id)
+            self._purge(now)
+
+    def get_or_create(self, session_id: str, factory: Callable[[], Any]) -> Any:
+        """Retorna o contexto existente ou cria um novo com ``factory``."""
+        context = self.get(session_id)
+        if context is None:
+            context = factory()
+            self.set(session_id, context)
+        return context
+
+    def discard(self, session_id: str) -> None:
+        """Remove a sessão, se existir."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def values(self) -> Iterator[Any]:
+        """Itera sobre os contextos armazenados."""
+        with self._lock:
+            contexts = [context for context, _ in self._sessions.values()]
+        return iter(contexts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas de ocupação do armazenamento.
+
+        ``approximate_bytes`` soma a memória dos contextos e dos objetos que
+        eles guardam (``approximate_size``); o cálculo percorre todas as
+        sessões e é feito apenas na coleta.
+        """
+        memories = patterns = approximate_bytes = 0
+        for context in self.values():
+            memories += len(context.memories)
+            patterns += len(context.patterns)
+            approximate_bytes += approximate_size(context)
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "memories": memories,
+            "patterns": patterns,
+            "approximate_bytes": approximate_bytes,
+        }
+
+    def _purge(self, now: float) -> None:
+        # As sessões mais antigas ficam no início do OrderedDict
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access > self.idle_ttl_seconds:
+                self.expirations += 1
+            elif len(self._sessions) > self.max_sessions:
+                self.evictions += 1
+            else:
+                break
+            del self._sessions[session_id]
+
+
+# Valores sem objetos internos a percorrer
+_ATOMIC_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def approximate_size(value: Any) -> int:
+    """Memória aproximada de ``value`` e dos objetos que ele guarda, em bytes.
+
+    Percorre contêineres, ``__dict__`` e ``__slots__`` somando o
+    ``sys.getsizeof`` de cada objeto; objetos alcançados por mais de um
+    caminho são contados uma vez.
+    """
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, _ATOMIC_TYPES):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            if hasattr(item, "__dict__"):
+                stack.append(vars(item))
+            for cls in type(item).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    if hasattr(item, name):
+                        stack.append(getattr(item, name))
+    return size
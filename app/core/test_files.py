@@ -0,0 +1,58 @@
+import os
+import secrets
+from typing import Optional, Tuple
+
+# ``O_BINARY`` evita a conversão de quebras de linha no Windows
+_TEMPORARY_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def mirrored_test_path(module_path: str) -> str:
+    """Caminho do teste gerado para um módulo (``pkg/test_models.py``)."""
+    directory, _, name = module_path.rpartition("/")
+    return f"{directory}/test_{name}" if directory else f"test_{name}"
+
+
+def write_text_atomic(path: str, content: str) -> bool:
+    """Grava o arquivo por inteiro ou não o altera.
+
+    O conteúdo vai para um arquivo temporário no mesmo diretório, que
+    substitui o destino com ``os.replace``; leitores nunca veem um arquivo
+    pela metade. Retorna ``False`` sem tocar no arquivo quando o conteúdo
+    já é o mesmo, para não disparar outras ferramentas que observam a
+    árvore.
+    """
+    data = content.encode("utf-8")
+    try:
+        with open(path, "rb") as current:
+            if current.read() == data:
+                return False
+        mode: Optional[int] = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        # Arquivo novo: o kernel aplica a umask, como em um ``open`` comum
+        mode = None
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = _create_temporary(directory)
+    try:
+        with os.fdopen(descriptor, "wb") as temporary:
+            temporary.write(data)
+            temporary.flush()
+            os.fsync(temporary.fileno())
+        if mode is not None:
+            os.chmod(temporary_path, mode)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+    return True
+
+
+def _create_temporary(directory: str) -> Tuple[int, str]:
+    """Cria um arquivo temporário exclusivo com as permissões padrão (0o666)."""
+    while True:
+        path = os.path.join(directory, f".{secrets.token_hex(8)}.tmp")
+        try:
+            return os.open(path, _TEMPORARY_FLAGS, 0o666), path
+        except FileExistsError:
+            continue
@@ -0,0 +1,108 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.profiling import profiling_active, run_profiled, worker_profiles
+
+WORKER_POOL_MODES = ("thread", "process", "inline")
+
+
+class WorkerPoolBusyError(RuntimeError):
+    """Indica que o pool atingiu o limite de tarefas pendentes."""
+
+
+class WorkerPool:
+    """Executa o trabalho de CPU (parse, análise, renderização, validação)
+    fora do event loop.
+
+    ``mode`` pode ser ``thread``, ``process`` ou ``inline`` (executa no
+    próprio loop, útil para depuração). Quando ``max_pending`` tarefas já
+    estão em andamento novas submissões falham com ``WorkerPoolBusyError``
+    em vez de enfileirar sem limite.
+    """
+
+    def __init__(self, mode: str, max_workers: int, max_pending: int):
+        if mode not in WORKER_POOL_MODES:
+            raise ValueError(
+                f"Modo de pool inválido '{mode}'. Use um de {WORKER_POOL_MODES}"
+            )
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Executa ``func(*args)`` no pool e aguarda o resultado.
+
+        Requisições perfiladas a pedido executam no próprio loop, onde o
+        cProfile está ativo; nas sorteadas pela amostragem a tarefa roda no
+        pool sob o cProfile do worker e as estatísticas vão para o perfil
+        da requisição.
+        """
+        if self.mode == "inline" or profiling_active():
+            return func(*args)
+        collected = worker_profiles()
+        if collected is not None:
+            result, stats = await self._submit(run_profiled, func, *args)
+            if stats is not None:
+                collected.append(stats)
+            return result
+        return await self._submit(func, *args)
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise WorkerPoolBusyError("Servidor ocupado, tente novamente em instantes")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), functools.partial(func, *args)
+            )
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Encerra os workers, aguardando as tarefas em andamento."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna o estado atual do pool."""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="mcp-worker"
+                )
+        return self._executor
+
+
+worker_pool = WorkerPool(
+    mode=settings.WORKER_POOL_MODE,
+    max_workers=settings.WORKER_POOL_SIZE,
+    max_pending=settings.WORKER_POOL_MAX_PENDING,
+)
+
+batch_worker_pool = WorkerPool(
+    mode=settings.BATCH_WORKER_POOL_MODE,
+    max_workers=settings.BATCH_WORKER_POOL_SIZE,
+    max_pending=settings.BATCH_WORKER_POOL_MAX_PENDING,
+)
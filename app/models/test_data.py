@@ -0,0 +1,172 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.models.test_models import TestCase, TestSuite, ValidationIssue
+
+
+class TestCaseData:
+    """Caso de teste usado internamente pelo analisador, gerador e MCP.
+
+    Ao contrário de ``TestCase`` não passa pela validação do pydantic a cada
+    construção; é convertido com ``to_model`` apenas na resposta da API.
+    Listas de asserções e dependências são guardadas como tuplas, que podem
+    ser compartilhadas entre os casos gerados.
+    """
+
+    __slots__ = (
+        "name",
+        "description",
+        "test_code",
+        "assertions",
+        "dependencies",
+        "setup",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        test_code: str,
+        assertions: Iterable[str] = (),
+        dependencies: Iterable[str] = (),
+        setup: Optional[str] = None,
+    ):
+        self.name = name
+        self.description = description
+        self.test_code = test_code
+        self.assertions = tuple(assertions)
+        self.dependencies = tuple(dependencies)
+        self.setup = setup
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TestCaseData):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TestCaseData(name={self.name!r})"
+
+    def to_model(self) -> TestCase:
+        """Converte para o modelo da API, sem revalidar os campos."""
+        return TestCase.model_construct(
+            name=self.name,
+            description=self.description,
+            setup=self.setup,
+            test_code=self.test_code,
+            assertions=list(self.assertions),
+            dependencies=list(self.dependencies),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "setup": self.setup,
+            "test_code": self.test_code,
+            "assertions": list(self.assertions),
+            "dependencies": list(self.dependencies),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TestCaseData":
+        return cls(
+            name=data["name"],
+            description=data["description"],
+            test_code=data["test_code"],
+            assertions=data.get("assertions") or (),
+            dependencies=data.get("dependencies") or (),
+            setup=data.get("setup"),
+        )
+
+    def approximate_size(self) -> int:
+        """Tamanho aproximado do texto do caso de teste, em bytes."""
+        return (
+            len(self.name)
+            + len(self.description)
+            + len(self.test_code)
+            + len(self.setup or "")
+            + sum(map(len, self.assertions))
+            + sum(map(len, self.dependencies))
+        )
+
+    def _fields(self) -> Tuple:
+        return (
+            self.name,
+            self.description,
+            self.test_code,
+            self.assertions,
+            self.dependencies,
+            self.setup,
+        )
+
+
+class TestSuiteData:
+    """Suite de testes interna, convertida para ``TestSuite`` na resposta."""
+
+    __slots__ = ("class_name", "description", "test_cases", "imports", "fixtures")
+
+    def __init__(
+        self,
+        class_name: str,
+        description: str,
+        test_cases: List[TestCaseData],
+        imports: List[str],
+        fixtures: Optional[Dict[str, str]] = None,
+    ):
+        self.class_name = class_name
+        self.description = description
+        self.test_cases = test_cases
+        self.imports = imports
+        self.fixtures = fixtures if fixtures is not None else {}
+
+    def with_test_cases(self, test_cases: List[TestCaseData]) -> "TestSuiteData":
+        """Cópia da suite com outros casos de teste."""
+        return TestSuiteData(
+            self.class_name, self.description, test_cases, self.imports, self.fixtures
+        )
+
+    def approximate_size(self) -> int:
+        """Tamanho aproximado do texto da suite, em bytes."""
+        return (
+            len(self.class_name)
+            + len(self.description)
+            + sum(test_case.approximate_size() for test_case in self.test_cases)
+            + sum(map(len, self.imports))
+            + sum(len(name) + len(code) for name, code in self.fixtures.items())
+        )
+
+    def to_model(self) -> TestSuite:
+        """Converte para o modelo da API, sem revalidar os campos."""
+        return TestSuite.model_construct(
+            class_name=self.class_name,
+            description=self.description,
+            test_cases=[test_case.to_model() for test_case in self.test_cases],
+            imports=list(self.imports),
+            fixtures=dict(self.fixtures),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "class_name": self.class_name,
+            "description": self.description,
+            "test_cases": [test_case.to_dict() for test_case in self.test_cases],
+            "imports": list(self.imports),
+            "fixtures": dict(self.fixtures),
+        }
+
+
+class IssueData(NamedTuple):
+    """Problema de validação guardado na memória das sessões MCP."""
+
+    type: str
+    description: str
+    line_number: Optional[int]
+    suggestion: str
+
+    @classmethod
+    def from_issue(cls, issue: ValidationIssue) -> "IssueData":
+        return cls(issue.type, issue.description, issue.line_number, issue.suggestion)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from enum import Enum
+from app.core.config import settings
 
 
 class TestFramework(str, Enum):
@@ -9,7 +10,11 @@ class TestFramework(str, Enum):
 
 
 class CodeAnalysisRequest(BaseModel):
-    code: str = Field(..., description="Código fonte a ser analisado")
+    code: str = Field(
+        ...,
+        max_length=settings.MAX_CODE_SIZE,
+        description="Código fonte a ser analisado",
+    )
     framework: TestFramework = Field(
         default=TestFramework.PYTEST, description="Framework de teste a ser utilizado"
     )
@@ -37,16 +42,119 @@ class TestSuite(BaseModel):
     )
 
 
+class FunctionMetrics(BaseModel):
+    name: str = Field(..., description="Nome qualificado da função")
+    line_number: int = Field(..., description="Linha da definição")
+    complexity: int = Field(..., description="Complexidade ciclomática")
+    test_count: int = Field(..., description="Casos de teste gerados para a função")
+    coverage_estimate: float = Field(
+        ..., description="Fração dos caminhos exercitada pelos testes gerados"
+    )
+
+
 class TestAnalysisResponse(BaseModel):
     test_suite: TestSuite
     coverage_estimate: float = Field(..., description="Estimativa de cobertura")
     suggestions: List[str] = Field(..., description="Sugestões de melhoria")
     complexity_score: float = Field(..., description="Pontuação de complexidade")
+    function_metrics: List[FunctionMetrics] = Field(
+        default_factory=list, description="Complexidade e cobertura por função"
+    )
+    digest: Optional[str] = Field(
+        None, description="Hash do código, usado como base em /analyze/delta"
+    )
+
+
+class DeltaAnalysisRequest(CodeAnalysisRequest):
+    base_digest: Optional[str] = Field(
+        None, description="Digest de uma análise anterior do mesmo arquivo"
+    )
+
+
+class TestSuiteDelta(BaseModel):
+    class_name: str = Field(..., description="Nome da classe de teste")
+    description: str = Field(..., description="Descrição da suite de testes")
+    imports: List[str] = Field(..., description="Imports necessários")
+    fixtures: Dict[str, str] = Field(
+        default_factory=dict, description="Fixtures necessárias"
+    )
+    added: List[TestCase] = Field(..., description="Casos de teste novos")
+    removed: List[str] = Field(..., description="Nomes dos casos removidos")
+    changed: List[TestCase] = Field(..., description="Casos de teste alterados")
+    full: bool = Field(
+        default=False,
+        description="A base não estava disponível e ``added`` contém a suite "
+        "completa",
+    )
+
+
+class TestAnalysisDeltaResponse(BaseModel):
+    digest: str = Field(..., description="Hash do código analisado")
+    base_digest: Optional[str] = Field(None, description="Digest usado como base")
+    delta: TestSuiteDelta
+    coverage_estimate: float = Field(..., description="Estimativa de cobertura")
+    suggestions: List[str] = Field(..., description="Sugestões de melhoria")
+    complexity_score: float = Field(..., description="Pontuação de complexidade")
+    function_metrics: List[FunctionMetrics] = Field(
+        default_factory=list, description="Complexidade e cobertura por função"
+    )
+
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[CodeAnalysisRequest] = Field(
+        ..., description="Arquivos a serem analisados"
+    )
+
+
+class BatchAnalysisItem(BaseModel):
+    index: int = Field(..., description="Posição do arquivo na requisição")
+    file_path: Optional[str] = Field(None, description="Caminho do arquivo")
+    result: Optional[TestAnalysisResponse] = Field(
+        None, description="Resultado da análise, quando bem-sucedida"
+    )
+    error: Optional[str] = Field(None, description="Erro ocorrido na análise")
+
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchAnalysisItem] = Field(
+        ..., description="Resultados por arquivo, na ordem da requisição"
+    )
+    succeeded: int = Field(..., description="Quantidade de arquivos analisados")
+    failed: int = Field(..., description="Quantidade de arquivos com erro")
+
+
+class BatchGenerationItem(BaseModel):
+    index: int = Field(..., description="Posição do arquivo na requisição")
+    file_path: Optional[str] = Field(None, description="Caminho do arquivo")
+    test_code: Optional[str] = Field(
+        None, description="Código de teste gerado, quando bem-sucedido"
+    )
+    error: Optional[str] = Field(None, description="Erro ocorrido na geração")
+
+
+class ProjectGenerationItem(BaseModel):
+    path: str = Field(..., description="Caminho do arquivo no projeto")
+    module: str = Field(..., description="Nome importável do módulo")
+    test_code: Optional[str] = Field(
+        None, description="Código de teste gerado, quando bem-sucedido"
+    )
+    test_count: int = Field(0, description="Número de casos de teste gerados")
+    dependencies: List[str] = Field(
+        default_factory=list,
+        description="Definições de outros módulos do projeto substituídas por mocks",
+    )
+    error: Optional[str] = Field(None, description="Erro ocorrido na geração")
 
 
 class TestValidationRequest(BaseModel):
-    test_code: str = Field(..., description="Código do teste a ser validado")
-    source_code: Optional[str] = Field(None, description="Código fonte relacionado")
+    test_code: str = Field(
+        ...,
+        max_length=settings.MAX_CODE_SIZE,
+        description="Código do teste a ser validado",
+    )
+    source_code: Optional[str] = Field(
+        None, max_length=settings.MAX_CODE_SIZE, description="Código fonte relacionado"
+    )
     framework: TestFramework = Field(default=TestFramework.PYTEST)
 
 
@@ -66,3 +174,68 @@ class TestValidationResponse(BaseModel):
     maintainability_score: float = Field(
         ..., description="Pontuação de manutenibilidade"
     )
+
+
+class TestFileValidationRequest(TestValidationRequest):
+    file_path: Optional[str] = Field(None, description="Caminho do arquivo (opcional)")
+
+
+class BatchValidationRequest(BaseModel):
+    items: List[TestFileValidationRequest] = Field(
+        ..., description="Arquivos de teste a serem validados"
+    )
+
+
+class TestFunctionValidation(BaseModel):
+    name: str = Field(..., description="Nome da função de teste")
+    line_number: int = Field(..., description="Linha da definição do teste")
+    is_valid: bool = Field(..., description="Indica se o teste é válido")
+    issues: List[ValidationIssue] = Field(
+        default_factory=list, description="Problemas encontrados no teste"
+    )
+    isolation_score: float = Field(..., description="Pontuação de isolamento")
+    maintainability_score: float = Field(
+        ..., description="Pontuação de manutenibilidade"
+    )
+
+
+class TestFileValidation(BaseModel):
+    is_valid: bool = Field(..., description="Indica se todos os testes são válidos")
+    test_count: int = Field(..., description="Número de funções de teste validadas")
+    tests: List[TestFunctionValidation] = Field(
+        default_factory=list, description="Resultado de cada função de teste"
+    )
+    issues: List[ValidationIssue] = Field(
+        default_factory=list, description="Problemas do arquivo (erro de sintaxe)"
+    )
+    isolation_score: float = Field(
+        ..., description="Média das pontuações de isolamento dos testes"
+    )
+    maintainability_score: float = Field(
+        ..., description="Média das pontuações de manutenibilidade dos testes"
+    )
+
+
+class BatchValidationItem(BaseModel):
+    index: int = Field(..., description="Posição do arquivo na requisição")
+    file_path: Optional[str] = Field(None, description="Caminho do arquivo")
+    result: Optional[TestFileValidation] = Field(
+        None, description="Resultado da validação, quando bem-sucedida"
+    )
+    error: Optional[str] = Field(None, description="Erro ocorrido na validação")
+
+
+class BatchValidationResponse(BaseModel):
+    results: List[BatchValidationItem] = Field(
+        ..., description="Resultados por arquivo, na ordem da requisição"
+    )
+    succeeded: int = Field(..., description="Quantidade de arquivos validados")
+    failed: int = Field(..., description="Quantidade de arquivos com erro")
+    test_count: int = Field(..., description="Total de funções de teste validadas")
+    invalid_tests: int = Field(..., description="Testes com algum problema")
+    isolation_score: float = Field(
+        ..., description="Média das pontuações de isolamento de todos os testes"
+    )
+    maintainability_score: float = Field(
+        ..., description="Média das pontuações de manutenibilidade de todos os testes"
+    )
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from app.core.analysis_cache import AnalysisCache
+from app.core.parsed_module import ParsedModule
+from app.core.worker_pool import WorkerPool
+from app.models.test_models import TestFramework
+from app.services.project_analyzer import iter_python_files, read_source
+from app.services.test_analyzer import TestAnalyzer
+from app.services.test_generator import TestGenerator
+from app.services.test_validator import TestValidator
+
+BATCH_COMMANDS = ("analyze", "generate", "validate")
+
+# Arquivos enviados por tarefa ao pool de processos
+MAX_CHUNK_SIZE = 64
+
+
+class BatchTask(NamedTuple):
+    """Arquivo a processar: ``path`` é o caminho exibido nos resultados."""
+
+    command: str
+    path: str
+    full_path: str
+    framework: TestFramework
+
+
+class BatchStats:
+    """Contadores de uma execução em lote."""
+
+    __slots__ = ("files", "errors", "invalid", "test_cases", "bytes", "start")
+
+    def __init__(self):
+        self.files = 0
+        self.errors = 0
+        self.invalid = 0
+        self.test_cases = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.files += 1
+        self.bytes += result.get("bytes", 0)
+        if result.get("error") is not None:
+            self.errors += 1
+        if result.get("is_valid") is False:
+            self.invalid += 1
+        self.test_cases += result.get("test_count", 0)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def summary(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"{self.files} arquivo(s) em {elapsed:.2f}s "
+            f"({self.files / elapsed:.1f} arquivos/s, "
+            f"{self.bytes / elapsed / 1024 / 1024:.2f} MB/s); "
+            f"{self.test_cases} caso(s) de teste, {self.invalid} inválido(s), "
+            f"{self.errors} erro(s)"
+        )
+
+
+def collect_tasks(
+    command: str, paths: Iterable[str], framework: TestFramework
+) -> List[BatchTask]:
+    """Expande os caminhos (arquivos ou diretórios) em tarefas.
+
+    Os resultados usam o caminho relativo ao diretório atual quando o
+    arquivo está dentro dele.
+    """
+    tasks = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = [full_path for _, full_path in iter_python_files(path)]
+        else:
+            files = [path]
+        for full_path in files:
+            tasks.append(
+                BatchTask(command, _display_path(full_path), full_path, framework)
+            )
+    return tasks
+
+
+def run_batch(tasks: List[BatchTask], workers: int) -> Iterator[Dict[str, Any]]:
+    """Processa as tarefas em um pool de processos, na ordem recebida.
+
+    Cada processo lê o arquivo e executa o analisador, o gerador ou o
+    validador diretamente; só o resultado, já em tipos simples, volta ao
+    processo principal. Com ``workers=1`` tudo roda no processo atual.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        yield from map(run_task, tasks)
+        return
+
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(tasks) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(run_task, tasks, chunksize=chunk_size)
+
+
+def run_task(task: BatchTask) -> Dict[str, Any]:
+    """Processa um arquivo; executado nos processos do pool."""
+    start = time.perf_counter()
+    result: Dict[str, Any] = {"path": task.path}
+    try:
+        source = read_source(task.path, task.full_path)
+    except OSError as e:
+        result["error"] = str(e)
+        return result
+    if source.error is not None:
+        result["error"] = source.error
+        return result
+    result["bytes"] = len(source.source)
+
+    try:
+        result.update(_COMMANDS[task.command](source.source, task.framework))
+    except Exception as e:
+        result["error"] = str(e)
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+class _WorkerServices:
+    """Serviços de cada processo, executados no próprio processo.
+
+    Sem cache de análise: em um lote cada arquivo é visto uma única vez.
+    """
+
+    def __init__(self):
+        inline_pool = WorkerPool(mode="inline", max_workers=1, max_pending=1)
+        cache = AnalysisCache(max_entries=0, ttl_seconds=0)
+        self.analyzer = TestAnalyzer(cache=cache, worker_pool=inline_pool)
+        self.generator = TestGenerator(cache=cache, worker_pool=inline_pool)
+        self.validator = TestValidator(worker_pool=inline_pool)
+        self.loop = asyncio.new_event_loop()
+
+
+_services: Optional[_WorkerServices] = None
+
+
+def _get_services() -> _WorkerServices:
+    global _services
+    if _services is None:
+        _services = _WorkerServices()
+    return _services
+
+
+def _analyze(code: str, framework: TestFramework) -> Dict[str, Any]:
+    services = _get_services()
+    module = ParsedModule.from_source(code)
+    analysis = services.loop.run_until_complete(
+        services.analyzer.analyze(module, framework)
+    )
+    return {
+        "test_suite": analysis.test_suite.to_dict(),
+        "test_count": len(analysis.test_suite.test_cases),
+        "coverage_estimate": analysis.coverage_estimate,
+        "complexity_score": analysis.complexity_score,
+        "function_metrics": [
+            metric.model_dump() for metric in analysis.function_metrics
+        ],
+        "digest": module.digest,
+    }
+
+
+def _generate(code: str, framework: TestFramework) -> Dict[str, Any]:
+    services = _get_services()
+    module = ParsedModule.from_source(code)
+    test_suite = services.loop.run_until_complete(
+        services.generator.analyzer.analyze_code(module, framework)
+    )
+    test_code = services.generator.template_engine.render_test_suite(
+        test_suite, framework
+    )
+    return {"test_code": test_code, "test_count": len(test_suite.test_cases)}
+
+
+def _validate(code: str, framework: TestFramework) -> Dict[str, Any]:
+    services = _get_services()
+    result = services.loop.run_until_complete(
+        services.validator.validate_test_file(code)
+    )
+    return result.model_dump()
+
+
+_COMMANDS = {"analyze": _analyze, "generate": _generate, "validate": _validate}
+
+
+def _display_path(path: str) -> str:
+    relative = os.path.relpath(path)
+    if relative.startswith(os.pardir):
+        return os.path.abspath(path)
+    return relative.replace(os.sep, "/")
@@ -0,0 +1,379 @@
+import asyncio
+import io
+import os
+import re
+import tarfile
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from app.core.analysis_cache import AnalysisCache
+from app.core.config import settings
+from app.core.parsed_module import ParsedModule
+from app.core.project_index import (
+    ModuleSymbols,
+    ProjectIndex,
+    ProjectIndexStore,
+    ProjectSymbol,
+    index_modules,
+    module_name_for,
+    project_index_store,
+)
+from app.core.worker_pool import WorkerPool, batch_worker_pool
+from app.models.test_data import TestSuiteData
+from app.models.test_models import ProjectGenerationItem, TestFramework
+from app.services.test_analyzer import TestAnalyzer
+from app.services.test_generator import TestTemplateEngine
+
+# Diretórios ignorados ao percorrer um projeto
+SKIPPED_DIRECTORIES = ("__pycache__", "site-packages", "node_modules")
+
+# Módulos indexados por tarefa enviada ao pool de workers
+MAX_INDEX_CHUNK = 64
+
+_CAMEL_CASE_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+class ProjectSource(NamedTuple):
+    """Arquivo ``.py`` de um projeto, com caminho relativo à raiz."""
+
+    path: str
+    source: Optional[str]
+    error: Optional[str] = None
+
+
+def iter_python_files(
+    root: str, excluded: Sequence[str] = ()
+) -> Iterator[Tuple[str, str]]:
+    """Percorre os arquivos ``.py`` de um diretório, ignorando ambientes virtuais.
+
+    Retorna pares ``(caminho relativo à raiz, caminho completo)``; os
+    diretórios em ``excluded`` (caminhos completos) não são percorridos.
+    """
+    excluded = {os.path.abspath(path) for path in excluded}
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(
+            name
+            for name in subdirectories
+            if not name.startswith(".")
+            and name not in SKIPPED_DIRECTORIES
+            and os.path.abspath(os.path.join(directory, name)) not in excluded
+            and not os.path.exists(os.path.join(directory, name, "pyvenv.cfg"))
+        )
+        for name in sorted(files):
+            if name.endswith(".py"):
+                full_path = os.path.join(directory, name)
+                yield os.path.relpath(full_path, root).replace(os.sep, "/"), full_path
+
+
+def read_source(path: str, full_path: str) -> ProjectSource:
+    """Lê um arquivo do projeto; arquivos grandes ou fora do UTF-8 viram erro."""
+    if os.path.getsize(full_path) > settings.MAX_CODE_SIZE:
+        return ProjectSource(path, None, _too_large_error())
+    with open(full_path, "rb") as source_file:
+        return _decode_source(path, source_file.read())
+
+
+def load_directory(root: str) -> List[ProjectSource]:
+    """Lê os módulos Python de um diretório, ignorando ambientes virtuais."""
+    return [read_source(path, full_path) for path, full_path in iter_python_files(root)]
+
+
+class ProjectTooLargeError(ValueError):
+    """Indica que o projeto excede o limite de módulos ou de bytes."""
+
+
+def load_tarball(
+    data: bytes, max_modules: int = 0, max_bytes: int = 0
+) -> List[ProjectSource]:
+    """Lê os módulos Python de um arquivo tar (compactado ou não).
+
+    Nada é extraído para o disco. Quando todos os arquivos estão sob um
+    mesmo diretório que não é um pacote (``projeto-1.0/``), ele é removido
+    dos caminhos. ``tarfile.TarError`` é propagado para arquivos inválidos.
+
+    A leitura para com ``ProjectTooLargeError`` assim que o arquivo passa de
+    ``max_modules`` módulos ou de ``max_bytes`` descompactados (cabeçalhos e
+    membros ignorados incluídos), antes de descompactar o restante; ``0``
+    desativa o limite.
+    """
+    members = {}
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as archive:
+        for member in archive:
+            # Posição do fim do membro no fluxo descompactado: avançar até o
+            # próximo cabeçalho descompacta tudo até aqui
+            if max_bytes and member.offset_data + member.size > max_bytes:
+                raise ProjectTooLargeError(
+                    f"Máximo de {max_bytes} bytes descompactados por projeto"
+                )
+            path = member.name
+            while path.startswith("./"):
+                path = path[2:]
+            parts = path.split("/")
+            if (
+                not member.isfile()
+                or not path.endswith(".py")
+                or path.startswith("/")
+                or ".." in parts
+            ):
+                continue
+            if max_modules and len(members) >= max_modules:
+                raise ProjectTooLargeError(
+                    f"Máximo de {max_modules} módulos por projeto"
+                )
+            if member.size > settings.MAX_CODE_SIZE:
+                members[path] = None
+            else:
+                members[path] = archive.extractfile(member).read()
+
+    prefix = _common_root(members)
+    sources = []
+    for path in sorted(members):
+        relative = path[len(prefix) :]
+        content = members[path]
+        if content is None:
+            sources.append(ProjectSource(relative, None, _too_large_error()))
+        else:
+            sources.append(_decode_source(relative, content))
+    return sources
+
+
+def is_test_module(path: str) -> bool:
+    """Indica se o arquivo já é um módulo de testes (não recebe testes gerados)."""
+    name = path.rpartition("/")[2]
+    return (
+        name.startswith("test_") or name.endswith("_test.py") or name == "conftest.py"
+    )
+
+
+class ProjectAnalyzer:
+    """Gera suites de teste para todos os módulos de um projeto.
+
+    Um índice de símbolos com as definições e imports de cada módulo é
+    montado em paralelo no pool de workers e persistido; em execuções
+    seguintes só os módulos alterados são indexados novamente. Com o índice
+    cada suite importa as definições do módulo testado e recebe fixtures
+    que substituem por mocks as classes e funções vindas de outros módulos
+    do projeto.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[AnalysisCache] = None,
+        worker_pool: Optional[WorkerPool] = None,
+        index_store: Optional[ProjectIndexStore] = None,
+    ):
+        self.worker_pool = worker_pool if worker_pool is not None else batch_worker_pool
+        self.index_store = (
+            index_store if index_store is not None else project_index_store
+        )
+        self.analyzer = TestAnalyzer(cache=cache, worker_pool=self.worker_pool)
+        self.template_engine = TestTemplateEngine()
+
+    async def build_index(self, sources: Sequence[ProjectSource]) -> ProjectIndex:
+        """Monta o índice do projeto, reaproveitando os módulos inalterados.
+
+        Módulos de teste ficam de fora: o código do projeto não os importa.
+        """
+        digests = {
+            source.path: ParsedModule(source=source.source).digest
+            for source in sources
+            if source.source is not None
+            and module_name_for(source.path)[0]
+            and not is_test_module(source.path)
+        }
+        # As consultas ao SQLite não bloqueiam o event loop
+        stored = await asyncio.to_thread(self.index_store.get_many, digests.items())
+        missing = [
+            (source.path, source.source)
+            for source in sources
+            if source.path in digests and source.path not in stored
+        ]
+
+        indexed: List[ModuleSymbols] = []
+        if missing:
+            # Lotes pequenos o bastante para ocupar todos os workers
+            chunk_size = max(
+                1,
+                min(
+                    MAX_INDEX_CHUNK, len(missing) // (self.worker_pool.max_workers * 4)
+                ),
+            )
+            semaphore = asyncio.Semaphore(self.worker_pool.max_workers)
+
+            async def index_chunk(chunk):
+                async with semaphore:
+                    return await self.worker_pool.run(index_modules, chunk)
+
+            chunks = await asyncio.gather(
+                *(
+                    index_chunk(missing[start : start + chunk_size])
+                    for start in range(0, len(missing), chunk_size)
+                )
+            )
+            indexed = [
+                symbols
+                for chunk in chunks
+                for _, symbols in chunk
+                if symbols is not None
+            ]
+            await asyncio.to_thread(self.index_store.store_many, indexed)
+
+        return ProjectIndex(
+            list(stored.values()) + indexed, indexed=len(indexed), reused=len(stored)
+        )
+
+    async def iter_generate(
+        self,
+        sources: Sequence[ProjectSource],
+        framework: TestFramework,
+        index: Optional[ProjectIndex] = None,
+    ) -> AsyncIterator[ProjectGenerationItem]:
+        """Gera os testes de cada módulo, emitindo-os assim que ficam prontos.
+
+        Módulos de teste (``test_*.py``, ``conftest.py``) não recebem
+        testes gerados. Um erro inesperado em um worker é propagado ao
+        consumidor depois que os demais terminam.
+        """
+        if index is None:
+            index = await self.build_index(sources)
+
+        concurrency = self.worker_pool.max_workers
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        pending_sources = iter(
+            [source for source in sources if not is_test_module(source.path)]
+        )
+        stopped = asyncio.Event()
+
+        async def worker() -> None:
+            try:
+                for source in pending_sources:
+                    await queue.put(
+                        await self.generate_module(source, index, framework)
+                    )
+            finally:
+                # Sem consumidor (iteração encerrada) ninguém esvazia a fila
+                if not stopped.is_set():
+                    await queue.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            finished = 0
+            while finished < len(workers):
+                item = await queue.get()
+                if item is None:
+                    finished += 1
+                else:
+                    yield item
+            await asyncio.gather(*workers)
+        finally:
+            stopped.set()
+            for task in workers:
+                task.cancel()
+
+    async def generate_module(
+        self, source: ProjectSource, index: ProjectIndex, framework: TestFramework
+    ) -> ProjectGenerationItem:
+        """Gera a suite de um módulo usando o índice do projeto."""
+        module_name = module_name_for(source.path)[0]
+        if source.error is not None:
+            return ProjectGenerationItem(
+                path=source.path, module=module_name, error=source.error
+            )
+        try:
+            test_suite = await self.analyzer.analyze_code(source.source, framework)
+            symbols = index.get(module_name)
+            dependencies = index.dependencies(symbols) if symbols is not None else []
+            if symbols is not None:
+                test_suite = project_test_suite(test_suite, symbols, dependencies)
+            test_code = await self.worker_pool.run(
+                self.template_engine.render_test_suite, test_suite, framework
+            )
+        except Exception as e:
+            return ProjectGenerationItem(
+                path=source.path, module=module_name, error=str(e)
+            )
+        return ProjectGenerationItem(
+            path=source.path,
+            module=module_name,
+            test_code=test_code,
+            test_count=len(test_suite.test_cases),
+            dependencies=[
+                f"{dependency.module}.{dependency.name}" for dependency in dependencies
+            ],
+        )
+
+
+def project_test_suite(
+    test_suite: TestSuiteData,
+    symbols: ModuleSymbols,
+    dependencies: List[ProjectSymbol],
+) -> TestSuiteData:
+    """Acrescenta à suite os imports do módulo testado e os mocks do projeto.
+
+    As definições de outros módulos são substituídas onde o módulo testado
+    as procura (``patch("pkg.service.Repository")``), e não onde foram
+    definidas.
+    """
+    imports = list(test_suite.imports)
+    tested = sorted(
+        name
+        for name, kind in symbols.definitions.items()
+        if kind in ("class", "function")
+    )
+    if symbols.name and tested:
+        imports.append(f"{symbols.name} import {', '.join(tested)}")
+
+    fixtures: Dict[str, str] = dict(test_suite.fixtures)
+    for dependency in dependencies:
+        fixture_name = (
+            "mock_" + _CAMEL_CASE_BOUNDARY.sub("_", dependency.local_name).lower()
+        )
+        fixtures[
+            fixture_name
+        ] = f"""
+        @pytest.fixture
+        def {fixture_name}():
+            # {dependency.name} vem de {dependency.module}
+            with patch("{symbols.name}.{dependency.local_name}") as mock:
+                yield mock
+        """
+    if dependencies:
+        imports.append("unittest.mock import patch")
+
+    return TestSuiteData(
+        test_suite.class_name,
+        test_suite.description,
+        test_suite.test_cases,
+        imports,
+        fixtures,
+    )
+
+
+def _decode_source(path: str, content: bytes) -> ProjectSource:
+    try:
+        return ProjectSource(path, content.decode("utf-8"))
+    except UnicodeDecodeError:
+        return ProjectSource(path, None, "O código deve estar em UTF-8")
+
+
+def _too_large_error() -> str:
+    return f"Código maior que {settings.MAX_CODE_SIZE} bytes"
+
+
+def _common_root(paths: Sequence[str]) -> str:
+    """Diretório comum a todos os caminhos, quando não é um pacote."""
+    roots = {path.split("/", 1)[0] for path in paths if "/" in path}
+    if len(roots) != 1 or any("/" not in path for path in paths):
+        return ""
+    root = roots.pop()
+    if f"{root}/__init__.py" in paths:
+        return ""
+    return root + "/"
@@ -1,67 +1,283 @@
 import ast
-from typing import List, Dict, Optional
-from app.models.test_models import TestCase, TestSuite, TestFramework, ValidationIssue
-from app.core.mcp_context import MCPContext
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
+from app.models.test_models import (
+    FunctionMetrics,
+    TestSuiteDelta,
+    TestFramework,
+    ValidationIssue,
+)
+from app.models.test_data import TestCaseData, TestSuiteData
+from app.core.analysis_cache import AnalysisCache, analysis_cache, definition_cache
+from app.core.mcp_context import MCPContext, mcp_context as default_mcp_context
+from app.core.metrics import metrics
+from app.core.parsed_module import (
+    DefinitionSymbol,
+    FunctionProfile,
+    ParsedModule,
+    SymbolTable,
+    as_parsed_module,
+    decision_weight,
+)
+from app.core.worker_pool import WorkerPool, worker_pool as default_worker_pool
+
+# Nomes que, usados no código analisado, viram imports da suite
+TEST_HELPER_NAMES = ("pytest", "mock", "patch")
+
+# Asserções dos casos gerados, compartilhadas entre todos eles
+INIT_ASSERTIONS = ("assert instance is not None",)
+METHOD_ASSERTIONS = ("assert result is not None",)
+BASIC_ASSERTIONS = (
+    "assert result is not None",
+    "assert isinstance(result, (str, int, float, bool, list, dict))",
+)
+EDGE_CASE_ASSERTIONS = (
+    "assert result is not None",
+    "assert not isinstance(result, Exception)",
+)
 
 
 class TestAnalyzer:
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[AnalysisCache] = None,
+        worker_pool: Optional[WorkerPool] = None,
+        mcp_context: Optional[MCPContext] = None,
+    ):
         self.ast_analyzer = ASTAnalyzer()
         self.complexity_calculator = ComplexityCalculator()
-        self.mcp_context = MCPContext()
+        self.mcp_context = (
+            mcp_context if mcp_context is not None else default_mcp_context
+        )
+        self.cache = cache if cache is not None else analysis_cache
+        self.worker_pool = (
+            worker_pool if worker_pool is not None else default_worker_pool
+        )
 
-    async def analyze_code(self, code: str, framework: TestFramework) -> TestSuite:
+    async def analyze_code(
+        self,
+        code: Union[str, ParsedModule],
+        framework: TestFramework,
+        session_id: Optional[str] = None,
+    ) -> TestSuiteData:
         """Analisa o código fonte e gera uma suite de testes apropriada."""
-        # Análise do AST para identificar classes e métodos
-        ast_tree = ast.parse(code)
-        classes = self.ast_analyzer.extract_classes(ast_tree)
-        functions = self.ast_analyzer.extract_functions(ast_tree)
-
-        # Gera casos de teste para cada elemento encontrado
-        test_cases = []
-        imports = ["pytest", "unittest.mock"]
+        return (await self.analyze(code, framework, session_id)).test_suite
+
+    async def analyze(
+        self,
+        code: Union[str, ParsedModule],
+        framework: TestFramework,
+        session_id: Optional[str] = None,
+    ) -> "CodeAnalysis":
+        """Analisa o código fonte, retornando a suite e as métricas por função.
+
+        Com ``session_id`` a suite alimenta o contexto MCP da sessão e recebe
+        os testes sugeridos por ele.
+        """
+        module = as_parsed_module(code, lazy=True)
+        analysis = await self._get_analysis(module, framework)
+        return await self._apply_suggestions(module, analysis, session_id)
+
+    async def analyze_delta(
+        self,
+        code: Union[str, ParsedModule],
+        framework: TestFramework,
+        base_digest: Optional[str],
+        session_id: Optional[str] = None,
+    ) -> Tuple["CodeAnalysis", TestSuiteDelta]:
+        """Analisa o código e calcula a diferença para uma análise anterior.
+
+        ``base_digest`` é o ``digest`` de uma versão anterior do mesmo
+        arquivo. Quando essa versão não está mais no cache a diferença é
+        marcada com ``full`` e traz todos os casos de teste como novos.
+        Os testes sugeridos pelo MCP não fazem parte da diferença.
+        """
+        module = as_parsed_module(code, lazy=True)
+        base = self.cache.get_analysis(base_digest, framework) if base_digest else None
+        analysis = await self._get_analysis(module, framework)
+        delta = diff_test_suites(
+            base.test_suite if base is not None else None, analysis.test_suite
+        )
+        return await self._apply_suggestions(module, analysis, session_id), delta
+
+    async def _get_analysis(
+        self, module: ParsedModule, framework: TestFramework
+    ) -> "CodeAnalysis":
+        """Retorna a análise do cache ou a calcula no pool de workers."""
+        # Código já analisado não passa novamente pelo parse
+        with metrics.stage("analyze", "cache_lookup"):
+            analysis = self.cache.get_analysis(module.digest, framework)
+        if analysis is None:
+            with metrics.stage("analyze", "analysis"):
+                analysis = await self.worker_pool.run(build_code_analysis, module)
+            self.cache.store_analysis(
+                module.digest, framework, analysis, analysis.approximate_size()
+            )
+        module.function_profiles = analysis.function_profiles
+        return analysis
+
+    async def _apply_suggestions(
+        self,
+        module: ParsedModule,
+        analysis: "CodeAnalysis",
+        session_id: Optional[str],
+    ) -> "CodeAnalysis":
+        """Aprende com a suite gerada e acrescenta os testes sugeridos."""
+        if not session_id:
+            return analysis
+        test_suite = analysis.test_suite
 
         # Obtém sugestões do contexto MCP
-        suggestions = await self.mcp_context.get_test_suggestions(code)
-
-        for cls in classes:
-            class_tests = self._generate_class_tests(cls)
-            test_cases.extend(class_tests)
-            imports.extend(self._get_required_imports(cls))
-
-            # Aprende com os testes gerados
-            for test_case in class_tests:
-                await self.mcp_context.learn_from_success(test_case)
-
-        for func in functions:
-            func_tests = self._generate_function_tests(func)
-            test_cases.extend(func_tests)
-            imports.extend(self._get_required_imports(func))
+        suggestions = await self.mcp_context.get_test_suggestions(session_id, module)
 
-            # Aprende com os testes gerados
-            for test_case in func_tests:
-                await self.mcp_context.learn_from_success(test_case)
+        # Aprende com os testes gerados
+        await self.mcp_context.learn_from_test_cases(session_id, test_suite.test_cases)
 
         # Aplica sugestões do MCP
         if suggestions:
+            test_cases = list(test_suite.test_cases)
             for suggestion in suggestions:
                 test_cases.append(
-                    TestCase(
+                    TestCaseData(
                         name=f"test_suggested_{len(test_cases)}",
                         description=suggestion,
                         test_code="# TODO: Implementar teste sugerido\npass",
-                        assertions=[],
-                        dependencies=[],
                     )
                 )
+            test_suite = test_suite.with_test_cases(test_cases)
+            analysis = CodeAnalysis(
+                test_suite, analysis.function_profiles, analysis.function_metrics
+            )
+
+        return analysis
+
+    def _build_code_analysis(self, module: ParsedModule) -> "CodeAnalysis":
+        """Gera a suite de testes e as métricas a partir da estrutura do código."""
+        with metrics.stage("analyze", "parse"):
+            module.tree
+
+        # Análise do AST para identificar classes e métodos
+        with metrics.stage("analyze", "index"):
+            classes = self.ast_analyzer.extract_classes(module)
+            functions = self.ast_analyzer.extract_functions(module)
+
+        with metrics.stage("analyze", "generate"):
+            generated = self._generate_definitions(module)
+
+        # Monta os casos de teste de cada elemento encontrado
+        test_cases = []
+        imports = ["pytest", "unittest.mock"]
+
+        for node in classes + functions:
+            definition_tests = generated[id(node)]
+            test_cases.extend(definition_tests.test_cases)
+            imports.extend(definition_tests.imports)
 
-        return TestSuite(
+        test_counts = {
+            key: definition_tests.test_count
+            for key, definition_tests in generated.items()
+        }
+
+        test_suite = TestSuiteData(
             class_name=self._generate_test_class_name(classes, functions),
             description=self._generate_suite_description(classes, functions),
             test_cases=test_cases,
             imports=list(set(imports)),
             fixtures=self._generate_fixtures(classes, functions),
         )
+        with metrics.stage("analyze", "metrics"):
+            function_metrics = self._calculate_function_metrics(module, test_counts)
+        return CodeAnalysis(test_suite, module.function_profiles, function_metrics)
+
+    def _generate_definitions(
+        self, module: ParsedModule
+    ) -> Dict[int, "DefinitionTests"]:
+        """Gera os testes de cada classe/função, reaproveitando o cache.
+
+        Cada comando de nível superior é endereçado pelo hash do seu código;
+        ao reanalisar um arquivo editado, só as definições alteradas passam
+        novamente pela geração.
+        """
+        generated: Dict[int, DefinitionTests] = {}
+        for statement, nodes in module.definition_units():
+            fingerprint = module.fingerprint(statement)
+            unit_tests = definition_cache.get_analysis(fingerprint, None)
+            if unit_tests is None:
+                fresh = self._generate_node_tests(nodes, module.symbols)
+                unit_tests = [fresh[id(node)] for node in nodes]
+                definition_cache.store_analysis(
+                    fingerprint,
+                    None,
+                    unit_tests,
+                    sum(
+                        test_case.approximate_size()
+                        for definition_tests in unit_tests
+                        for test_case in definition_tests.test_cases
+                    ),
+                )
+            generated.update(zip(map(id, nodes), unit_tests))
+        return generated
+
+    def _generate_node_tests(
+        self, nodes: List[ast.AST], symbols: SymbolTable
+    ) -> Dict[int, "DefinitionTests"]:
+        """Gera testes, contagem e imports de cada definição em ``nodes``.
+
+        Classes recebem os testes dos seus métodos e funções livres os seus
+        próprios; métodos nunca são tratados como funções livres e
+        definições locais não geram testes. Os métodos de uma classe estão
+        sempre na mesma unidade que ela, de modo que a contagem de testes de
+        cada método fica completa.
+        """
+        test_cases: Dict[int, List[TestCaseData]] = {}
+        test_counts: Dict[int, int] = {}
+
+        for node in nodes:
+            symbol = symbols.get(node)
+            if symbol.local:
+                continue
+            if symbol.kind == "class":
+                test_cases[id(node)] = self._generate_class_tests(symbol, test_counts)
+            elif symbol.kind == "function" and not symbol.is_async:
+                func_tests = self._generate_function_tests(node)
+                test_cases[id(node)] = func_tests
+                test_counts[id(node)] = len(func_tests)
+
+        return {
+            id(node): DefinitionTests(
+                test_cases=test_cases.get(id(node), []),
+                test_count=test_counts.get(id(node), 0),
+                imports=(
+                    self._get_required_imports(symbols.get(node))
+                    if id(node) in test_cases
+                    else []
+                ),
+            )
+            for node in nodes
+        }
+
+    def _calculate_function_metrics(
+        self, module: ParsedModule, test_counts: Dict[int, int]
+    ) -> List[FunctionMetrics]:
+        """Calcula complexidade e cobertura estimada de cada função.
+
+        Cada caso de teste gerado conta como um caminho exercitado, limitado
+        ao número de caminhos independentes (a complexidade ciclomática).
+        """
+        metrics = []
+        for node in module.all_functions:
+            stats = module.function_stats(node)
+            test_count = test_counts.get(id(node), 0)
+            metrics.append(
+                FunctionMetrics(
+                    name=stats.qualname,
+                    line_number=node.lineno,
+                    complexity=stats.complexity,
+                    test_count=test_count,
+                    coverage_estimate=min(test_count, stats.complexity)
+                    / stats.complexity,
+                )
+            )
+        return metrics
 
     def _generate_test_class_name(
         self, classes: List[ast.ClassDef], functions: List[ast.FunctionDef]
@@ -85,28 +301,52 @@ class TestAnalyzer:
 
         return f"Suite de testes para {', '.join(elements)}"
 
-    def _generate_class_tests(self, cls: ast.ClassDef) -> List[TestCase]:
-        """Gera casos de teste para uma classe."""
+    def _generate_class_tests(
+        self, cls: DefinitionSymbol, test_counts: Optional[Dict[int, int]] = None
+    ) -> List[TestCaseData]:
+        """Gera casos de teste para uma classe.
+
+        ``test_counts`` acumula, por método, quantos testes foram gerados.
+        """
         test_cases = []
 
         # Teste de inicialização
-        init_test = TestCase(
+        init_test = TestCaseData(
             name=f"test_{cls.name.lower()}_initialization",
             description=f"Testa a inicialização da classe {cls.name}",
-            test_code=self._generate_init_test(cls),
-            assertions=["assert instance is not None"],
-            dependencies=[],
+            test_code=self._generate_init_test(cls.node),
+            assertions=INIT_ASSERTIONS,
         )
         test_cases.append(init_test)
 
-        # Testes para cada método
-        for method in cls.body:
-            if isinstance(method, ast.FunctionDef):
-                test_cases.extend(self._generate_method_tests(cls.name, method))
+        # Testes para cada método síncrono
+        for method in cls.methods:
+            if method.is_async:
+                continue
+            method_tests = self._generate_method_tests(cls.name, method.node)
+            test_cases.extend(method_tests)
+            if test_counts is not None:
+                test_counts[id(method.node)] = len(method_tests)
 
         return test_cases
 
-    def _generate_function_tests(self, func: ast.FunctionDef) -> List[TestCase]:
+    def _generate_method_tests(
+        self, class_name: str, method: ast.FunctionDef
+    ) -> List[TestCaseData]:
+        """Gera casos de teste para um método de classe."""
+        if method.name.startswith("__"):
+            return []
+
+        return [
+            TestCaseData(
+                name=f"test_{class_name.lower()}_{method.name}",
+                description=f"Testa o método {method.name} da classe {class_name}",
+                test_code=self._generate_method_test(class_name, method),
+                assertions=METHOD_ASSERTIONS,
+            )
+        ]
+
+    def _generate_function_tests(self, func: ast.FunctionDef) -> List[TestCaseData]:
         """Gera casos de teste para uma função."""
         test_cases = []
 
@@ -114,22 +354,20 @@ class TestAnalyzer:
         params = [arg.arg for arg in func.args.args]
 
         # Teste básico
-        basic_test = TestCase(
+        basic_test = TestCaseData(
             name=f"test_{func.name}_basic_functionality",
             description=f"Testa a funcionalidade básica de {func.name}",
             test_code=self._generate_basic_function_test(func),
             assertions=self._generate_basic_assertions(func),
-            dependencies=[],
         )
         test_cases.append(basic_test)
 
         # Teste de casos de borda
-        edge_test = TestCase(
+        edge_test = TestCaseData(
             name=f"test_{func.name}_edge_cases",
             description=f"Testa casos de borda para {func.name}",
             test_code=self._generate_edge_case_test(func),
             assertions=self._generate_edge_case_assertions(func),
-            dependencies=[],
         )
         test_cases.append(edge_test)
 
@@ -145,6 +383,21 @@ class TestAnalyzer:
         assert instance is not None
         """
 
+    def _generate_method_test(self, class_name: str, method: ast.FunctionDef) -> str:
+        """Gera código para teste de um método."""
+        params = [arg.arg for arg in method.args.args if arg.arg not in ("self", "cls")]
+        param_values = ["'test'" if i == 0 else "42" for i in range(len(params))]
+        param_str = ", ".join(f"{p}={v}" for p, v in zip(params, param_values))
+
+        return f"""
+        # Arrange
+        instance = {class_name}()
+        # Act
+        result = instance.{method.name}({param_str})
+        # Assert
+        assert result is not None
+        """
+
     def _generate_basic_function_test(self, func: ast.FunctionDef) -> str:
         """Gera código para teste básico de função."""
         params = [arg.arg for arg in func.args.args]
@@ -159,16 +412,13 @@ class TestAnalyzer:
         assert result is not None
         """
 
-    def _generate_basic_assertions(self, func: ast.FunctionDef) -> List[str]:
+    def _generate_basic_assertions(self, func: ast.FunctionDef) -> Tuple[str, ...]:
         """Gera asserções básicas para uma função."""
-        return [
-            "assert result is not None",
-            "assert isinstance(result, (str, int, float, bool, list, dict))",
-        ]
+        return BASIC_ASSERTIONS
 
-    def _generate_edge_case_assertions(self, func: ast.FunctionDef) -> List[str]:
+    def _generate_edge_case_assertions(self, func: ast.FunctionDef) -> Tuple[str, ...]:
         """Gera asserções para casos de borda."""
-        return ["assert result is not None", "assert not isinstance(result, Exception)"]
+        return EDGE_CASE_ASSERTIONS
 
     def _generate_edge_case_test(self, func: ast.FunctionDef) -> str:
         """Gera código para teste de casos de borda."""
@@ -179,14 +429,9 @@ class TestAnalyzer:
             {func.name}(None)
         """
 
-    def _get_required_imports(self, node: ast.AST) -> List[str]:
-        """Identifica imports necessários baseado no código."""
-        imports = set()
-        for child in ast.walk(node):
-            if isinstance(child, ast.Name):
-                if child.id in ["pytest", "mock", "patch"]:
-                    imports.add(child.id)
-        return list(imports)
+    def _get_required_imports(self, symbol: DefinitionSymbol) -> List[str]:
+        """Identifica imports necessários baseado nos nomes usados na definição."""
+        return [name for name in TEST_HELPER_NAMES if name in symbol.names]
 
     def _generate_fixtures(
         self, classes: List[ast.ClassDef], functions: List[ast.FunctionDef]
@@ -208,29 +453,149 @@ class TestAnalyzer:
         return fixtures
 
 
+class DefinitionTests(NamedTuple):
+    """Testes gerados para uma classe ou função, guardados por definição."""
+
+    test_cases: List[TestCaseData]
+    test_count: int
+    imports: List[str]
+
+
+def diff_test_suites(
+    base: Optional[TestSuiteData], current: TestSuiteData
+) -> TestSuiteDelta:
+    """Compara duas suites pelos nomes dos casos de teste.
+
+    Nomes repetidos são pareados pela ordem de ocorrência. Sem ``base``, todos
+    os casos de ``current`` são novos e a diferença é marcada com ``full``.
+    """
+    base_cases = _index_test_cases(base.test_cases) if base is not None else {}
+    current_cases = _index_test_cases(current.test_cases)
+
+    added = []
+    changed = []
+    for key, test_case in current_cases.items():
+        previous = base_cases.get(key)
+        if previous is None:
+            added.append(test_case)
+        elif previous != test_case:
+            changed.append(test_case)
+
+    return TestSuiteDelta(
+        class_name=current.class_name,
+        description=current.description,
+        imports=current.imports,
+        fixtures=current.fixtures,
+        added=[test_case.to_model() for test_case in added],
+        removed=[
+            name
+            for name, occurrence in base_cases
+            if (name, occurrence) not in current_cases
+        ],
+        changed=[test_case.to_model() for test_case in changed],
+        full=base is None,
+    )
+
+
+def _index_test_cases(
+    test_cases: List[TestCaseData],
+) -> Dict[Tuple[str, int], TestCaseData]:
+    occurrences: Dict[str, int] = {}
+    indexed = {}
+    for test_case in test_cases:
+        occurrence = occurrences.get(test_case.name, 0)
+        occurrences[test_case.name] = occurrence + 1
+        indexed[(test_case.name, occurrence)] = test_case
+    return indexed
+
+
+class CodeAnalysis:
+    """Resultado da análise de um módulo.
+
+    Os perfis de função acompanham a suite para que o processo principal
+    calcule as sugestões MCP sem refazer o parse.
+    """
+
+    __slots__ = ("test_suite", "function_profiles", "function_metrics")
+
+    def __init__(
+        self,
+        test_suite: TestSuiteData,
+        function_profiles: List[FunctionProfile],
+        function_metrics: List[FunctionMetrics],
+    ):
+        self.test_suite = test_suite
+        self.function_profiles = function_profiles
+        self.function_metrics = function_metrics
+
+    @property
+    def complexity_score(self) -> float:
+        """Complexidade ciclomática média das funções (1.0 sem funções)."""
+        if not self.function_metrics:
+            return 1.0
+        total = sum(metric.complexity for metric in self.function_metrics)
+        return total / len(self.function_metrics)
+
+    @property
+    def coverage_estimate(self) -> float:
+        """Fração de todos os caminhos do módulo exercitada pelos testes."""
+        paths = sum(metric.complexity for metric in self.function_metrics)
+        if not paths:
+            return 0.0
+        covered = sum(
+            min(metric.test_count, metric.complexity)
+            for metric in self.function_metrics
+        )
+        return covered / paths
+
+    def approximate_size(self) -> int:
+        """Tamanho aproximado da análise, em bytes, usado no limite do cache."""
+        functions = len(self.function_profiles) + len(self.function_metrics)
+        return self.test_suite.approximate_size() + functions * _FUNCTION_INFO_SIZE
+
+
+# Tamanho aproximado de um perfil ou das métricas de uma função
+_FUNCTION_INFO_SIZE = 128
+
+
+def build_code_analysis(module: ParsedModule) -> CodeAnalysis:
+    """Analisa o módulo; executado no pool de workers."""
+    return TestAnalyzer()._build_code_analysis(module)
+
+
 class ASTAnalyzer:
-    """Analisador de AST para extrair informações do código."""
+    """Analisador de AST para extrair informações do código.
+
+    Classes, métodos e funções vêm da tabela de símbolos montada na
+    travessia única de ``ParsedModule``.
+    """
 
-    def extract_classes(self, tree: ast.AST) -> List[ast.ClassDef]:
-        """Extrai todas as classes do código."""
-        return [node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
+    def extract_symbols(self, tree: Union[ast.AST, ParsedModule]) -> SymbolTable:
+        """Extrai a tabela de classes, métodos e funções do código."""
+        return as_parsed_module(tree).symbols
 
-    def extract_functions(self, tree: ast.AST) -> List[ast.FunctionDef]:
-        """Extrai todas as funções do código."""
-        return [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+    def extract_classes(self, tree: Union[ast.AST, ParsedModule]) -> List[ast.ClassDef]:
+        """Extrai as classes acessíveis a partir do módulo."""
+        return [symbol.node for symbol in self.extract_symbols(tree).classes]
+
+    def extract_functions(
+        self, tree: Union[ast.AST, ParsedModule]
+    ) -> List[ast.FunctionDef]:
+        """Extrai as funções livres (não métodos) síncronas do módulo."""
+        return [
+            symbol.node
+            for symbol in self.extract_symbols(tree).functions
+            if not symbol.is_async
+        ]
 
 
 class ComplexityCalculator:
     """Calculadora de complexidade ciclomática."""
 
     def calculate_complexity(self, node: ast.AST) -> int:
-        """Calcula a complexidade ciclomática de um nó AST."""
-        complexity = 1
-
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
+        """Calcula a complexidade ciclomática de um nó AST.
 
-        return complexity
+        Para funções de um ``ParsedModule`` prefira ``function_stats``, já
+        calculado durante a indexação do módulo.
+        """
+        return 1 + sum(decision_weight(child) for child in ast.walk(node))
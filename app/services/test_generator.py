@@ -1,69 +1,247 @@
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 import ast
-from app.models.test_models import TestCase, TestSuite, TestFramework
+from app.models.test_models import TestFramework
+from app.models.test_data import TestCaseData, TestSuiteData
+from app.core.analysis_cache import AnalysisCache, analysis_cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.parsed_module import ParsedModule, as_parsed_module
+from app.core.worker_pool import WorkerPool, worker_pool as default_worker_pool
 from app.services.test_analyzer import TestAnalyzer
 
 
 class TestGenerator:
     """Gerador de testes unitários."""
 
-    def __init__(self):
-        self.analyzer = TestAnalyzer()
+    def __init__(
+        self,
+        cache: Optional[AnalysisCache] = None,
+        worker_pool: Optional[WorkerPool] = None,
+    ):
+        self.cache = cache if cache is not None else analysis_cache
+        self.worker_pool = (
+            worker_pool if worker_pool is not None else default_worker_pool
+        )
+        self.analyzer = TestAnalyzer(cache=self.cache, worker_pool=self.worker_pool)
         self.template_engine = TestTemplateEngine()
 
-    async def generate_test_suite(self, code: str, framework: TestFramework) -> str:
+    async def generate_test_suite(
+        self, code: Union[str, ParsedModule], framework: TestFramework
+    ) -> str:
         """Gera uma suite de testes completa para o código fornecido."""
+        module = as_parsed_module(code, lazy=True)
+        rendered = self.cache.get_rendered(module.digest, framework)
+        if rendered is not None:
+            return rendered
+
         # Analisa o código e gera a estrutura de teste
-        test_suite = await self.analyzer.analyze_code(code, framework)
+        test_suite = await self.analyzer.analyze_code(module, framework)
 
         # Gera o código do teste usando o template apropriado
-        return self.template_engine.render_test_suite(test_suite, framework)
+        with metrics.stage("generate", "render"):
+            rendered = await self.worker_pool.run(
+                self.template_engine.render_test_suite, test_suite, framework
+            )
+        self.cache.store_rendered(module.digest, framework, rendered)
+        return rendered
 
+    async def iter_test_suite(
+        self, code: Union[str, ParsedModule], framework: TestFramework
+    ) -> AsyncIterator[str]:
+        """Gera a suite de testes em partes, à medida que são renderizadas.
 
-class TestTemplateEngine:
-    """Motor de templates para geração de testes."""
+        A concatenação das partes é idêntica ao retorno de
+        ``generate_test_suite``. Os casos de teste são renderizados no pool
+        de workers em trechos de ``RENDER_CHUNK_SIZE``; a suite só vai para
+        o cache se não passar de ``STREAM_CACHE_MAX_BYTES``, para que saídas
+        grandes não fiquem inteiras na memória.
+        """
+        module = as_parsed_module(code, lazy=True)
+        rendered = self.cache.get_rendered(module.digest, framework)
+        if rendered is not None:
+            yield rendered
+            return
+
+        test_suite = await self.analyzer.analyze_code(module, framework)
+
+        test_cases = test_suite.test_cases
+        cached: Optional[List[str]] = []
+        cached_size = 0
+        for start in range(0, max(len(test_cases), 1), RENDER_CHUNK_SIZE):
+            stop = start + RENDER_CHUNK_SIZE
+            with metrics.stage("generate", "render"):
+                parts = await self.worker_pool.run(
+                    self.template_engine.render_parts,
+                    test_suite.with_test_cases(test_cases[start:stop]),
+                    framework,
+                    start == 0,
+                    stop >= len(test_cases),
+                )
+            if cached is not None:
+                cached_size += sum(map(len, parts))
+                if cached_size > settings.STREAM_CACHE_MAX_BYTES:
+                    cached = None
+                else:
+                    cached.extend(parts)
+            for part in parts:
+                yield part
+        if cached is not None:
+            self.cache.store_rendered(module.digest, framework, "".join(cached))
 
-    def render_test_suite(self, test_suite: TestSuite, framework: TestFramework) -> str:
-        """Renderiza uma suite de testes completa."""
-        if framework == TestFramework.PYTEST:
-            return self._render_pytest_suite(test_suite)
-        else:
-            return self._render_unittest_suite(test_suite)
 
-    def _render_pytest_suite(self, test_suite: TestSuite) -> str:
-        """Renderiza uma suite de testes usando pytest."""
-        imports = self._generate_imports(test_suite.imports)
-        fixtures = self._generate_fixtures(test_suite.fixtures)
-        test_cases = self._generate_test_cases(test_suite.test_cases)
+# Casos de teste renderizados por tarefa do pool em iter_test_suite
+RENDER_CHUNK_SIZE = 64
 
-        return f"""{imports}
 
-{fixtures}
+class SuiteTemplate:
+    """Template pré-compilado de uma suite de testes.
 
-{test_cases}
-"""
+    O cabeçalho é um ``str.format`` aplicado uma vez por suite e cada caso
+    de teste é escrito no buffer como uma sequência fixa de literais e
+    campos. O corpo do teste é indentado em uma única passada: a primeira
+    linha recebe ``body_indent`` e as demais ``line_indent``.
+    """
 
-    def _render_unittest_suite(self, test_suite: TestSuite) -> str:
-        """Renderiza uma suite de testes usando unittest."""
-        imports = self._generate_imports(test_suite.imports + ["unittest"])
+    __slots__ = (
+        "header",
+        "extra_imports",
+        "case_prefix",
+        "case_signature",
+        "body_indent",
+        "line_separator",
+        "separator",
+        "footer",
+    )
 
-        return f"""{imports}
+    def __init__(
+        self,
+        header: str,
+        extra_imports: Tuple[str, ...],
+        case_prefix: str,
+        case_signature: str,
+        body_indent: str,
+        line_indent: str,
+        separator: str,
+    ):
+        self.header = header
+        self.extra_imports = list(extra_imports)
+        self.case_prefix = case_prefix
+        self.case_signature = case_signature
+        self.body_indent = '"""\n' + body_indent
+        self.line_separator = "\n" + line_indent
+        self.separator = separator
+        self.footer = "\n"
 
-class {test_suite.class_name}(unittest.TestCase):
-    \"""
-    {test_suite.description}
-    \"""
+    def render_header(
+        self, test_suite: TestSuiteData, imports: str, fixtures: str
+    ) -> str:
+        return self.header.format(
+            imports=imports,
+            fixtures=fixtures,
+            class_name=test_suite.class_name,
+            description=test_suite.description,
+        )
+
+    def write_case(self, buffer: List[str], test_case: TestCaseData) -> None:
+        """Acrescenta o código do caso de teste ao buffer."""
+        buffer.append(self.case_prefix)
+        buffer.append(test_case.name)
+        buffer.append(self.case_signature)
+        buffer.append(test_case.description)
+        buffer.append(self.body_indent)
+        buffer.append(self.line_separator.join(test_case.test_code.strip().split("\n")))
+        buffer.append("\n")
+
+
+SUITE_TEMPLATES: Dict[TestFramework, SuiteTemplate] = {
+    TestFramework.PYTEST: SuiteTemplate(
+        header="{imports}\n\n{fixtures}\n\n",
+        extra_imports=(),
+        case_prefix="def ",
+        case_signature='():\n    """',
+        body_indent="    ",
+        line_indent="    ",
+        separator="\n\n",
+    ),
+    TestFramework.UNITTEST: SuiteTemplate(
+        header='''{imports}
+
+class {class_name}(unittest.TestCase):
+    """
+    {description}
+    """
     
     def setUp(self):
-        \"""Setup para cada teste.\"""
+        """Setup para cada teste."""
         pass
     
     def tearDown(self):
-        \"""Cleanup após cada teste.\"""
+        """Cleanup após cada teste."""
         pass
     
-{self._generate_unittest_test_cases(test_suite.test_cases)}
-"""
+''',
+        extra_imports=("unittest",),
+        case_prefix="    def ",
+        case_signature='(self):\n        """',
+        # O corpo é indentado duas vezes, mas a primeira linha só uma
+        body_indent="    ",
+        line_indent="        ",
+        separator="\n",
+    ),
+}
+
+
+class TestTemplateEngine:
+    """Motor de templates para geração de testes."""
+
+    def render_test_suite(
+        self, test_suite: TestSuiteData, framework: TestFramework
+    ) -> str:
+        """Renderiza uma suite de testes completa em um único buffer."""
+        template = self._get_template(framework)
+        buffer = [self._render_header(template, test_suite)]
+        for index, test_case in enumerate(test_suite.test_cases):
+            if index:
+                buffer.append(template.separator)
+            template.write_case(buffer, test_case)
+        buffer.append(template.footer)
+        return "".join(buffer)
+
+    def render_parts(
+        self,
+        test_suite: TestSuiteData,
+        framework: TestFramework,
+        first: bool = True,
+        last: bool = True,
+    ) -> List[str]:
+        """Renderiza a suite em partes: cabeçalho, cada caso de teste e rodapé.
+
+        A concatenação das partes é idêntica a ``render_test_suite``. Uma
+        suite grande pode ser renderizada em trechos consecutivos de casos
+        de teste: só o primeiro (``first``) traz o cabeçalho e só o último
+        (``last``) o rodapé.
+        """
+        template = self._get_template(framework)
+        parts = [self._render_header(template, test_suite)] if first else []
+        for index, test_case in enumerate(test_suite.test_cases):
+            buffer = [template.separator] if index or not first else []
+            template.write_case(buffer, test_case)
+            parts.append("".join(buffer))
+        if last:
+            parts.append(template.footer)
+        return parts
+
+    def _get_template(self, framework: TestFramework) -> SuiteTemplate:
+        if framework == TestFramework.PYTEST:
+            return SUITE_TEMPLATES[TestFramework.PYTEST]
+        return SUITE_TEMPLATES[TestFramework.UNITTEST]
+
+    def _render_header(self, template: SuiteTemplate, test_suite: TestSuiteData) -> str:
+        return template.render_header(
+            test_suite,
+            imports=self._generate_imports(test_suite.imports + template.extra_imports),
+            fixtures=self._generate_fixtures(test_suite.fixtures),
+        )
 
     def _generate_imports(self, imports: List[str]) -> str:
         """Gera as declarações de import."""
@@ -72,7 +250,8 @@ class {test_suite.class_name}(unittest.TestCase):
         local_imports = []
 
         for imp in sorted(set(imports)):
-            if "." not in imp:
+            # "modulo import Nome" vira um from-import mesmo sem pacote
+            if "." not in imp and " import " not in imp:
                 if imp in ["os", "sys", "typing"]:
                     standard_imports.append(f"import {imp}")
                 else:
@@ -80,54 +259,16 @@ class {test_suite.class_name}(unittest.TestCase):
             else:
                 local_imports.append(f"from {imp}")
 
-        result = ""
+        # Blocos separados por uma linha em branco
+        blocks = []
         if standard_imports:
-            result += "\n".join(standard_imports) + "\n"
+            blocks.append("\n".join(standard_imports) + "\n")
         if third_party_imports:
-            if standard_imports:
-                result += "\n"
-            result += "\n".join(third_party_imports) + "\n"
+            blocks.append("\n".join(third_party_imports) + "\n")
         if local_imports:
-            if standard_imports or third_party_imports:
-                result += "\n"
-            result += "\n".join(local_imports)
-
-        return result
+            blocks.append("\n".join(local_imports))
+        return "\n".join(blocks)
 
     def _generate_fixtures(self, fixtures: Dict[str, str]) -> str:
         """Gera o código das fixtures."""
         return "\n\n".join(fixtures.values())
-
-    def _generate_test_cases(self, test_cases: List[TestCase]) -> str:
-        """Gera o código dos casos de teste para pytest."""
-        result = []
-
-        for test_case in test_cases:
-            result.append(
-                f"""def {test_case.name}():
-    \"""{test_case.description}\"""
-{self._indent(test_case.test_code)}
-"""
-            )
-
-        return "\n\n".join(result)
-
-    def _generate_unittest_test_cases(self, test_cases: List[TestCase]) -> str:
-        """Gera o código dos casos de teste para unittest."""
-        result = []
-
-        for test_case in test_cases:
-            result.append(
-                f"""    def {test_case.name}(self):
-        \"""{test_case.description}\"""
-{self._indent(self._indent(test_case.test_code))}
-"""
-            )
-
-        return "\n".join(result)
-
-    def _indent(self, code: str, level: int = 1) -> str:
-        """Indenta o código pelo número especificado de níveis."""
-        lines = code.strip().split("\n")
-        indent = "    " * level
-        return "\n".join(f"{indent}{line}" for line in lines)
@@ -1,59 +1,101 @@
 import ast
-from typing import List, Tuple, Optional
-from app.models.test_models import ValidationIssue, TestValidationResponse, TestCase
-from app.core.mcp_context import MCPContext
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from app.models.test_models import (
+    TestFileValidation,
+    TestFunctionValidation,
+    ValidationIssue,
+    TestValidationResponse,
+)
+from app.models.test_data import TestCaseData
+from app.core.mcp_context import MCPContext, mcp_context as default_mcp_context
+from app.core.metrics import metrics
+from app.core.parsed_module import (
+    FUNCTION_TYPES,
+    FunctionProfile,
+    ParsedModule,
+    as_parsed_module,
+)
+from app.core.worker_pool import WorkerPool, worker_pool as default_worker_pool
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
 
 
 class TestValidator:
     """Validador de testes unitários."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        worker_pool: Optional[WorkerPool] = None,
+        mcp_context: Optional[MCPContext] = None,
+    ):
         self.isolation_checker = IsolationChecker()
         self.quality_checker = QualityChecker()
-        self.mcp_context = MCPContext()
+        self.mcp_context = (
+            mcp_context if mcp_context is not None else default_mcp_context
+        )
+        self.worker_pool = (
+            worker_pool if worker_pool is not None else default_worker_pool
+        )
 
     async def validate_test(
-        self, test_code: str, source_code: str = None
+        self,
+        test_code: Union[str, ParsedModule],
+        source_code: str = None,
+        session_id: Optional[str] = None,
     ) -> TestValidationResponse:
-        """Valida um teste unitário."""
+        """Valida um teste unitário, registrando o resultado na sessão MCP.
+
+        Os perfis de função do módulo são calculados no pool de workers e
+        guardados no ``ParsedModule`` recebido, de modo que as sugestões do
+        MCP para o mesmo módulo não refazem o parse no event loop.
+        """
         issues = []
+        module = as_parsed_module(test_code, lazy=True)
 
-        # Parse do código
+        # Parse e regras são executados no pool de workers
         try:
-            test_tree = ast.parse(test_code)
+            with metrics.stage("validate", "checks"):
+                (
+                    isolation_issues,
+                    quality_issues,
+                    test_info,
+                    function_profiles,
+                ) = await self.worker_pool.run(
+                    check_test_module,
+                    module,
+                    self.isolation_checker,
+                    self.quality_checker,
+                )
         except SyntaxError as e:
-            return TestValidationResponse(
-                is_valid=False,
-                issues=[
-                    ValidationIssue(
-                        type="syntax_error",
-                        description=f"Erro de sintaxe: {str(e)}",
-                        line_number=e.lineno,
-                        suggestion="Corrija a sintaxe do código",
-                    )
-                ],
-                isolation_score=0.0,
-                maintainability_score=0.0,
-            )
+            return self.syntax_error_response(e)
+        module.function_profiles = function_profiles
 
         # Validação de isolamento
-        isolation_issues = self.isolation_checker.check_isolation(test_tree)
         issues.extend(isolation_issues)
 
         # Validação de qualidade
-        quality_issues = self.quality_checker.check_quality(test_tree)
         issues.extend(quality_issues)
 
         # Cálculo de scores
         isolation_score = self._calculate_isolation_score(isolation_issues)
         maintainability_score = self._calculate_maintainability_score(quality_issues)
 
-        # Extrai informações do teste para o MCP
-        test_info = self._extract_test_info(test_tree)
+        # Armazena informações do teste no MCP
         if test_info:
             # Armazena o resultado no contexto MCP
             await self.mcp_context.store_test_result(
-                test_case=test_info, result=len(issues) == 0, issues=issues
+                session_id, test_case=test_info, result=len(issues) == 0, issues=issues
             )
 
         return TestValidationResponse(
@@ -63,41 +105,74 @@ class TestValidator:
             maintainability_score=maintainability_score,
         )
 
-    def _extract_test_info(self, tree: ast.AST) -> Optional[TestCase]:
-        """Extrai informações do teste para o MCP."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) and node.name.startswith("test_"):
-                return TestCase(
-                    name=node.name,
-                    description=ast.get_docstring(node) or "No description available",
-                    test_code=self._get_node_source(node),
-                    assertions=self._extract_assertions(node),
-                    dependencies=self._extract_dependencies(node),
+    async def validate_test_file(
+        self, test_code: Union[str, ParsedModule]
+    ) -> TestFileValidation:
+        """Valida separadamente cada função de teste de um arquivo.
+
+        ``validate_test`` avalia o arquivo como um todo e guarda na sessão MCP
+        apenas o primeiro teste encontrado. Aqui cada ``test_*`` (funções do
+        módulo e métodos das classes) recebe os seus próprios problemas e
+        pontuações, e as do arquivo são a média das dos seus testes. Usado na
+        validação em lote, não grava nada na memória MCP.
+        """
+        try:
+            with metrics.stage("validate_file", "checks"):
+                functions = await self.worker_pool.run(
+                    check_test_functions,
+                    as_parsed_module(test_code, lazy=True),
+                    self.isolation_checker,
+                    self.quality_checker,
                 )
-        return None
-
-    def _get_node_source(self, node: ast.AST) -> str:
-        """Obtém o código fonte de um nó AST."""
-        return ast.unparse(node)
+        except SyntaxError as e:
+            return TestFileValidation(
+                is_valid=False,
+                test_count=0,
+                issues=self.syntax_error_response(e).issues,
+                isolation_score=0.0,
+                maintainability_score=0.0,
+            )
 
-    def _extract_assertions(self, node: ast.AST) -> List[str]:
-        """Extrai asserções de um nó AST."""
-        assertions = []
-        for child in ast.walk(node):
-            if isinstance(child, ast.Assert):
-                assertions.append(ast.unparse(child))
-        return assertions
+        tests = [
+            TestFunctionValidation(
+                name=function.name,
+                line_number=function.line_number,
+                is_valid=not function.isolation_issues and not function.quality_issues,
+                issues=function.isolation_issues + function.quality_issues,
+                isolation_score=self._calculate_isolation_score(
+                    function.isolation_issues
+                ),
+                maintainability_score=self._calculate_maintainability_score(
+                    function.quality_issues
+                ),
+            )
+            for function in functions
+        ]
+        return TestFileValidation(
+            is_valid=all(test.is_valid for test in tests),
+            test_count=len(tests),
+            tests=tests,
+            isolation_score=mean_score(test.isolation_score for test in tests),
+            maintainability_score=mean_score(
+                test.maintainability_score for test in tests
+            ),
+        )
 
-    def _extract_dependencies(self, node: ast.AST) -> List[str]:
-        """Extrai dependências de um nó AST."""
-        dependencies = []
-        for child in ast.walk(node):
-            if isinstance(child, ast.Import):
-                for name in child.names:
-                    dependencies.append(name.name)
-            elif isinstance(child, ast.ImportFrom):
-                dependencies.append(child.module)
-        return dependencies
+    def syntax_error_response(self, error: SyntaxError) -> TestValidationResponse:
+        """Monta a resposta para um teste que não pôde ser analisado."""
+        return TestValidationResponse(
+            is_valid=False,
+            issues=[
+                ValidationIssue(
+                    type="syntax_error",
+                    description=f"Erro de sintaxe: {str(error)}",
+                    line_number=error.lineno,
+                    suggestion="Corrija a sintaxe do código",
+                )
+            ],
+            isolation_score=0.0,
+            maintainability_score=0.0,
+        )
 
     def _calculate_isolation_score(self, issues: List[ValidationIssue]) -> float:
         """Calcula a pontuação de isolamento baseado nos problemas encontrados."""
@@ -116,91 +191,263 @@ class TestValidator:
         return max(0.0, 1.0 - (len(issues) * 0.1))
 
 
+def check_test_module(
+    module: ParsedModule,
+    isolation_checker: "IsolationChecker",
+    quality_checker: "QualityChecker",
+) -> Tuple[
+    List[ValidationIssue],
+    List[ValidationIssue],
+    Optional[TestCaseData],
+    List[FunctionProfile],
+]:
+    """Aplica as regras de validação ao módulo em uma única travessia.
+
+    Retorna os problemas de isolamento, os de qualidade, o primeiro teste
+    encontrado e os perfis de função usados nas sugestões do MCP. Propaga
+    ``SyntaxError`` caso o código não seja válido.
+    """
+    with metrics.stage("validate", "parse"):
+        tree = module.tree
+
+    isolation_rules = isolation_checker.create_rules()
+    quality_rules = quality_checker.create_rules()
+    test_info_rule = TestInfoRule()
+    with metrics.stage("validate", "rules"):
+        RuleEngine(isolation_rules + quality_rules + [test_info_rule]).run(tree)
+
+    return (
+        isolation_checker.collect_issues(isolation_rules),
+        quality_checker.collect_issues(quality_rules),
+        test_info_rule.get_test_case(),
+        module.function_profiles,
+    )
+
+
+class TestFunctionIssues(NamedTuple):
+    """Problemas de uma função de teste, devolvidos pelo pool de workers."""
+
+    name: str
+    line_number: int
+    isolation_issues: List[ValidationIssue]
+    quality_issues: List[ValidationIssue]
+
+
+def check_test_functions(
+    module: ParsedModule,
+    isolation_checker: "IsolationChecker",
+    quality_checker: "QualityChecker",
+) -> List[TestFunctionIssues]:
+    """Aplica as regras de validação a cada função de teste do módulo.
+
+    As regras percorrem apenas a subárvore de cada teste, de modo que a
+    travessia total continua proporcional ao tamanho do arquivo. Variáveis
+    de classe compartilhadas contam para todos os testes da classe.
+    Propaga ``SyntaxError`` caso o código não seja válido.
+    """
+    with metrics.stage("validate_file", "parse"):
+        tree = module.tree
+
+    results = []
+    class_issues: Dict[int, List[ValidationIssue]] = {}
+    with metrics.stage("validate_file", "rules"):
+        for node, test_class in _iter_test_functions(tree):
+            isolation_rules = isolation_checker.create_rules()
+            quality_rules = quality_checker.create_rules()
+            RuleEngine(isolation_rules + quality_rules).run(_as_function_def(node))
+
+            isolation_issues = isolation_checker.collect_issues(isolation_rules)
+            if test_class is not None:
+                if id(test_class) not in class_issues:
+                    shared_state_rule = SharedStateRule()
+                    shared_state_rule.visit(test_class, TraversalContext())
+                    class_issues[id(test_class)] = shared_state_rule.get_issues()
+                isolation_issues.extend(class_issues[id(test_class)])
+
+            results.append(
+                TestFunctionIssues(
+                    node.name,
+                    node.lineno,
+                    isolation_issues,
+                    quality_checker.collect_issues(quality_rules),
+                )
+            )
+    return results
+
+
+def _iter_test_functions(
+    tree: ast.Module,
+) -> Iterator[Tuple[FunctionNode, Optional[ast.ClassDef]]]:
+    """Funções ``test_*`` (síncronas ou ``async``) do módulo e das suas classes,
+    na ordem do arquivo."""
+    for node in tree.body:
+        if isinstance(node, FUNCTION_TYPES) and node.name.startswith("test_"):
+            yield node, None
+        elif isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, FUNCTION_TYPES) and item.name.startswith("test_"):
+                    yield item, node
+
+
+def _as_function_def(node: FunctionNode) -> ast.FunctionDef:
+    """Trata um teste ``async def`` como uma função comum para as regras.
+
+    As regras (e ``/validate``) só reconhecem ``ast.FunctionDef``; apenas o
+    nó do teste é convertido, e funções ``async`` aninhadas continuam sendo
+    tratadas como no arquivo inteiro.
+    """
+    if isinstance(node, ast.FunctionDef):
+        return node
+    function = ast.FunctionDef(
+        **{field: getattr(node, field) for field in node._fields}
+    )
+    return ast.copy_location(function, node)
+
+
+def mean_score(scores: Iterable[float]) -> float:
+    """Média das pontuações; sem testes não há problemas, então 1.0."""
+    scores = list(scores)
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+class TraversalContext:
+    """Posição do nó visitado pelo ``RuleEngine``."""
+
+    __slots__ = ("depth", "index", "functions", "in_class")
+
+    def __init__(self):
+        self.depth = 0
+        self.index = 0
+        self.functions: Tuple[ast.FunctionDef, ...] = ()
+        self.in_class = False
+
+
+class ValidationRule:
+    """Regra de validação aplicada durante a travessia única da árvore."""
+
+    node_types: Tuple[Type[ast.AST], ...] = ()
+
+    def visit(self, node: ast.AST, context: TraversalContext) -> None:
+        raise NotImplementedError
+
+    def get_issues(self) -> List[ValidationIssue]:
+        return []
+
+
+class RuleEngine:
+    """Percorre a árvore uma única vez e envia cada nó às regras registradas.
+
+    A travessia é em profundidade (pré-ordem), na mesma ordem de um
+    ``ast.NodeVisitor``. Novas regras não acrescentam travessias.
+    """
+
+    def __init__(self, rules: List[ValidationRule]):
+        self.rules = rules
+        self._dispatch: Dict[Type[ast.AST], List[Callable]] = {}
+        for rule in rules:
+            for node_type in rule.node_types:
+                self._dispatch.setdefault(node_type, []).append(rule.visit)
+
+    def run(self, tree: ast.AST) -> None:
+        """Aplica todas as regras à árvore."""
+        dispatch = self._dispatch
+        child_fields = _CHILD_FIELDS
+        context = TraversalContext()
+        stack = [(tree, 0, (), False)]
+        index = 0
+
+        while stack:
+            node, depth, functions, in_class = stack.pop()
+            handlers = dispatch.get(type(node))
+            if handlers:
+                context.depth = depth
+                context.index = index
+                context.functions = functions
+                context.in_class = in_class
+                for handler in handlers:
+                    handler(node, context)
+            index += 1
+
+            if isinstance(node, ast.FunctionDef):
+                functions = functions + (node,)
+            elif isinstance(node, ast.ClassDef):
+                in_class = True
+            # Filhos empilhados do último para o primeiro: saem na ordem do
+            # ``ast.iter_child_nodes``
+            fields = child_fields.get(type(node)) or _child_fields(type(node))
+            for field in reversed(fields):
+                value = getattr(node, field, None)
+                if type(value) is list:
+                    for child in reversed(value):
+                        if isinstance(child, ast.AST):
+                            stack.append((child, depth + 1, functions, in_class))
+                elif isinstance(value, ast.AST):
+                    stack.append((value, depth + 1, functions, in_class))
+
+
+# Campos que podem conter nós filhos, por tipo de nó
+_CHILD_FIELDS: Dict[Type[ast.AST], Tuple[str, ...]] = {}
+
+
+def _child_fields(node_type: Type[ast.AST]) -> Tuple[str, ...]:
+    """Campos de ``node_type`` percorridos pelo ``RuleEngine``.
+
+    O contexto das expressões (``ctx``: ``Load``, ``Store``, ``Del``) é
+    ignorado: nenhuma regra o visita e ele aparece em quase todo nome.
+    """
+    fields = _CHILD_FIELDS.get(node_type)
+    if fields is None:
+        fields = tuple(field for field in node_type._fields if field != "ctx")
+        _CHILD_FIELDS[node_type] = fields
+    return fields
+
+
 class IsolationChecker:
     """Verificador de isolamento de testes."""
 
-    def check_isolation(self, tree: ast.AST) -> List[ValidationIssue]:
-        """Verifica o isolamento do teste."""
-        issues = []
+    def create_rules(self) -> List[ValidationRule]:
+        """Cria as regras de isolamento para uma validação."""
+        return [MockUsageRule(), SharedStateRule()]
 
-        # Verifica uso de mocks
-        mock_visitor = MockUsageVisitor()
-        mock_visitor.visit(tree)
-        if not mock_visitor.has_mocks and mock_visitor.has_external_calls:
-            issues.append(
-                ValidationIssue(
-                    type="no_mocks",
-                    description="Teste faz chamadas externas sem usar mocks",
-                    line_number=None,
-                    suggestion="Utilize mocks para isolar dependências externas",
-                )
-            )
+    def collect_issues(self, rules: List[ValidationRule]) -> List[ValidationIssue]:
+        """Reúne os problemas encontrados pelas regras."""
+        return [issue for rule in rules for issue in rule.get_issues()]
 
-        # Verifica estado compartilhado
-        shared_state_visitor = SharedStateVisitor()
-        shared_state_visitor.visit(tree)
-        if shared_state_visitor.has_shared_state:
-            issues.append(
-                ValidationIssue(
-                    type="shared_state",
-                    description="Teste usa estado compartilhado",
-                    line_number=shared_state_visitor.shared_state_line,
-                    suggestion="Use fixtures ou setup/teardown para gerenciar estado",
-                )
-            )
-
-        return issues
+    def check_isolation(self, tree: ast.AST) -> List[ValidationIssue]:
+        """Verifica o isolamento do teste."""
+        rules = self.create_rules()
+        RuleEngine(rules).run(tree)
+        return self.collect_issues(rules)
 
 
 class QualityChecker:
     """Verificador de qualidade de testes."""
 
-    def check_quality(self, tree: ast.AST) -> List[ValidationIssue]:
-        """Verifica a qualidade do teste."""
-        issues = []
-
-        # Verifica nomenclatura
-        naming_visitor = NamingConventionVisitor()
-        naming_visitor.visit(tree)
-        issues.extend(naming_visitor.issues)
+    def create_rules(self) -> List[ValidationRule]:
+        """Cria as regras de qualidade para uma validação."""
+        return [NamingConventionRule(), AssertionRule(), DocumentationRule()]
 
-        # Verifica asserções
-        assertion_visitor = AssertionVisitor()
-        assertion_visitor.visit(tree)
-        if not assertion_visitor.has_assertions:
-            issues.append(
-                ValidationIssue(
-                    type="no_assertions",
-                    description="Teste não contém asserções",
-                    line_number=None,
-                    suggestion="Adicione asserções para verificar o comportamento esperado",
-                )
-            )
+    def collect_issues(self, rules: List[ValidationRule]) -> List[ValidationIssue]:
+        """Reúne os problemas encontrados pelas regras."""
+        return [issue for rule in rules for issue in rule.get_issues()]
 
-        # Verifica documentação
-        doc_visitor = DocumentationVisitor()
-        doc_visitor.visit(tree)
-        if not doc_visitor.has_docstring:
-            issues.append(
-                ValidationIssue(
-                    type="no_docstring",
-                    description="Teste não possui docstring",
-                    line_number=None,
-                    suggestion="Adicione uma docstring descrevendo o propósito do teste",
-                )
-            )
+    def check_quality(self, tree: ast.AST) -> List[ValidationIssue]:
+        """Verifica a qualidade do teste."""
+        rules = self.create_rules()
+        RuleEngine(rules).run(tree)
+        return self.collect_issues(rules)
 
-        return issues
 
+class MockUsageRule(ValidationRule):
+    """Regra para verificar uso de mocks."""
 
-class MockUsageVisitor(ast.NodeVisitor):
-    """Visitante para verificar uso de mocks."""
+    node_types = (ast.Call,)
 
     def __init__(self):
         self.has_mocks = False
         self.has_external_calls = False
 
-    def visit_Call(self, node: ast.Call):
+    def visit(self, node: ast.Call, context: TraversalContext) -> None:
         # Verifica se é uma chamada de mock
         if isinstance(node.func, ast.Name) and node.func.id in [
             "Mock",
@@ -211,21 +458,39 @@ class MockUsageVisitor(ast.NodeVisitor):
         # Verifica se é uma chamada externa
         elif isinstance(node.func, ast.Attribute):
             self.has_external_calls = True
-        self.generic_visit(node)
 
+    def get_issues(self) -> List[ValidationIssue]:
+        if self.has_mocks or not self.has_external_calls:
+            return []
+        return [
+            ValidationIssue(
+                type="no_mocks",
+                description="Teste faz chamadas externas sem usar mocks",
+                line_number=None,
+                suggestion="Utilize mocks para isolar dependências externas",
+            )
+        ]
+
+
+class SharedStateRule(ValidationRule):
+    """Regra para verificar estado compartilhado."""
 
-class SharedStateVisitor(ast.NodeVisitor):
-    """Visitante para verificar estado compartilhado."""
+    node_types = (ast.Global, ast.ClassDef)
 
     def __init__(self):
         self.has_shared_state = False
         self.shared_state_line = None
 
-    def visit_Global(self, node: ast.Global):
-        self.has_shared_state = True
-        self.shared_state_line = node.lineno
+    def visit(self, node: ast.AST, context: TraversalContext) -> None:
+        # O corpo das classes é analisado apenas na classe mais externa
+        if context.in_class:
+            return
+
+        if isinstance(node, ast.Global):
+            self.has_shared_state = True
+            self.shared_state_line = node.lineno
+            return
 
-    def visit_ClassDef(self, node: ast.ClassDef):
         # Verifica variáveis de classe
         for item in node.body:
             if isinstance(item, ast.Assign) and not isinstance(
@@ -234,14 +499,32 @@ class SharedStateVisitor(ast.NodeVisitor):
                 self.has_shared_state = True
                 self.shared_state_line = item.lineno
 
+    def get_issues(self) -> List[ValidationIssue]:
+        if not self.has_shared_state:
+            return []
+        return [
+            ValidationIssue(
+                type="shared_state",
+                description="Teste usa estado compartilhado",
+                line_number=self.shared_state_line,
+                suggestion="Use fixtures ou setup/teardown para gerenciar estado",
+            )
+        ]
+
+
+class NamingConventionRule(ValidationRule):
+    """Regra para verificar convenções de nomenclatura."""
 
-class NamingConventionVisitor(ast.NodeVisitor):
-    """Visitante para verificar convenções de nomenclatura."""
+    node_types = (ast.FunctionDef,)
 
     def __init__(self):
         self.issues = []
 
-    def visit_FunctionDef(self, node: ast.FunctionDef):
+    def visit(self, node: ast.FunctionDef, context: TraversalContext) -> None:
+        # Funções aninhadas não são verificadas
+        if context.functions:
+            return
+
         if not node.name.startswith("test_"):
             self.issues.append(
                 ValidationIssue(
@@ -252,23 +535,109 @@ class NamingConventionVisitor(ast.NodeVisitor):
                 )
             )
 
+    def get_issues(self) -> List[ValidationIssue]:
+        return self.issues
+
 
-class AssertionVisitor(ast.NodeVisitor):
-    """Visitante para verificar asserções."""
+class AssertionRule(ValidationRule):
+    """Regra para verificar asserções."""
+
+    node_types = (ast.Assert,)
 
     def __init__(self):
         self.has_assertions = False
 
-    def visit_Assert(self, node: ast.Assert):
+    def visit(self, node: ast.Assert, context: TraversalContext) -> None:
         self.has_assertions = True
 
+    def get_issues(self) -> List[ValidationIssue]:
+        if self.has_assertions:
+            return []
+        return [
+            ValidationIssue(
+                type="no_assertions",
+                description="Teste não contém asserções",
+                line_number=None,
+                suggestion="Adicione asserções para verificar o comportamento esperado",
+            )
+        ]
 
-class DocumentationVisitor(ast.NodeVisitor):
-    """Visitante para verificar documentação."""
+
+class DocumentationRule(ValidationRule):
+    """Regra para verificar documentação."""
+
+    node_types = (ast.FunctionDef,)
 
     def __init__(self):
         self.has_docstring = False
 
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        if ast.get_docstring(node):
-            self.has_docstring = True
+    def visit(self, node: ast.FunctionDef, context: TraversalContext) -> None:
+        if not self.has_docstring and not context.functions:
+            self.has_docstring = bool(ast.get_docstring(node))
+
+    def get_issues(self) -> List[ValidationIssue]:
+        if self.has_docstring:
+            return []
+        return [
+            ValidationIssue(
+                type="no_docstring",
+                description="Teste não possui docstring",
+                line_number=None,
+                suggestion="Adicione uma docstring descrevendo o propósito do teste",
+            )
+        ]
+
+
+class TestInfoRule(ValidationRule):
+    """Extrai o primeiro teste (em largura) com suas asserções e dependências."""
+
+    node_types = (ast.FunctionDef, ast.Assert, ast.Import, ast.ImportFrom)
+
+    def __init__(self):
+        self.test_node: Optional[ast.FunctionDef] = None
+        self._test_position: Optional[Tuple[int, int]] = None
+        self._children: Dict[int, List[Tuple[int, int, ast.AST]]] = {}
+
+    def visit(self, node: ast.AST, context: TraversalContext) -> None:
+        if isinstance(node, ast.FunctionDef):
+            # A pré-ordem com menor profundidade equivale à ordem de ast.walk
+            position = (context.depth, context.index)
+            if node.name.startswith("test_") and (
+                self._test_position is None or position < self._test_position
+            ):
+                self.test_node = node
+                self._test_position = position
+            return
+
+        for function in context.functions:
+            if function.name.startswith("test_"):
+                self._children.setdefault(id(function), []).append(
+                    (context.depth, context.index, node)
+                )
+
+    def get_test_case(self) -> Optional[TestCaseData]:
+        """Monta o caso de teste encontrado, se houver."""
+        node = self.test_node
+        if node is None:
+            return None
+
+        assertions = []
+        dependencies = []
+        for _, _, child in sorted(
+            self._children.get(id(node), []), key=lambda item: item[:2]
+        ):
+            if isinstance(child, ast.Assert):
+                assertions.append(ast.unparse(child))
+            elif isinstance(child, ast.Import):
+                for name in child.names:
+                    dependencies.append(name.name)
+            else:
+                dependencies.append(child.module)
+
+        return TestCaseData(
+            name=node.name,
+            description=ast.get_docstring(node) or "No description available",
+            test_code=ast.unparse(node),
+            assertions=assertions,
+            dependencies=dependencies,
+        )
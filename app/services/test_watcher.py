@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.core.test_files import mirrored_test_path, write_text_atomic
+from app.models.test_models import TestFramework
+from app.services.project_analyzer import (
+    is_test_module,
+    iter_python_files,
+    read_source,
+)
+from app.services.test_generator import TestGenerator
+
+logger = logging.getLogger(__name__)
+
+# Estado de um arquivo observado: (mtime em ns, tamanho)
+FileState = Tuple[int, int]
+
+
+class TestWatcher:
+    """Mantém os testes gerados de uma árvore de código em dia com as edições.
+
+    A árvore é verificada a cada ``poll_interval`` segundos comparando o
+    mtime e o tamanho de cada ``.py``, sem depender de notificações do
+    sistema operacional. Alterações em rajada (salvar vários arquivos, trocar
+    de branch) são agrupadas: o lote só é processado depois de ``debounce``
+    segundos sem novas alterações. Apenas os arquivos modificados passam
+    pelo ``TestGenerator``, em paralelo no seu pool de workers, e cada teste
+    é gravado atomicamente em ``output_root``, espelhando a árvore de código.
+    """
+
+    def __init__(
+        self,
+        source_root: str,
+        output_root: str,
+        framework: TestFramework,
+        generator: TestGenerator,
+        poll_interval: float = 0.25,
+        debounce: float = 0.2,
+    ):
+        self.source_root = source_root
+        self.output_root = output_root
+        self.framework = framework
+        self.generator = generator
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.generated = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.errors = 0
+
+    def scan(self) -> Dict[str, FileState]:
+        """Estado atual dos módulos observados, por caminho relativo."""
+        states = {}
+        for path, full_path in iter_python_files(
+            self.source_root, excluded=(self.output_root,)
+        ):
+            if is_test_module(path):
+                continue
+            try:
+                stat = os.stat(full_path)
+            except FileNotFoundError:
+                continue
+            states[path] = (stat.st_mtime_ns, stat.st_size)
+        return states
+
+    def stale_paths(self, states: Dict[str, FileState]) -> Set[str]:
+        """Módulos sem teste gerado ou alterados depois da última geração."""
+        stale = set()
+        for path, (mtime_ns, _) in states.items():
+            try:
+                output_mtime = os.stat(self.output_path(path)).st_mtime_ns
+            except FileNotFoundError:
+                stale.add(path)
+                continue
+            if output_mtime < mtime_ns:
+                stale.add(path)
+        return stale
+
+    def output_path(self, path: str) -> str:
+        return os.path.join(self.output_root, mirrored_test_path(path))
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Observa a árvore até ``stop`` ser sinalizado.
+
+        Na partida só os módulos sem teste atualizado são gerados.
+        """
+        stop = stop if stop is not None else asyncio.Event()
+        states = self.scan()
+        await self.process(self.stale_paths(states), ())
+
+        changed: Set[str] = set()
+        removed: Set[str] = set()
+        last_change = 0.0
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            current = self.scan()
+            modified = {
+                path for path, state in current.items() if states.get(path) != state
+            }
+            deleted = states.keys() - current.keys()
+            states = current
+
+            if modified or deleted:
+                changed = (changed | modified) - deleted
+                removed = (removed | deleted) - modified
+                last_change = time.monotonic()
+            elif (
+                changed or removed
+            ) and time.monotonic() - last_change >= self.debounce:
+                await self.process(changed, removed)
+                changed, removed = set(), set()
+
+    async def process(self, changed: Iterable[str], removed: Iterable[str]) -> None:
+        """Regenera os testes dos módulos alterados e remove os dos apagados."""
+        changed = sorted(changed)
+        removed = sorted(removed)
+        if not changed and not removed:
+            return
+        start = time.perf_counter()
+
+        semaphore = asyncio.Semaphore(self.generator.worker_pool.max_workers)
+
+        async def regenerate(path: str) -> None:
+            async with semaphore:
+                await self.regenerate(path)
+
+        await asyncio.gather(*(regenerate(path) for path in changed))
+        for path in removed:
+            self.remove(path)
+
+        logger.info(
+            "%d arquivo(s) alterado(s) e %d removido(s) em %.1f ms",
+            len(changed),
+            len(removed),
+            (time.perf_counter() - start) * 1000,
+        )
+
+    async def regenerate(self, path: str) -> None:
+        """Gera o teste de um módulo, mantendo o anterior se o código for inválido."""
+        full_path = os.path.join(self.source_root, path)
+        try:
+            source = read_source(path, full_path)
+        except FileNotFoundError:
+            return
+        if source.error is not None:
+            self.errors += 1
+            logger.warning("%s: %s", path, source.error)
+            return
+
+        try:
+            test_code = await self.generator.generate_test_suite(
+                source.source, self.framework
+            )
+        except Exception as e:
+            # Um arquivo salvo no meio da edição costuma ter erro de sintaxe
+            self.errors += 1
+            logger.warning("%s: %s", path, e)
+            return
+
+        output_path = self.output_path(path)
+        if write_text_atomic(output_path, test_code):
+            self.generated += 1
+            logger.debug("%s -> %s", path, output_path)
+        else:
+            # Conteúdo igual: só o mtime é atualizado, para que o módulo não
+            # pareça desatualizado em ``stale_paths`` na próxima partida
+            os.utime(output_path)
+            self.unchanged += 1
+
+    def remove(self, path: str) -> None:
+        """Apaga o teste gerado de um módulo removido."""
+        try:
+            os.remove(self.output_path(path))
+        except FileNotFoundError:
+            return
+        self.removed += 1
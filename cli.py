@@ -0,0 +1,110 @@
+"""Analisa, gera ou valida testes de arquivos locais, sem o servidor HTTP.
+
+    python cli.py generate src/ --output-dir tests/gerados
+    python cli.py analyze src/ --output analise.ndjson
+    python cli.py validate tests/ --strict
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from app.core.config import settings
+from app.core.test_files import mirrored_test_path, write_text_atomic
+from app.models.test_models import TestFramework
+from app.services.batch_runner import (
+    BATCH_COMMANDS,
+    BatchStats,
+    collect_tasks,
+    run_batch,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Processa arquivos locais em lote com um pool de processos."
+    )
+    parser.add_argument("command", choices=BATCH_COMMANDS)
+    parser.add_argument("paths", nargs="*", help="arquivos ou diretórios")
+    parser.add_argument(
+        "--paths-from", help="arquivo com um caminho por linha ('-' lê da entrada)"
+    )
+    parser.add_argument(
+        "--framework",
+        type=TestFramework,
+        choices=list(TestFramework),
+        default=TestFramework(settings.DEFAULT_TEST_TEMPLATE),
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="processos do pool"
+    )
+    parser.add_argument(
+        "--output", help="arquivo NDJSON dos resultados ('-' para a saída padrão)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="grava os testes gerados espelhando os caminhos (apenas generate)",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="termina com código 1 se houver erros ou testes inválidos",
+    )
+    args = parser.parse_args()
+    if args.output_dir and args.command != "generate":
+        parser.error("--output-dir só se aplica ao comando generate")
+    if args.output is None and not args.output_dir:
+        args.output = "-"
+    return args
+
+
+def read_paths(args: argparse.Namespace) -> List[str]:
+    paths = list(args.paths)
+    if args.paths_from:
+        if args.paths_from == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.paths_from, encoding="utf-8") as paths_file:
+                lines = paths_file.read().splitlines()
+        paths.extend(line.strip() for line in lines if line.strip())
+    return paths
+
+
+def main() -> int:
+    args = parse_args()
+    tasks = collect_tasks(args.command, read_paths(args), args.framework)
+    stats = BatchStats()
+
+    if args.output == "-":
+        output = sys.stdout
+    elif args.output:
+        output = open(args.output, "w", encoding="utf-8")
+    else:
+        output = None
+
+    try:
+        for result in run_batch(tasks, args.workers):
+            stats.add(result)
+            if args.output_dir and result.get("test_count"):
+                write_text_atomic(
+                    os.path.join(
+                        args.output_dir, mirrored_test_path(result["path"].lstrip("/"))
+                    ),
+                    result["test_code"],
+                )
+            if output is not None:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+
+    print(stats.summary(), file=sys.stderr)
+    if args.strict and (stats.errors or stats.invalid):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,37 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
 from app.api.endpoints import test_endpoints
+from app.core.analysis_cache import analysis_cache, definition_cache
+from app.core.mcp_context import mcp_context
+from app.core.memory_backend import memory_backend
+from app.core.http_metrics import MetricsMiddleware
+from app.core.metrics import EXPOSITION_CONTENT_TYPE, metrics
+from app.core.project_index import project_index_store
+from app.core.profiling import ProfilingMiddleware, request_profiler
+from app.core.request_body import RequestBodyMiddleware
+from app.core.worker_pool import batch_worker_pool, worker_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Ciclo de vida da aplicação.
+
+    Nada é aberto na partida: os serviços dos endpoints, os pools de workers
+    e as conexões SQLite são criados no primeiro uso. No encerramento os
+    pools aguardam as tarefas em andamento, os eventos de memória MCP
+    pendentes são gravados e o índice de símbolos dos projetos é fechado.
+    """
+    yield
+    worker_pool.shutdown()
+    batch_worker_pool.shutdown()
+    memory_backend.close()
+    project_index_store.close()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -10,9 +40,33 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
+    lifespan=lifespan,
 )
 
-# Configuração CORS
+# Limite e descompactação do corpo, antes do parse do JSON
+app.add_middleware(
+    RequestBodyMiddleware,
+    default_limit=settings.MAX_REQUEST_SIZE,
+    limits=[
+        ("/batch", settings.MAX_BATCH_REQUEST_SIZE),
+        ("/project", settings.MAX_BATCH_REQUEST_SIZE),
+    ],
+)
+
+# Latência das requisições, exposta em /metrics
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Profiling sob demanda (X-Profile: 1) e por amostragem
+PROFILES_URL = f"{settings.API_V1_STR}/debug/profiles"
+if request_profiler.enabled:
+    app.add_middleware(
+        ProfilingMiddleware, profiler=request_profiler, summary_url=PROFILES_URL
+    )
+
+# Configuração CORS. O último middleware adicionado é o mais externo: as
+# respostas de erro dos demais (413/415 do limite do corpo) também recebem
+# os cabeçalhos CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -26,6 +80,53 @@ app.include_router(
     test_endpoints.router, prefix=f"{settings.API_V1_STR}/tests", tags=["tests"]
 )
 
+# Métricas de ocupação, calculadas a cada coleta
+_CACHE_COUNTERS = ("hits", "misses", "evictions")
+metrics.register_collector(
+    "mcp_analysis_cache", "Cache de análises", analysis_cache.stats, _CACHE_COUNTERS
+)
+# Com WORKER_POOL_MODE=process a geração por definição roda nos workers, cada
+# um com o seu cache; este coletor vê apenas o do processo principal
+metrics.register_collector(
+    "mcp_definition_cache",
+    "Cache de testes por definição",
+    definition_cache.stats,
+    _CACHE_COUNTERS,
+)
+metrics.register_collector(
+    "mcp_session_store",
+    "Sessões MCP",
+    mcp_context.test_context.stats,
+    ("evictions", "expirations"),
+)
+metrics.register_collector(
+    "mcp_worker_pool", "Pool de workers", worker_pool.stats, ("rejected",)
+)
+metrics.register_collector(
+    "mcp_batch_worker_pool",
+    "Pool de workers da análise em lote",
+    batch_worker_pool.stats,
+    ("rejected",),
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["metrics"])
+async def get_metrics():
+    """Métricas no formato de exposição de texto do Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type=EXPOSITION_CONTENT_TYPE)
+
+
+@app.get(f"{PROFILES_URL}/{{profile_id}}", tags=["debug"])
+async def get_profile(profile_id: str, request: Request):
+    """Resumo de um perfil salvo: funções de ``app/services`` mais caras."""
+    if not request_profiler.enabled or not request_profiler.is_allowed(request.scope):
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    summary = request_profiler.load_summary(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return summary
+
+
 if __name__ == "__main__":
     import uvicorn
 
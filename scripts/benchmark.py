@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the analyzer, template engine, validator, MCP context
+and response serialization.
+
+Synthetic modules from 1 KB up to MAX_CODE_SIZE are generated
+deterministically, each benchmark is repeated and the timings are written
+as JSON so results from different commits can be compared:
+
+    python scripts/benchmark.py --output base.json
+    python scripts/benchmark.py --compare base.json
+"""
+
+import argparse
+import ast
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.core.analysis_cache import AnalysisCache, definition_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.mcp_context import TestContext  # noqa: E402
+from app.core.responses import ModelJSONResponse  # noqa: E402
+from app.core.worker_pool import WorkerPool  # noqa: E402
+from app.models.test_models import TestAnalysisResponse, TestFramework  # noqa: E402
+from app.services.test_analyzer import ASTAnalyzer, TestAnalyzer  # noqa: E402
+from app.services.test_generator import TestTemplateEngine  # noqa: E402
+from app.services.test_validator import TestValidator  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, settings.MAX_CODE_SIZE]
+DEFAULT_OUTPUT_DIR = ROOT / "benchmark_results"
+
+CLASS_TEMPLATE = '''
+class Service{index}:
+    """Synthetic service {index}."""
+
+    def __init__(self, repository, limit=10):
+        self.repository = repository
+        self.limit = limit
+
+    def fetch(self, key, default=None):
+        if key is None or not self.repository:
+            return default
+        for item in self.repository.items(key):
+            if item.active and item.score > self.limit:
+                return item
+        return default
+
+    async def refresh(self, keys):
+        try:
+            return [await self.repository.load(key) for key in keys]
+        except KeyError:
+            return []
+'''
+
+FUNCTION_TEMPLATE = '''
+def transform_{index}(values, factor=2, strict=False):
+    """Synthetic function {index}."""
+    result = []
+    for value in values:
+        if value is None:
+            continue
+        elif strict and value < 0:
+            raise ValueError(value)
+        while value > 100:
+            value //= factor
+        result.append(value * factor)
+    assert len(result) <= len(values)
+    return result
+'''
+
+TEST_TEMPLATE = '''
+@patch("service.repository")
+def test_transform_{index}(mock_repository):
+    """Checks transform {index} with a mocked repository."""
+    mock_repository.items.return_value = [{index}, None, 200]
+    result = transform_{index}(mock_repository.items(), factor=2)
+    assert result == [{index} * 2, 100]
+    assert mock_repository.items.called
+'''
+
+
+def make_source(size: int) -> str:
+    """Build a deterministic Python module of roughly ``size`` bytes."""
+    return _build_module(
+        size,
+        '"""Synthetic module used by the benchmarks."""\nimport os\n',
+        lambda index: CLASS_TEMPLATE if index % 3 == 0 else FUNCTION_TEMPLATE,
+    )
+
+
+def make_test_source(size: int) -> str:
+    """Build a deterministic, valid pytest module of roughly ``size`` bytes."""
+    return _build_module(
+        size, "from unittest.mock import patch\n", lambda index: TEST_TEMPLATE
+    )
+
+
+def _build_module(size: int, header: str, template_for: Callable[[int], str]) -> str:
+    parts = [header]
+    length = len(header)
+    index = 0
+    while length < size:
+        part = template_for(index).format(index=index)
+        if length + len(part) > size and index:
+            break
+        parts.append(part)
+        length += len(part)
+        index += 1
+    return "".join(parts)
+
+
+def measure(
+    func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None
+) -> Dict[str, float]:
+    """Run ``func`` ``repeat`` times and return timing statistics in seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+    }
+
+
+def run_async(coroutine_factory: Callable[[], Any]) -> Callable[[], Any]:
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(coroutine_factory())
+
+
+def benchmark_size(size: int, repeat: int) -> List[Dict[str, Any]]:
+    """Run every benchmark against a synthetic module of ``size`` bytes."""
+    source = make_source(size)
+    tree = ast.parse(source)
+    inline_pool = WorkerPool(mode="inline", max_workers=1, max_pending=1)
+    cache = AnalysisCache(max_entries=16, ttl_seconds=3600.0)
+    analyzer = TestAnalyzer(cache=cache, worker_pool=inline_pool)
+    ast_analyzer = ASTAnalyzer()
+    engine = TestTemplateEngine()
+    validator = TestValidator(worker_pool=inline_pool)
+
+    def clear_caches() -> None:
+        cache.clear()
+        definition_cache.clear()
+
+    analyze = run_async(lambda: analyzer.analyze_code(source, TestFramework.PYTEST))
+    clear_caches()
+    test_suite = analyze()
+    test_code = make_test_source(size)
+
+    context = TestContext()
+    for test_case in test_suite.test_cases:
+        context.learn_pattern(test_case)
+
+    analysis = run_async(lambda: analyzer.analyze(source, TestFramework.PYTEST))()
+    response = TestAnalysisResponse(
+        test_suite=analysis.test_suite.to_model(),
+        coverage_estimate=analysis.coverage_estimate,
+        suggestions=context.generate_suggestions(source),
+        complexity_score=analysis.complexity_score,
+        function_metrics=analysis.function_metrics,
+    )
+    # FastAPI's path for a returned model: dump to a dict, validate it again
+    # against ``response_model``, convert to JSON-compatible types, json.dumps
+    response_field = create_response_field(
+        name="benchmark_response", type_=TestAnalysisResponse
+    )
+    serialize_default = run_async(
+        lambda: serialize_response(field=response_field, response_content=response)
+    )
+
+    benchmarks = [
+        ("ast_analyzer.extract_classes", lambda: ast_analyzer.extract_classes(tree)),
+        (
+            "ast_analyzer.extract_functions",
+            lambda: ast_analyzer.extract_functions(tree),
+        ),
+        ("test_analyzer.analyze_code.cold", analyze, clear_caches),
+        ("test_analyzer.analyze_code.definition_cache", analyze, cache.clear),
+        ("test_analyzer.analyze_code.warm", analyze),
+    ]
+    for framework in TestFramework:
+        benchmarks.append(
+            (
+                f"template_engine.render_test_suite.{framework.value}",
+                lambda framework=framework: engine.render_test_suite(
+                    test_suite, framework
+                ),
+            )
+        )
+    benchmarks += [
+        (
+            "test_validator.validate_test",
+            run_async(lambda: validator.validate_test(test_code)),
+        ),
+        (
+            "test_context.generate_suggestions",
+            lambda: context.generate_suggestions(source),
+        ),
+        (
+            "response.analyze.jsonable_encoder",
+            lambda: JSONResponse(serialize_default()),
+        ),
+        ("response.analyze.model_json", lambda: ModelJSONResponse(response)),
+    ]
+
+    results = []
+    for name, func, *setup in benchmarks:
+        stats = measure(func, repeat, setup[0] if setup else None)
+        results.append(
+            {
+                "name": name,
+                "size": size,
+                "source_bytes": len(source),
+                "test_cases": len(test_suite.test_cases),
+                "repeat": repeat,
+                **stats,
+            }
+        )
+        print(
+            f"{name:<48} {size:>9}B  median {stats['median'] * 1000:10.3f} ms",
+            flush=True,
+        )
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Describe where the benchmark ran, including the current commit."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path) -> None:
+    """Print the median ratio of each benchmark against a previous run."""
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(item["name"], item["size"]): item for item in baseline["results"]}
+    print(f"\nComparison with {baseline_path} ({baseline['environment']['commit']})")
+    for item in results:
+        base = previous.get((item["name"], item["size"]))
+        if base is None:
+            continue
+        ratio = item["median"] / base["median"] if base["median"] else float("inf")
+        print(f"{item['name']:<48} {item['size']:>9}B  {ratio:6.2f}x")
+
+
+def main():
+    """Run the benchmarks and save the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="JSON file for the results")
+    parser.add_argument("--compare", type=Path, help="previous results to compare")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(benchmark_size(size, args.repeat))
+
+    report = {"environment": environment(), "results": results}
+    output = args.output
+    if output is None:
+        DEFAULT_OUTPUT_DIR.mkdir(exist_ok=True)
+        commit = (report["environment"]["commit"] or "unknown")[:12]
+        output = DEFAULT_OUTPUT_DIR / f"benchmark-{commit}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
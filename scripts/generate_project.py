@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Generate test suites for every module of a project using a cross-module symbol index.
+
+The project is a directory or a tar archive (optionally compressed). The
+symbol index is built in parallel and saved, so only changed modules are
+re-indexed on the next run:
+
+    python scripts/generate_project.py path/to/project --output generated_tests
+    python scripts/generate_project.py project.tar.gz --workers 8 --framework unittest
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.core.project_index import ProjectIndexStore  # noqa: E402
+from app.core.test_files import mirrored_test_path, write_text_atomic  # noqa: E402
+from app.core.worker_pool import WORKER_POOL_MODES, WorkerPool  # noqa: E402
+from app.models.test_models import TestFramework  # noqa: E402
+from app.services.project_analyzer import (  # noqa: E402
+    ProjectAnalyzer,
+    load_directory,
+    load_tarball,
+)
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Index the project, generate every suite and print timings."""
+    start = time.perf_counter()
+    if args.project.is_dir():
+        sources = load_directory(str(args.project))
+    else:
+        sources = load_tarball(args.project.read_bytes())
+    loaded = time.perf_counter()
+
+    pool = WorkerPool(mode=args.mode, max_workers=args.workers, max_pending=1 << 20)
+    index_store = ProjectIndexStore(args.index, settings.PROJECT_INDEX_MAX_MODULES)
+    project_analyzer = ProjectAnalyzer(worker_pool=pool, index_store=index_store)
+    try:
+        index = await project_analyzer.build_index(sources)
+        indexed = time.perf_counter()
+
+        generated = failed = 0
+        async for item in project_analyzer.iter_generate(
+            sources, args.framework, index
+        ):
+            if item.error is not None:
+                failed += 1
+                print(f"{item.path}: {item.error}", file=sys.stderr)
+                continue
+            generated += 1
+            if args.output is not None and item.test_count:
+                write_text_atomic(
+                    str(args.output / mirrored_test_path(item.path)), item.test_code
+                )
+        finished = time.perf_counter()
+    finally:
+        pool.shutdown()
+        index_store.close()
+
+    print(
+        f"{len(sources)} modules loaded in {loaded - start:.3f}s\n"
+        f"index: {index.indexed} indexed, {index.reused} reused "
+        f"in {indexed - loaded:.3f}s\n"
+        f"generate: {generated} suites, {failed} errors "
+        f"in {finished - indexed:.3f}s "
+        f"({generated / max(finished - indexed, 1e-9):.1f} suites/s, "
+        f"{pool.max_workers} {pool.mode} workers)"
+    )
+    return 1 if failed and args.strict else 0
+
+
+def main() -> int:
+    """Parse the command line and run the project generation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("project", type=Path, help="directory or tar archive")
+    parser.add_argument(
+        "--framework",
+        type=TestFramework,
+        choices=list(TestFramework),
+        default=TestFramework.PYTEST,
+    )
+    parser.add_argument("--output", type=Path, help="directory for generated tests")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--mode", choices=WORKER_POOL_MODES, default="process")
+    parser.add_argument(
+        "--index",
+        default=settings.PROJECT_INDEX_PATH,
+        help="SQLite file for the symbol index ('' keeps it in memory)",
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="exit with 1 if any module fails"
+    )
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+In-process end-to-end load test for the FastAPI app.
+
+Requests go through the real ASGI stack of ``main.app`` via an httpx ASGI
+transport (no network or server process). Latency percentiles, throughput
+and status codes per scenario are written as JSON:
+
+    python scripts/load_test.py --requests 500 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from benchmark import (  # noqa: E402
+    DEFAULT_OUTPUT_DIR,
+    environment,
+    make_source,
+    make_test_source,
+)
+from main import app  # noqa: E402
+
+API_PREFIX = "/api/v1/tests"
+
+
+def build_scenarios(size: int) -> Dict[str, Tuple[str, str, Dict[str, Any]]]:
+    """Map each scenario name to (method, path, json body)."""
+    source = make_source(size)
+    return {
+        "analyze": ("POST", "/analyze", {"code": source}),
+        "generate": ("POST", "/generate", {"code": source}),
+        "generate_unittest": (
+            "POST",
+            "/generate",
+            {"code": source, "framework": "unittest"},
+        ),
+        "validate": ("POST", "/validate", {"test_code": make_test_source(size)}),
+        "frameworks": ("GET", "/frameworks", None),
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    method: str,
+    path: str,
+    body: Dict[str, Any],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """Send ``requests`` requests with at most ``concurrency`` in flight."""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, API_PREFIX + path, json=body)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "throughput": requests / elapsed if elapsed else 0.0,
+        "latency": {
+            "min": min(latencies),
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+            "mean": statistics.fmean(latencies),
+        },
+        "status_codes": dict(statuses),
+    }
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    scenarios = build_scenarios(args.size)
+    selected = args.scenarios or list(scenarios)
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://loadtest", timeout=None
+    ) as client:
+        for name in selected:
+            method, path, body = scenarios[name]
+            result = await run_scenario(
+                client, method, path, body, args.requests, args.concurrency
+            )
+            result.update(name=name, size=args.size)
+            results.append(result)
+            latency = result["latency"]
+            print(
+                f"{name:<18} {result['throughput']:8.1f} req/s  "
+                f"p50 {latency['p50'] * 1000:8.2f} ms  "
+                f"p99 {latency['p99'] * 1000:8.2f} ms  {result['status_codes']}",
+                flush=True,
+            )
+    return results
+
+
+def main():
+    """Run the load test and save the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--size", type=int, default=10_000, help="source bytes")
+    parser.add_argument("--scenarios", nargs="+", help="subset of scenarios to run")
+    parser.add_argument("--output", type=Path, help="JSON file for the results")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = {"environment": environment(), "results": results}
+    output = args.output
+    if output is None:
+        DEFAULT_OUTPUT_DIR.mkdir(exist_ok=True)
+        commit = (report["environment"]["commit"] or "unknown")[:12]
+        output = DEFAULT_OUTPUT_DIR / f"load-{commit}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
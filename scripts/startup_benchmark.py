@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark and import-time budget for the API, CLI and watcher.
+
+Each entry point is imported in a fresh interpreter ``--repeat`` times. The
+import time measured inside the child, the wall time of the whole process
+and, for the API, the latency of the first request (through the ASGI stack,
+with every service still uncreated) are written as JSON:
+
+    python scripts/startup_benchmark.py --output startup.json
+    python scripts/startup_benchmark.py --check
+
+With ``--check`` the script exits with status 1 when a median exceeds its
+budget in ``BUDGETS_MS`` (scaled by ``--budget-scale`` on slow machines) or
+when an entry point loads a module listed in ``FORBIDDEN_MODULES``.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from benchmark import (  # noqa: E402
+    DEFAULT_OUTPUT_DIR,
+    ROOT,
+    compare,
+    environment,
+    make_source,
+)
+
+# Statement timed inside the child interpreter for each entry point
+TARGETS = {
+    "api.import": "import main",
+    "api.first_request": "import main",
+    "cli.import": "import cli",
+    "watch.import": "import watch",
+}
+
+# Median budgets in milliseconds, with headroom for shared CI runners
+BUDGETS_MS = {
+    "api.import": 1500,
+    "api.first_request": 1000,
+    "cli.import": 800,
+    "watch.import": 800,
+}
+
+# Web stack modules the offline entry points must never load
+FORBIDDEN_MODULES = {
+    "cli.import": ("fastapi", "starlette", "uvicorn", "httpx"),
+    "watch.import": ("fastapi", "starlette", "uvicorn", "httpx"),
+}
+
+CHILD_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+imported = time.perf_counter()
+result = {{"import": imported - start}}
+if {first_request!r}:
+    import asyncio, httpx
+
+    async def first_request():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://startup"
+        ) as client:
+            response = await client.post(
+                "/api/v1/tests/analyze", json={{"code": {source!r}}}
+            )
+            response.raise_for_status()
+
+    asyncio.run(first_request())
+    result["first_request"] = time.perf_counter() - imported
+result["loaded"] = [name for name in {forbidden!r} if name in sys.modules]
+print(json.dumps(result))
+"""
+
+
+def run_child(name: str, source: str) -> Dict[str, Any]:
+    """Run one cold start of ``name`` and return the child's measurements."""
+    code = CHILD_TEMPLATE.format(
+        statement=TARGETS[name],
+        first_request=name == "api.first_request",
+        source=source,
+        forbidden=FORBIDDEN_MODULES.get(name, ()),
+    )
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def benchmark_target(name: str, repeat: int, source: str) -> Dict[str, Any]:
+    """Start ``name`` ``repeat`` times and summarize the measured timings."""
+    runs = [run_child(name, source) for _ in range(repeat)]
+    metric = "first_request" if name == "api.first_request" else "import"
+    timings = [run[metric] for run in runs]
+    return {
+        "name": name,
+        "size": len(source) if metric == "first_request" else 0,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+        "process_median": statistics.median(run["process"] for run in runs),
+        "loaded_forbidden": sorted(
+            {module for run in runs for module in run["loaded"]}
+        ),
+    }
+
+
+def check_budgets(results: List[Dict[str, Any]], scale: float) -> List[str]:
+    """Return a message for each result over budget or loading forbidden modules."""
+    failures = []
+    for item in results:
+        budget = BUDGETS_MS[item["name"]] * scale
+        if item["median"] * 1000 > budget:
+            failures.append(
+                f"{item['name']}: median {item['median'] * 1000:.0f} ms "
+                f"exceeds the {budget:.0f} ms budget"
+            )
+        if item["loaded_forbidden"]:
+            failures.append(
+                f"{item['name']}: imports {', '.join(item['loaded_forbidden'])}"
+            )
+    return failures
+
+
+def main():
+    """Run the cold-start benchmark and save the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="JSON file for the results")
+    parser.add_argument("--compare", type=Path, help="previous results to compare")
+    parser.add_argument(
+        "--check", action="store_true", help="fail when a budget is exceeded"
+    )
+    parser.add_argument("--budget-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    source = make_source(1_000)
+    results = []
+    for name in args.targets:
+        item = benchmark_target(name, args.repeat, source)
+        results.append(item)
+        print(
+            f"{name:<24} median {item['median'] * 1000:8.1f} ms  "
+            f"process {item['process_median'] * 1000:8.1f} ms  "
+            f"budget {BUDGETS_MS[name] * args.budget_scale:6.0f} ms",
+            flush=True,
+        )
+
+    report = {"environment": environment(), "results": results}
+    output = args.output
+    if output is None:
+        DEFAULT_OUTPUT_DIR.mkdir(exist_ok=True)
+        commit = (report["environment"]["commit"] or "unknown")[:12]
+        output = DEFAULT_OUTPUT_DIR / f"startup-{commit}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.check:
+        failures = check_budgets(results, args.budget_scale)
+        for failure in failures:
+            print(f"FAIL {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+
+# Pools em threads e índice de projetos em memória: os testes não criam
+# processos nem arquivos SQLite no diretório do repositório
+os.environ.setdefault("BATCH_WORKER_POOL_MODE", "thread")
+os.environ.setdefault("PROJECT_INDEX_PATH", "")
+os.environ.setdefault("MCP_MEMORY_BACKEND", "memory")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+API_URL = f"{settings.API_V1_STR}/tests"
+
+
+@pytest.fixture
+def client():
+    """Cliente HTTP da aplicação, executando o ciclo de vida completo."""
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,97 @@
+import threading
+
+from app.core.analysis_cache import AnalysisCache
+from app.models import test_models
+
+PYTEST = test_models.TestFramework.PYTEST
+
+
+def test_get_returns_stored_values_and_counts_hits():
+    cache = AnalysisCache(max_entries=4, ttl_seconds=60)
+    cache.store_analysis("a", PYTEST, "analise", size=10)
+    cache.store_rendered("a", PYTEST, "codigo")
+
+    assert cache.get_analysis("a", PYTEST) == "analise"
+    assert cache.get_rendered("a", PYTEST) == "codigo"
+    assert cache.get_rendered("a", test_models.TestFramework.UNITTEST) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["bytes"] == 10 + len("codigo")
+
+
+def test_evicts_least_recently_used_entry():
+    cache = AnalysisCache(max_entries=2, ttl_seconds=60)
+    cache.store_rendered("a", PYTEST, "a")
+    cache.store_rendered("b", PYTEST, "b")
+    cache.get_rendered("a", PYTEST)
+    cache.store_rendered("c", PYTEST, "c")
+
+    assert cache.get_rendered("b", PYTEST) is None
+    assert cache.get_rendered("a", PYTEST) == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_evicts_oldest_entries():
+    cache = AnalysisCache(max_entries=100, ttl_seconds=60, max_bytes=25)
+    for digest in "abc":
+        cache.store_rendered(digest, PYTEST, digest * 10)
+
+    assert cache.get_rendered("a", PYTEST) is None
+    assert cache.get_rendered("c", PYTEST) == "c" * 10
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["bytes"] == 20
+
+
+def test_values_larger_than_byte_limit_are_not_stored():
+    cache = AnalysisCache(max_entries=100, ttl_seconds=60, max_bytes=25)
+    cache.store_rendered("a", PYTEST, "a" * 10)
+    cache.store_analysis("b", PYTEST, object(), size=26)
+
+    assert cache.get_analysis("b", PYTEST) is None
+    assert cache.get_rendered("a", PYTEST) == "a" * 10
+    assert cache.stats()["bytes"] == 10
+
+
+def test_replacing_a_value_updates_its_size():
+    cache = AnalysisCache(max_entries=4, ttl_seconds=60)
+    cache.store_rendered("a", PYTEST, "a" * 10)
+    cache.store_rendered("a", PYTEST, "a" * 3)
+
+    assert cache.stats()["bytes"] == 3
+
+
+def test_expired_entries_are_dropped():
+    cache = AnalysisCache(max_entries=4, ttl_seconds=0)
+    cache.store_rendered("a", PYTEST, "codigo")
+
+    assert cache.get_rendered("a", PYTEST) is None
+    stats = cache.stats()
+    assert (stats["size"], stats["bytes"]) == (0, 0)
+
+
+def test_disabled_cache_stores_nothing():
+    cache = AnalysisCache(max_entries=0, ttl_seconds=60)
+    cache.store_rendered("a", PYTEST, "codigo")
+
+    assert cache.get_rendered("a", PYTEST) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_counters_are_exact_under_concurrent_lookups():
+    cache = AnalysisCache(max_entries=4, ttl_seconds=60)
+    cache.store_rendered("a", PYTEST, "codigo")
+
+    def lookup():
+        for _ in range(2000):
+            cache.get_rendered("a", PYTEST)
+            cache.get_rendered("b", PYTEST)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (16000, 16000)
@@ -0,0 +1,144 @@
+import asyncio
+
+from app.core.worker_pool import WorkerPool
+from app.services import test_validator
+
+from conftest import API_URL
+
+TEST_FILE = '''
+import requests
+
+
+def test_soma():
+    """Soma dois números."""
+    assert 1 + 1 == 2
+
+
+def test_sem_assert():
+    """Não verifica nada."""
+    requests.get("http://exemplo")
+
+
+class TestConta:
+    saldo.inicial = 0
+
+    def test_deposito(self):
+        """Deposita um valor."""
+        assert True
+
+    def ajuda(self):
+        pass
+
+
+async def test_assincrono():
+    """Aguarda uma corrotina."""
+    assert await consulta() == 1
+'''
+
+
+def validate_file(test_code):
+    validator = test_validator.TestValidator(worker_pool=WorkerPool("inline", 1, 1))
+    return asyncio.run(validator.validate_test_file(test_code))
+
+
+def test_validate_test_file_reports_each_test():
+    result = validate_file(TEST_FILE)
+
+    names = [test.name for test in result.tests]
+    assert names == ["test_soma", "test_sem_assert", "test_deposito", "test_assincrono"]
+    assert result.test_count == 4
+    assert not result.is_valid
+
+
+def test_validate_test_file_issues_are_per_test():
+    tests = {test.name: test for test in validate_file(TEST_FILE).tests}
+
+    assert tests["test_soma"].is_valid
+    assert tests["test_soma"].isolation_score == 1.0
+    issue_types = {issue.type for issue in tests["test_sem_assert"].issues}
+    assert issue_types == {"no_assertions", "no_mocks"}
+    # Variáveis de classe compartilhadas contam para os testes da classe
+    assert [issue.type for issue in tests["test_deposito"].issues] == ["shared_state"]
+
+
+def test_validate_test_file_includes_async_tests():
+    test = validate_file(TEST_FILE).tests[-1]
+
+    assert test.name == "test_assincrono"
+    assert test.line_number == 26
+    # A docstring de funções async também é reconhecida
+    assert test.is_valid
+
+
+def test_single_file_validation_keeps_ignoring_async_functions():
+    # ``/validate`` avalia o arquivo inteiro como antes: funções async não
+    # passam pelas regras de nomenclatura e documentação
+    test_code = """
+async def preparar():
+    return 1
+
+
+def test_soma():
+    \"\"\"Soma dois números.\"\"\"
+    assert 1 + 1 == 2
+"""
+    validator = test_validator.TestValidator(worker_pool=WorkerPool("inline", 1, 1))
+
+    result = asyncio.run(validator.validate_test(test_code))
+
+    assert result.issues == []
+
+
+def test_validate_test_file_scores_are_mean_of_tests():
+    result = validate_file(TEST_FILE)
+
+    expected = sum(test.maintainability_score for test in result.tests) / 4
+    assert result.maintainability_score == expected
+
+
+def test_validate_test_file_without_tests():
+    result = validate_file("def auxiliar():\n    pass\n")
+
+    assert result.is_valid
+    assert result.test_count == 0
+    assert result.isolation_score == 1.0
+
+
+def test_validate_test_file_syntax_error():
+    result = validate_file("def test_quebrado(:\n")
+
+    assert not result.is_valid
+    assert [issue.type for issue in result.issues] == ["syntax_error"]
+
+
+def test_validate_batch_endpoint(client):
+    response = client.post(
+        f"{API_URL}/validate/batch",
+        json={
+            "items": [
+                {"file_path": "tests/test_a.py", "test_code": TEST_FILE},
+                {"file_path": "tests/test_b.py", "test_code": "def test_x(:"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["file_path"] for item in body["results"]] == [
+        "tests/test_a.py",
+        "tests/test_b.py",
+    ]
+    assert body["test_count"] == 4
+    assert body["invalid_tests"] == 2
+    assert body["results"][1]["result"]["issues"][0]["type"] == "syntax_error"
+
+
+def test_validate_batch_rejects_too_many_items(client, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "VALIDATION_BATCH_MAX_ITEMS", 1)
+    item = {"test_code": "def test_x():\n    assert True\n"}
+
+    response = client.post(f"{API_URL}/validate/batch", json={"items": [item, item]})
+
+    assert response.status_code == 413
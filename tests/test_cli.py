@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.models import test_models
+from app.services import batch_runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = {
+    "pkg/calculo.py": "def soma(a, b):\n    return a + b\n",
+    "pkg/quebrado.py": "def soma(a, b:\n",
+    "pkg/texto.py": "def maiusculas(texto):\n    return texto.upper()\n",
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    for path, source in MODULES.items():
+        (tmp_path / "src" / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / "src" / path).write_text(source)
+    return tmp_path
+
+
+def run_cli(cwd, *args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, os.path.join(ROOT, "cli.py"), *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def read_results(stdout):
+    return {result["path"]: result for result in map(json.loads, stdout.splitlines())}
+
+
+def test_generate_reports_failing_module_and_keeps_the_others(project):
+    completed = run_cli(project, "generate", "src", "--workers", "2")
+
+    assert completed.returncode == 0
+    results = read_results(completed.stdout)
+    assert list(results) == [f"src/{path}" for path in sorted(MODULES)]
+    assert "error" in results["src/pkg/quebrado.py"]
+    assert "def test_soma" in results["src/pkg/calculo.py"]["test_code"]
+    assert "3 arquivo(s)" in completed.stderr
+    assert "1 erro(s)" in completed.stderr
+
+
+def test_strict_mode_exits_with_error_on_failing_module(project):
+    completed = run_cli(
+        project, "generate", "src", "--output-dir", "gerados", "--strict"
+    )
+
+    assert completed.returncode == 1
+    assert completed.stdout == ""
+    generated = project / "gerados" / "src" / "pkg"
+    assert sorted(os.listdir(generated)) == ["test_calculo.py", "test_texto.py"]
+
+
+def test_strict_mode_exits_with_success_without_errors(project):
+    (project / "src" / "pkg" / "quebrado.py").unlink()
+
+    completed = run_cli(project, "analyze", "src", "--strict", "--output", "a.ndjson")
+
+    assert completed.returncode == 0
+    with open(project / "a.ndjson") as output:
+        results = read_results(output.read())
+    assert all("error" not in result for result in results.values())
+
+
+def test_invalid_tests_fail_strict_validation(project):
+    tests = project / "tests"
+    tests.mkdir()
+    (tests / "test_ok.py").write_text(
+        'def test_soma():\n    """Soma."""\n    assert 1 + 1 == 2\n'
+    )
+    (tests / "test_ruim.py").write_text("def test_vazio():\n    pass\n")
+
+    completed = run_cli(project, "validate", "tests", "--strict")
+
+    assert completed.returncode == 1
+    results = read_results(completed.stdout)
+    assert results["tests/test_ok.py"]["is_valid"] is True
+    assert results["tests/test_ruim.py"]["is_valid"] is False
+
+
+def test_process_pool_matches_inline_run(project, monkeypatch):
+    monkeypatch.chdir(project)
+    tasks = batch_runner.collect_tasks(
+        "generate", ["src"], test_models.TestFramework.PYTEST
+    )
+
+    def without_duration(results):
+        return [
+            {key: value for key, value in result.items() if key != "duration_ms"}
+            for result in results
+        ]
+
+    inline = without_duration(batch_runner.run_batch(tasks, 1))
+    assert without_duration(batch_runner.run_batch(tasks, 2)) == inline
@@ -0,0 +1,107 @@
+from app.models import test_data
+from app.services.test_analyzer import diff_test_suites
+
+from conftest import API_URL
+
+ORIGINAL = """
+def a(x):
+    return x
+
+
+def b(y):
+    return y
+"""
+
+EDITED = """
+def a(x):
+    return x
+
+
+def c(y):
+    return y
+"""
+
+
+def make_suite(*test_cases):
+    return test_data.TestSuiteData(
+        class_name="TestModulo",
+        description="Testes do módulo",
+        test_cases=list(test_cases),
+        imports=["pytest"],
+    )
+
+
+def make_case(name, test_code="assert True"):
+    return test_data.TestCaseData(name=name, description=name, test_code=test_code)
+
+
+def test_diff_reports_added_removed_and_changed_cases():
+    base = make_suite(make_case("test_a"), make_case("test_b"), make_case("test_c"))
+    current = make_suite(
+        make_case("test_a"), make_case("test_c", "assert 1 == 1"), make_case("test_d")
+    )
+
+    delta = diff_test_suites(base, current)
+
+    assert [case.name for case in delta.added] == ["test_d"]
+    assert delta.removed == ["test_b"]
+    assert [case.name for case in delta.changed] == ["test_c"]
+    assert delta.changed[0].test_code == "assert 1 == 1"
+    assert not delta.full
+
+
+def test_diff_pairs_repeated_names_by_occurrence():
+    base = make_suite(make_case("test_x", "assert 1"), make_case("test_x", "assert 2"))
+    current = make_suite(make_case("test_x", "assert 1"))
+
+    delta = diff_test_suites(base, current)
+
+    assert delta.removed == ["test_x"]
+    assert delta.added == []
+    assert delta.changed == []
+
+
+def test_diff_without_base_is_full():
+    current = make_suite(make_case("test_a"), make_case("test_b"))
+
+    delta = diff_test_suites(None, current)
+
+    assert delta.full
+    assert [case.name for case in delta.added] == ["test_a", "test_b"]
+    assert delta.removed == []
+
+
+def test_delta_endpoint_against_previous_digest(client):
+    first = client.post(f"{API_URL}/analyze/delta", json={"code": ORIGINAL}).json()
+    assert first["delta"]["full"]
+
+    response = client.post(
+        f"{API_URL}/analyze/delta",
+        json={"code": EDITED, "base_digest": first["digest"]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    delta = body["delta"]
+    assert body["base_digest"] == first["digest"]
+    assert not delta["full"]
+    assert sorted(case["name"] for case in delta["added"]) == [
+        "test_c_basic_functionality",
+        "test_c_edge_cases",
+    ]
+    assert sorted(delta["removed"]) == [
+        "test_b_basic_functionality",
+        "test_b_edge_cases",
+    ]
+    assert delta["changed"] == []
+
+
+def test_delta_endpoint_with_unknown_base_is_full(client):
+    response = client.post(
+        f"{API_URL}/analyze/delta", json={"code": EDITED, "base_digest": "f" * 32}
+    )
+
+    assert response.status_code == 200
+    delta = response.json()["delta"]
+    assert delta["full"]
+    assert len(delta["added"]) == 4
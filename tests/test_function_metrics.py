@@ -0,0 +1,118 @@
+import glob
+import os
+from operator import attrgetter
+
+import pytest
+
+from app.core.parsed_module import ParsedModule
+from app.services import test_analyzer
+
+from conftest import API_URL
+
+SOURCE = """
+class Conta:
+    def __init__(self, saldo=0):
+        self.saldo = saldo
+
+    def sacar(self, valor):
+        if valor <= 0 or valor > self.saldo:
+            raise ValueError("valor inválido")
+        for _ in range(3):
+            self.saldo -= valor / 3
+        return self.saldo
+
+
+def classificar(x, y, z):
+    try:
+        while x and y and z:
+            x -= 1
+    except ValueError:
+        return "valor"
+    except TypeError:
+        return "tipo"
+
+    def interna():
+        if x:
+            return 1
+
+    return interna
+
+
+async def buscar(cliente):
+    return await cliente.get()
+"""
+
+# (nome, complexidade, testes gerados), na ordem das linhas
+EXPECTED_METRICS = [
+    ("Conta.__init__", 1, 0),
+    ("Conta.sacar", 4, 1),
+    ("classificar", 7, 2),
+    ("classificar.<locals>.interna", 2, 0),
+    ("buscar", 1, 0),
+]
+
+
+def test_function_metrics_follow_the_code():
+    analysis = test_analyzer.build_code_analysis(ParsedModule.from_source(SOURCE))
+
+    metrics = sorted(analysis.function_metrics, key=attrgetter("line_number"))
+    assert [
+        (metric.name, metric.complexity, metric.test_count) for metric in metrics
+    ] == EXPECTED_METRICS
+    for metric in metrics:
+        assert metric.coverage_estimate == pytest.approx(
+            min(metric.test_count, metric.complexity) / metric.complexity
+        )
+
+
+def test_aggregate_scores_are_computed_from_the_functions():
+    analysis = test_analyzer.build_code_analysis(ParsedModule.from_source(SOURCE))
+
+    complexities = [complexity for _, complexity, _ in EXPECTED_METRICS]
+    covered = sum(min(tests, paths) for _, paths, tests in EXPECTED_METRICS)
+    assert analysis.complexity_score == pytest.approx(
+        sum(complexities) / len(complexities)
+    )
+    assert analysis.coverage_estimate == pytest.approx(covered / sum(complexities))
+
+
+def test_module_without_functions_has_neutral_scores():
+    analysis = test_analyzer.build_code_analysis(ParsedModule.from_source("x = 1\n"))
+
+    assert analysis.function_metrics == []
+    assert analysis.complexity_score == 1.0
+    assert analysis.coverage_estimate == 0.0
+
+
+def test_analyze_returns_the_computed_scores(client):
+    analysis = test_analyzer.build_code_analysis(ParsedModule.from_source(SOURCE))
+
+    response = client.post(f"{API_URL}/analyze", json={"code": SOURCE})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["complexity_score"] == pytest.approx(analysis.complexity_score)
+    assert body["coverage_estimate"] == pytest.approx(analysis.coverage_estimate)
+    assert [metric["name"] for metric in body["function_metrics"]] == [
+        metric.name for metric in analysis.function_metrics
+    ]
+
+
+def stdlib_modules():
+    directory = os.path.dirname(os.__file__)
+    return sorted(glob.glob(os.path.join(directory, "*.py")))[:40]
+
+
+@pytest.mark.skipif(not stdlib_modules(), reason="código da stdlib indisponível")
+def test_indexed_complexity_matches_complexity_calculator():
+    calculator = test_analyzer.ComplexityCalculator()
+    differences = []
+    for path in stdlib_modules():
+        with open(path, encoding="utf-8") as source_file:
+            module = ParsedModule.from_source(source_file.read())
+        for node in module.all_functions:
+            stats = module.function_stats(node)
+            if stats.complexity != calculator.calculate_complexity(node):
+                differences.append(f"{os.path.basename(path)}:{stats.qualname}")
+
+    assert differences == []
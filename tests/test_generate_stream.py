@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import pytest
+
+from app.api.endpoints import test_endpoints
+from app.core.analysis_cache import AnalysisCache
+from app.core.config import settings
+from app.core.parsed_module import ParsedModule
+from app.core.worker_pool import WorkerPool
+from app.models import test_models
+from app.services import test_generator
+
+from conftest import API_URL
+
+# Funções suficientes para que a suite seja renderizada em vários trechos
+SOURCE = "\n\n".join(
+    f"def funcao_{index}(valor):\n    return valor + {index}\n" for index in range(80)
+)
+
+
+def make_generator(cache=None):
+    return test_generator.TestGenerator(
+        cache=cache or AnalysisCache(max_entries=16, ttl_seconds=60),
+        worker_pool=WorkerPool("thread", 1, 8),
+    )
+
+
+def generator_digest(code):
+    return ParsedModule.from_source(code).digest
+
+
+async def collect_parts(generator, code, framework):
+    return [part async for part in generator.iter_test_suite(code, framework)]
+
+
+@pytest.mark.parametrize("framework", list(test_models.TestFramework))
+def test_streamed_parts_join_to_the_full_suite(framework):
+    generator = make_generator()
+    parts = asyncio.run(collect_parts(generator, SOURCE, framework))
+    expected = asyncio.run(make_generator().generate_test_suite(SOURCE, framework))
+
+    assert len(parts) > test_generator.RENDER_CHUNK_SIZE + 2
+    assert "".join(parts) == expected
+
+
+def test_streamed_suite_is_cached_when_small():
+    cache = AnalysisCache(max_entries=16, ttl_seconds=60)
+    generator = make_generator(cache)
+    framework = test_models.TestFramework.PYTEST
+    parts = asyncio.run(collect_parts(generator, SOURCE, framework))
+
+    # Do cache a suite volta inteira, em uma única parte
+    again = asyncio.run(collect_parts(generator, SOURCE, framework))
+    assert again == ["".join(parts)]
+
+
+def test_large_streamed_suite_skips_the_rendered_cache(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_CACHE_MAX_BYTES", 1000)
+    cache = AnalysisCache(max_entries=16, ttl_seconds=60)
+    generator = make_generator(cache)
+    framework = test_models.TestFramework.PYTEST
+    parts = asyncio.run(collect_parts(generator, SOURCE, framework))
+
+    assert cache.get_rendered(generator_digest(SOURCE), framework) is None
+    again = asyncio.run(collect_parts(generator, SOURCE, framework))
+    assert again == parts
+
+
+def test_stream_endpoint_returns_ndjson_parts(client):
+    response = client.post(
+        f"{API_URL}/generate?stream=true",
+        json={"code": SOURCE, "framework": "pytest"},
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert "session_id" in lines[-1]
+    code = "".join(line["test_code"] for line in lines[:-1])
+    assert "def test_funcao_79" in code
+
+
+def test_stream_endpoint_with_empty_generator(client, monkeypatch):
+    async def no_parts(code, framework):
+        return
+        yield
+
+    monkeypatch.setattr(test_endpoints.services.generator, "iter_test_suite", no_parts)
+
+    response = client.post(
+        f"{API_URL}/generate?stream=true", json={"code": "x = 1", "framework": "pytest"}
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert list(lines[0]) == ["session_id"]
+    assert len(lines) == 1
+
+
+def test_batch_stream_ends_when_a_worker_fails(monkeypatch):
+    def broken_item(**fields):
+        raise RuntimeError("falha fora do tratamento por arquivo")
+
+    monkeypatch.setattr(test_endpoints, "BatchGenerationItem", broken_item)
+    items = [test_models.CodeAnalysisRequest(code=f"x = {index}") for index in range(4)]
+
+    async def consume():
+        return [line async for line in test_endpoints._stream_batch_generation(items)]
+
+    async def scenario():
+        return await asyncio.wait_for(consume(), timeout=10)
+
+    with pytest.raises(RuntimeError, match="falha fora"):
+        asyncio.run(scenario())
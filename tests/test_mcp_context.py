@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import mcp_context
+from app.core.memory_backend import MemoryBackend, SQLiteMemoryBackend
+from app.models import test_data
+
+SESSIONS = [f"sessao{index}" for index in range(16)]
+CASES_PER_SESSION = 20
+CODE = "def test_algo():\n    assert True\n"
+
+
+def make_test_case(session_id, index):
+    return test_data.TestCaseData(
+        name=f"test_{session_id}_{index}",
+        description=f"o caso {index} de {session_id}",
+        test_code="assert True",
+    )
+
+
+async def use_session(context, session_id):
+    """Aprende padrões e guarda resultados intercalando com as demais sessões."""
+    await context.open_session(session_id)
+    for index in range(CASES_PER_SESSION):
+        test_case = make_test_case(session_id, index)
+        await context.learn_from_test_cases(session_id, [test_case])
+        await context.store_test_result(session_id, test_case, True, [])
+        await asyncio.sleep(0)
+    return await context.get_test_suggestions(session_id, CODE)
+
+
+def assert_isolated(context, suggestions):
+    for session_id in SESSIONS:
+        expected = {
+            make_test_case(session_id, index).name for index in range(CASES_PER_SESSION)
+        }
+        session = context.test_context.get(session_id)
+
+        assert {pattern.name for pattern in session.patterns} == expected
+        assert set(session.memories) == expected
+        assert len(suggestions[session_id]) == CASES_PER_SESSION
+        assert all(f"'test_{session_id}_" in text for text in suggestions[session_id])
+
+
+def test_parallel_sessions_do_not_share_state():
+    # Poucos shards: várias sessões disputam o mesmo lock
+    context = mcp_context.MCPContext(memory_backend=MemoryBackend(), lock_shards=2)
+    barrier = threading.Barrier(len(SESSIONS))
+    suggestions = {}
+
+    def run(session_id):
+        barrier.wait()
+        suggestions[session_id] = asyncio.run(use_session(context, session_id))
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in SESSIONS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_isolated(context, suggestions)
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    backend = SQLiteMemoryBackend(str(tmp_path / "memoria.db"), flush_interval=60.0)
+    yield backend
+    backend.close()
+
+
+def test_concurrent_persistent_sessions_do_not_share_state(sqlite_backend):
+    # ``sync_interval`` zero relê o backend a cada acesso à sessão
+    context = mcp_context.MCPContext(
+        memory_backend=sqlite_backend, sync_interval=0, lock_shards=2
+    )
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(use_session(context, session_id) for session_id in SESSIONS)
+        )
+        return dict(zip(SESSIONS, results))
+
+    suggestions = asyncio.run(scenario())
+    context.flush()
+
+    assert_isolated(context, suggestions)
+    # Um novo processo reconstrói cada sessão apenas com os próprios eventos
+    reader = mcp_context.MCPContext(memory_backend=sqlite_backend, lock_shards=2)
+    restored = {
+        session_id: asyncio.run(reader.get_test_suggestions(session_id, CODE))
+        for session_id in SESSIONS
+    }
+    assert_isolated(reader, restored)
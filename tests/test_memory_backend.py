@@ -0,0 +1,155 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.core import mcp_context
+from app.core.memory_backend import SQLiteMemoryBackend
+from app.core.session_store import SessionStore
+from app.models import test_data
+
+
+@pytest.fixture
+def backend_factory(tmp_path):
+    """Cria backends SQLite sobre o mesmo arquivo, fechando-os no final."""
+    backends = []
+
+    def create(**options):
+        options.setdefault("flush_interval", 60.0)
+        backend = SQLiteMemoryBackend(str(tmp_path / "memoria.db"), **options)
+        backends.append(backend)
+        return backend
+
+    yield create
+    for backend in backends:
+        backend.close()
+
+
+def count_events(backend):
+    # A leitura cria as tabelas caso o backend ainda não tenha se conectado
+    backend.load("", 0, "")
+    with sqlite3.connect(backend.path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM mcp_events").fetchone()[0]
+
+
+def make_test_case(name):
+    return test_data.TestCaseData(
+        name=name, description=f"o caso {name}", test_code="assert True"
+    )
+
+
+def test_events_are_written_in_batches(backend_factory):
+    backend = backend_factory(batch_size=3)
+    backend.append("sessao", "w1", "pattern", {"name": "a"})
+    backend.append("sessao", "w1", "pattern", {"name": "b"})
+    assert count_events(backend) == 0
+
+    backend.append("sessao", "w1", "pattern", {"name": "c"})
+
+    assert count_events(backend) == 3
+
+
+def test_background_thread_flushes_pending_events(backend_factory):
+    backend = backend_factory(batch_size=100, flush_interval=0.05)
+    backend.append("sessao", "w1", "pattern", {"name": "a"})
+
+    deadline = time.monotonic() + 5
+    while count_events(backend) == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert count_events(backend) == 1
+
+
+def test_load_skips_events_of_the_same_writer(backend_factory):
+    backend = backend_factory(batch_size=1)
+    backend.append("sessao", "w1", "pattern", {"name": "a"})
+    backend.append("sessao", "w2", "pattern", {"name": "b"})
+    backend.append("outra", "w2", "pattern", {"name": "c"})
+
+    cursor, events = backend_factory().load("sessao", 0, "w1")
+
+    assert events == [("pattern", {"name": "b"})]
+    assert backend_factory().load("sessao", cursor, "w3") == (cursor, [])
+
+
+def test_close_flushes_pending_events(backend_factory):
+    backend = backend_factory(batch_size=100)
+    backend.append("sessao", "w1", "pattern", {"name": "a"})
+
+    backend.close()
+
+    assert count_events(backend) == 1
+
+
+def test_purge_removes_sessions_past_retention(backend_factory, monkeypatch):
+    backend = backend_factory(batch_size=1, retention_seconds=60)
+    backend.append("antiga", "w1", "pattern", {"name": "a"})
+    now = time.time()
+    monkeypatch.setattr("app.core.memory_backend.time.time", lambda: now + 45)
+    backend.append("recente", "w1", "pattern", {"name": "b"})
+    monkeypatch.setattr("app.core.memory_backend.time.time", lambda: now + 90)
+
+    assert backend.purge_expired() == 1
+
+    assert backend.load("antiga", 0, "w2")[1] == []
+    assert backend.load("recente", 0, "w2")[1] == [("pattern", {"name": "b"})]
+
+
+def test_throwaway_sessions_are_not_persisted(backend_factory):
+    backend = backend_factory(batch_size=1)
+    context = mcp_context.MCPContext(memory_backend=backend)
+
+    async def scenario():
+        await context.create_session("gerada")
+        await context.learn_from_test_cases("gerada", [make_test_case("test_a")])
+
+    asyncio.run(scenario())
+
+    assert count_events(backend) == 0
+
+
+def test_reused_session_is_persisted_and_shared(backend_factory):
+    writer = mcp_context.MCPContext(
+        memory_backend=backend_factory(batch_size=1), sync_interval=0
+    )
+    reader = mcp_context.MCPContext(
+        memory_backend=backend_factory(batch_size=1), sync_interval=0
+    )
+
+    async def scenario():
+        await writer.create_session("gerada")
+        await writer.learn_from_test_cases("gerada", [make_test_case("test_a")])
+        # O cliente volta com o session_id recebido
+        await writer.open_session("gerada")
+        await writer.learn_from_test_cases("gerada", [make_test_case("test_b")])
+
+        await reader.open_session("gerada")
+        return await reader.get_test_suggestions("gerada", "")
+
+    suggestions = asyncio.run(scenario())
+
+    assert len(suggestions) == 2
+    assert "test_a" in suggestions[0]
+    assert "test_b" in suggestions[1]
+
+
+def test_evicted_session_is_restored_with_its_own_events(backend_factory):
+    context = mcp_context.MCPContext(
+        session_store=SessionStore(max_sessions=1, idle_ttl_seconds=3600),
+        memory_backend=backend_factory(batch_size=1),
+        sync_interval=0,
+    )
+
+    async def scenario():
+        await context.open_session("primeira")
+        await context.learn_from_test_cases("primeira", [make_test_case("test_a")])
+        # A segunda sessão tira a primeira do store local (LRU)
+        await context.open_session("segunda")
+        assert "primeira" not in context.test_context
+        return await context.get_test_suggestions("primeira", "")
+
+    suggestions = asyncio.run(scenario())
+
+    assert len(suggestions) == 1
+    assert "test_a" in suggestions[0]
@@ -0,0 +1,81 @@
+import itertools
+import random
+
+from app.core import mcp_context
+from app.core.parsed_module import CodeFeatures
+
+
+def make_pattern(name, has_setup=False, assertion_count=1, has_dependencies=False):
+    return mcp_context.TestPattern(
+        name=name,
+        description=f"o comportamento de {name}",
+        has_setup=has_setup,
+        assertion_count=assertion_count,
+        has_dependencies=has_dependencies,
+    )
+
+
+def test_repeated_pattern_is_deduplicated():
+    index = mcp_context.PatternIndex()
+    first = index.add(make_pattern("test_soma"))
+
+    again = index.add(make_pattern("test_soma"))
+
+    assert again is first
+    assert first.occurrences == 2
+    assert len(index) == 1
+
+
+def test_patterns_with_same_structure_and_different_names_are_kept():
+    index = mcp_context.PatternIndex()
+    index.add(make_pattern("test_soma"))
+    index.add(make_pattern("test_subtracao"))
+
+    names = [pattern.name for pattern in index.match(CodeFeatures(False, 1))]
+    assert names == ["test_soma", "test_subtracao"]
+    assert len(index) == 2
+
+
+def test_match_filters_by_setup_and_assertion_count():
+    index = mcp_context.PatternIndex()
+    index.add(make_pattern("test_com_setup", has_setup=True))
+    index.add(make_pattern("test_tres_asserts", assertion_count=3))
+    index.add(make_pattern("test_simples", assertion_count=0))
+
+    def names(features):
+        return [pattern.name for pattern in index.match(features)]
+
+    assert names(CodeFeatures(False, 1)) == ["test_simples"]
+    assert names(CodeFeatures(True, 1)) == ["test_com_setup", "test_simples"]
+    assert names(CodeFeatures(True, 5)) == [
+        "test_com_setup",
+        "test_tres_asserts",
+        "test_simples",
+    ]
+    # Módulos sem funções atendem a qualquer padrão
+    assert len(names(CodeFeatures(True, None))) == 3
+
+
+def test_match_agrees_with_pattern_matches_features():
+    generator = random.Random(7)
+    index = mcp_context.PatternIndex()
+    learned = []
+    for number in range(300):
+        pattern = make_pattern(
+            f"test_{generator.randrange(60)}",
+            has_setup=generator.random() < 0.3,
+            assertion_count=generator.randrange(6),
+            has_dependencies=generator.random() < 0.5,
+        )
+        stored = index.add(pattern)
+        if stored is pattern:
+            learned.append(pattern)
+
+    for all_have_setup, min_count in itertools.product(
+        (False, True), (None, 0, 1, 2, 4, 9)
+    ):
+        features = CodeFeatures(all_have_setup, min_count)
+        expected = [
+            pattern for pattern in learned if pattern.matches_features(features)
+        ]
+        assert index.match(features) == expected
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.core.profiling import RequestProfiler, profiling_active
+from app.core.worker_pool import WorkerPool
+
+SCOPE = {
+    "type": "http",
+    "method": "POST",
+    "path": "/api/v1/tests/analyze",
+    "client": ("127.0.0.1", 5000),
+    "headers": [(b"x-profile", b"1")],
+    "query_string": b"",
+}
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return RequestProfiler(
+        enabled=True,
+        allowed_clients=["127.0.0.1"],
+        sample_rate=0,
+        output_dir=str(tmp_path / "perfis"),
+        max_profiles=2,
+    )
+
+
+def runs_in_worker():
+    """Indica se a tarefa rodou fora do event loop."""
+    try:
+        asyncio.get_running_loop()
+        return False
+    except RuntimeError:
+        return True
+
+
+def run_profiled(profiler, call, wait=True):
+    async def scenario():
+        return await profiler.profile(SCOPE, call, wait=wait)
+
+    return asyncio.run(scenario())
+
+
+def test_requested_profiles_run_pool_tasks_inline(profiler):
+    pool = WorkerPool("thread", 1, 4)
+    seen = {}
+
+    async def call():
+        seen["active"] = profiling_active()
+        seen["in_worker"] = await pool.run(runs_in_worker)
+
+    run_profiled(profiler, call, wait=True)
+
+    assert seen["active"]
+    assert not seen["in_worker"]
+    pool.shutdown()
+
+
+def test_sampled_profiles_keep_tasks_in_the_pool(profiler):
+    pool = WorkerPool("thread", 1, 4)
+    seen = {}
+
+    async def call():
+        seen["active"] = profiling_active()
+        seen["in_worker"] = await pool.run(runs_in_worker)
+
+    run_profiled(profiler, call, wait=False)
+
+    assert not seen["active"]
+    assert seen["in_worker"]
+    pool.shutdown()
+
+
+def busy_work(count):
+    """Trabalho de CPU executado no pool."""
+    return sum(index * index for index in range(count))
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_sampled_profiles_include_pool_tasks(tmp_path, mode):
+    profiler = RequestProfiler(
+        enabled=True,
+        allowed_clients=[],
+        sample_rate=1,
+        output_dir=str(tmp_path),
+        module_filter=os.path.join("tests", ""),
+    )
+    pool = WorkerPool(mode, 1, 4)
+
+    async def call():
+        assert await pool.run(busy_work, 1000) == 332833500
+
+    try:
+        profile_id = run_profiled(profiler, call, wait=False)
+    finally:
+        pool.shutdown()
+
+    functions = [
+        item["function"] for item in profiler.load_summary(profile_id)["top_functions"]
+    ]
+    assert any(function.endswith("(busy_work)") for function in functions)
+
+
+def test_profile_is_saved_and_summarized(profiler):
+    async def call():
+        pass
+
+    profile_id = run_profiled(profiler, call)
+
+    summary = profiler.load_summary(profile_id)
+    assert summary["id"] == profile_id
+    assert summary["path"] == SCOPE["path"]
+    assert os.path.exists(os.path.join(profiler.output_dir, f"{profile_id}.prof"))
+
+
+def test_only_the_most_recent_profiles_are_kept(profiler):
+    async def call():
+        pass
+
+    profile_ids = []
+    for index in range(4):
+        profile_ids.append(run_profiled(profiler, call))
+        # Datas de modificação no passado, distintas e crescentes, mesmo em
+        # sistemas de arquivos com baixa resolução
+        path = os.path.join(profiler.output_dir, f"{profile_ids[-1]}.json")
+        mtime = time.time() - 1000 + index
+        os.utime(path, (mtime, mtime))
+
+    kept = sorted(os.listdir(profiler.output_dir))
+    assert kept == sorted(
+        f"{profile_id}{extension}"
+        for profile_id in profile_ids[-2:]
+        for extension in (".json", ".prof")
+    )
+    assert profiler.load_summary(profile_ids[0]) is None
+
+
+def test_load_summary_rejects_paths(profiler):
+    assert profiler.load_summary("../segredo") is None
@@ -0,0 +1,183 @@
+import asyncio
+import io
+import tarfile
+
+import pytest
+
+from app.core.project_index import ProjectIndexStore, index_module
+from app.core.worker_pool import WorkerPool
+from app.models import test_models
+from app.services.project_analyzer import (
+    ProjectAnalyzer,
+    ProjectTooLargeError,
+    load_tarball,
+)
+
+from conftest import API_URL
+
+SERVICE = """
+from pkg.models import User
+
+
+def carregar(id):
+    return User(id)
+"""
+
+
+def make_tarball(files):
+    """Monta um tar.gz com os arquivos ``{caminho: conteúdo}``."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for path, content in files.items():
+            data = content.encode() if isinstance(content, str) else content
+            member = tarfile.TarInfo(path)
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def store():
+    store = ProjectIndexStore("")
+    yield store
+    store.close()
+
+
+def test_tarball_strips_common_root_and_skips_unsafe_paths():
+    data = make_tarball(
+        {
+            "projeto-1.0/pkg/__init__.py": "",
+            "projeto-1.0/pkg/service.py": SERVICE,
+            "projeto-1.0/README.md": "# projeto",
+            "../fora.py": "x = 1",
+        }
+    )
+
+    sources = load_tarball(data)
+
+    assert [source.path for source in sources] == [
+        "pkg/__init__.py",
+        "pkg/service.py",
+    ]
+    assert sources[1].source == SERVICE
+
+
+def test_tarball_over_module_limit_stops_reading():
+    data = make_tarball({f"pkg/modulo_{index}.py": "x = 1" for index in range(5)})
+
+    assert len(load_tarball(data, max_modules=5)) == 5
+    with pytest.raises(ProjectTooLargeError):
+        load_tarball(data, max_modules=4)
+
+
+def test_tarball_over_byte_budget_counts_skipped_members():
+    # Um membro que não é código ainda é descompactado ao percorrer o tar
+    data = make_tarball({"dados.bin": b"\0" * 1_000_000, "modulo.py": "x = 1"})
+    assert len(data) < 10_000
+
+    with pytest.raises(ProjectTooLargeError):
+        load_tarball(data, max_bytes=100_000)
+    sources = load_tarball(data, max_bytes=2_000_000)
+    assert [source.path for source in sources] == ["modulo.py"]
+
+
+def test_store_keeps_same_path_with_different_contents(store):
+    first = index_module("pkg/service.py", SERVICE)
+    second = index_module("pkg/service.py", SERVICE + "\n\ndef outra():\n    pass\n")
+    store.store_many([first, second])
+
+    stored_first = store.get_many([("pkg/service.py", first.digest)])
+    stored_second = store.get_many([("pkg/service.py", second.digest)])
+
+    assert stored_first["pkg/service.py"].definitions == {"carregar": "function"}
+    assert "outra" in stored_second["pkg/service.py"].definitions
+    assert store.get_many([("pkg/service.py", "0" * 32)]) == {}
+
+
+def test_store_looks_up_many_modules_in_chunks(store):
+    modules = [index_module(f"pkg/m{index}.py", f"x = {index}") for index in range(900)]
+    store.store_many(modules)
+
+    found = store.get_many(
+        [(module.path, module.digest) for module in modules[::2]]
+        + [("pkg/ausente.py", "0" * 32)]
+    )
+
+    assert sorted(found) == sorted(module.path for module in modules[::2])
+
+
+def test_store_evicts_least_recently_used_modules(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr("app.core.project_index.time.time", lambda: next(clock))
+    store = ProjectIndexStore("", max_modules=2)
+    a, b, c = (index_module(f"pkg/{name}.py", "x = 1") for name in "abc")
+    store.store_many([a])
+    store.store_many([b])
+    store.get_many([(a.path, a.digest)])
+
+    store.store_many([c])
+
+    keys = [(module.path, module.digest) for module in (a, b, c)]
+    assert sorted(store.get_many(keys)) == ["pkg/a.py", "pkg/c.py"]
+    store.close()
+
+
+def test_project_endpoint_rejects_oversized_archive(client, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.PROJECT_MAX_MODULES", 2)
+    data = make_tarball({f"pkg/m{index}.py": "x = 1" for index in range(3)})
+
+    response = client.post(
+        f"{API_URL}/project",
+        content=data,
+        headers={"Content-Type": "application/gzip"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_project_endpoint_generates_each_module(client):
+    data = make_tarball(
+        {
+            "pkg/__init__.py": "",
+            "pkg/models.py": "class User:\n    pass\n",
+            "pkg/service.py": SERVICE,
+        }
+    )
+
+    response = client.post(
+        f"{API_URL}/project",
+        content=data,
+        headers={"Content-Type": "application/gzip"},
+    )
+
+    assert response.status_code == 200
+    assert "pkg.models.User" in response.text
+
+
+def test_iter_generate_ends_when_a_worker_fails(store, monkeypatch):
+    project_analyzer = ProjectAnalyzer(
+        worker_pool=WorkerPool("thread", 2, 8), index_store=store
+    )
+    sources = load_tarball(
+        make_tarball({f"pkg/m{index}.py": "x = 1" for index in range(4)})
+    )
+
+    async def broken_module(source, index, framework):
+        raise RuntimeError("falha fora do tratamento por módulo")
+
+    monkeypatch.setattr(project_analyzer, "generate_module", broken_module)
+
+    async def consume():
+        return [
+            item
+            async for item in project_analyzer.iter_generate(
+                sources, test_models.TestFramework.PYTEST
+            )
+        ]
+
+    async def scenario():
+        return await asyncio.wait_for(consume(), timeout=10)
+
+    with pytest.raises(RuntimeError, match="falha fora"):
+        asyncio.run(scenario())
+    project_analyzer.worker_pool.shutdown()
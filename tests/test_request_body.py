@@ -0,0 +1,143 @@
+import asyncio
+import gzip
+import json
+
+from app.core.config import settings
+from app.core.request_body import RequestBodyMiddleware
+
+from conftest import API_URL
+
+ORIGIN = {"Origin": "http://editor.local"}
+CODE = {"code": "def soma(a, b):\n    return a + b\n", "framework": "pytest"}
+
+
+def call_middleware(middleware, messages, headers=()):
+    """Executa o middleware com os blocos de corpo dados e devolve a resposta."""
+    received = {}
+    incoming = list(messages)
+
+    async def app(scope, receive, send):
+        message = await receive()
+        received["body"] = message["body"]
+        received["headers"] = dict(scope["headers"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return incoming.pop(0)
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/tests/analyze",
+        "headers": list(headers),
+    }
+    middleware.app = app
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"], received
+
+
+def chunks(*parts):
+    return [
+        {"type": "http.request", "body": part, "more_body": index < len(parts) - 1}
+        for index, part in enumerate(parts)
+    ]
+
+
+def test_streamed_body_over_limit_is_rejected_without_content_length():
+    middleware = RequestBodyMiddleware(None, default_limit=10)
+
+    status, received = call_middleware(middleware, chunks(b"12345", b"678901"))
+
+    assert status == 413
+    assert received == {}
+
+
+def test_gzip_body_is_decompressed_with_new_content_length():
+    middleware = RequestBodyMiddleware(None, default_limit=100)
+    body = gzip.compress(b"a" * 50)
+
+    status, received = call_middleware(
+        middleware,
+        chunks(body[:10], body[10:]),
+        headers=[(b"content-encoding", b"gzip")],
+    )
+
+    assert status == 200
+    assert received["body"] == b"a" * 50
+    assert received["headers"][b"content-length"] == b"50"
+    assert b"content-encoding" not in received["headers"]
+
+
+def test_limit_applies_to_decompressed_size():
+    middleware = RequestBodyMiddleware(None, default_limit=1000)
+    body = gzip.compress(b"\0" * 100_000)
+    assert len(body) < 1000
+
+    status, _ = call_middleware(
+        middleware, chunks(body), headers=[(b"content-encoding", b"gzip")]
+    )
+
+    assert status == 413
+
+
+def test_limits_by_path_suffix():
+    middleware = RequestBodyMiddleware(
+        None, default_limit=10, limits=[("/batch", 100), ("/project", 1000)]
+    )
+
+    assert middleware.limit_for("/api/v1/tests/analyze") == 10
+    assert middleware.limit_for("/api/v1/tests/analyze/batch") == 100
+    assert middleware.limit_for("/api/v1/tests/project") == 1000
+
+
+def test_gzip_request_through_the_api(client):
+    response = client.post(
+        f"{API_URL}/analyze",
+        content=gzip.compress(json.dumps(CODE).encode()),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["test_suite"]["test_cases"]
+
+
+def test_invalid_gzip_is_rejected(client):
+    response = client.post(
+        f"{API_URL}/analyze",
+        content=b"nao e gzip",
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_body_limit_errors_carry_cors_headers(client):
+    response = client.post(
+        f"{API_URL}/analyze",
+        content=b"x" * (settings.MAX_REQUEST_SIZE + 1),
+        headers={"Content-Type": "application/json", **ORIGIN},
+    )
+
+    assert response.status_code == 413
+    assert "access-control-allow-origin" in response.headers
+
+
+def test_unsupported_encoding_errors_carry_cors_headers(client):
+    response = client.post(
+        f"{API_URL}/analyze",
+        content=json.dumps(CODE).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "Content-Encoding": "br",
+            **ORIGIN,
+        },
+    )
+
+    assert response.status_code == 415
+    assert "access-control-allow-origin" in response.headers
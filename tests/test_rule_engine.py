@@ -0,0 +1,236 @@
+import ast
+import glob
+import os
+import sys
+
+import pytest
+
+from app.core.parsed_module import ParsedModule
+from app.services import test_validator
+
+# Módulos que exercitam cada regra, em código síncrono e assíncrono
+MODULES = {
+    "sincrono": '''
+import requests
+from unittest.mock import patch
+
+
+def test_busca():
+    """Busca um registro."""
+    with patch("requests.get") as get:
+        requests.get("http://exemplo")
+    assert get.called
+
+
+def ajuda():
+    def interna():
+        pass
+''',
+    "sem_docstring": """
+import os
+
+
+def test_caminho():
+    assert os.path.join("a", "b") == "a/b"
+""",
+    "estado_compartilhado": '''
+contador = 0
+
+
+class TestConta:
+    saldo.inicial = 0
+
+    def test_deposito(self):
+        """Deposita um valor."""
+        global contador
+        contador += 1
+        assert contador
+
+    class Interna:
+        total.valor = 1
+''',
+    "assincrono": '''
+import asyncio
+
+
+async def preparar():
+    def auxiliar():
+        """Documentada, mas aninhada em uma função async."""
+
+    return auxiliar
+
+
+async def test_consulta():
+    """Aguarda a consulta."""
+    assert await preparar()
+
+
+def test_sincrono():
+    async def interna():
+        global estado
+        assert True
+
+    import json
+
+    assert json.loads("1") == 1
+''',
+    "sem_testes": """
+async def somente_async():
+    await cliente.enviar()
+""",
+}
+
+
+class ReferenceVisitors:
+    """Regras como ``ast.NodeVisitor`` separados, uma travessia por regra.
+
+    Reproduz a implementação anterior ao ``RuleEngine``: o resultado de cada
+    regra depende apenas da ordem e dos nós que cada visitante percorre.
+    """
+
+    class MockUsage(ast.NodeVisitor):
+        def __init__(self):
+            self.has_mocks = False
+            self.has_external_calls = False
+
+        def visit_Call(self, node):
+            if isinstance(node.func, ast.Name) and node.func.id in [
+                "Mock",
+                "patch",
+                "MagicMock",
+            ]:
+                self.has_mocks = True
+            elif isinstance(node.func, ast.Attribute):
+                self.has_external_calls = True
+            self.generic_visit(node)
+
+    class SharedState(ast.NodeVisitor):
+        def __init__(self):
+            self.line = None
+            self.found = False
+
+        def visit_Global(self, node):
+            self.found = True
+            self.line = node.lineno
+
+        def visit_ClassDef(self, node):
+            for item in node.body:
+                if isinstance(item, ast.Assign) and not isinstance(
+                    item.targets[0], ast.Name
+                ):
+                    self.found = True
+                    self.line = item.lineno
+
+    class Naming(ast.NodeVisitor):
+        def __init__(self):
+            self.names = []
+
+        def visit_FunctionDef(self, node):
+            if not node.name.startswith("test_"):
+                self.names.append((node.name, node.lineno))
+
+    class Assertions(ast.NodeVisitor):
+        def __init__(self):
+            self.found = False
+
+        def visit_Assert(self, node):
+            self.found = True
+
+    class Documentation(ast.NodeVisitor):
+        def __init__(self):
+            self.found = False
+
+        def visit_FunctionDef(self, node):
+            if ast.get_docstring(node):
+                self.found = True
+
+    @classmethod
+    def issues(cls, tree):
+        """Tipos e linhas dos problemas, na ordem de isolamento e qualidade."""
+        visitors = {
+            name: visitor()
+            for name, visitor in (
+                ("mocks", cls.MockUsage),
+                ("shared", cls.SharedState),
+                ("naming", cls.Naming),
+                ("assertions", cls.Assertions),
+                ("docs", cls.Documentation),
+            )
+        }
+        for visitor in visitors.values():
+            visitor.visit(tree)
+
+        issues = []
+        if not visitors["mocks"].has_mocks and visitors["mocks"].has_external_calls:
+            issues.append(("no_mocks", None))
+        if visitors["shared"].found:
+            issues.append(("shared_state", visitors["shared"].line))
+        issues.extend(
+            ("naming_convention", line) for _, line in visitors["naming"].names
+        )
+        if not visitors["assertions"].found:
+            issues.append(("no_assertions", None))
+        if not visitors["docs"].found:
+            issues.append(("no_docstring", None))
+        return issues
+
+    @staticmethod
+    def first_test(tree):
+        """Primeiro teste na ordem de ``ast.walk``, com asserções e imports."""
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef) and node.name.startswith("test_"):
+                assertions = []
+                dependencies = []
+                for child in ast.walk(node):
+                    if isinstance(child, ast.Assert):
+                        assertions.append(ast.unparse(child))
+                    elif isinstance(child, ast.Import):
+                        dependencies.extend(name.name for name in child.names)
+                    elif isinstance(child, ast.ImportFrom):
+                        dependencies.append(child.module)
+                return node.name, assertions, dependencies
+        return None
+
+
+def engine_results(source):
+    isolation, quality, test_info, _ = test_validator.check_test_module(
+        ParsedModule.from_source(source),
+        test_validator.IsolationChecker(),
+        test_validator.QualityChecker(),
+    )
+    issues = [(issue.type, issue.line_number) for issue in isolation + quality]
+    if test_info is None:
+        return issues, None
+    return issues, (
+        test_info.name,
+        list(test_info.assertions),
+        list(test_info.dependencies),
+    )
+
+
+def reference_results(source):
+    tree = ast.parse(source)
+    return ReferenceVisitors.issues(tree), ReferenceVisitors.first_test(tree)
+
+
+@pytest.mark.parametrize("name", sorted(MODULES))
+def test_rule_engine_matches_reference_visitors(name):
+    assert engine_results(MODULES[name]) == reference_results(MODULES[name])
+
+
+def stdlib_modules():
+    directory = os.path.dirname(os.__file__)
+    paths = sorted(glob.glob(os.path.join(directory, "asyncio", "*.py")))
+    return paths + sorted(glob.glob(os.path.join(directory, "*.py")))[:20]
+
+
+@pytest.mark.skipif(not stdlib_modules(), reason="código da stdlib indisponível")
+def test_rule_engine_matches_reference_visitors_on_stdlib():
+    differences = []
+    for path in stdlib_modules():
+        with open(path, encoding="utf-8") as source_file:
+            source = source_file.read()
+        if engine_results(source) != reference_results(source):
+            differences.append(os.path.relpath(path, sys.prefix))
+
+    assert differences == []
@@ -0,0 +1,106 @@
+import pytest
+
+from app.core import mcp_context, session_store
+from app.core.session_store import SessionStore, approximate_size
+from app.models import test_data
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio controlado pelo teste no lugar de ``time.monotonic``."""
+
+    class Clock:
+        now = 1000.0
+
+        def __call__(self):
+            return self.now
+
+    fake = Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def contexts():
+    """Contextos de sessão criados sob demanda, um por nome."""
+    created = {}
+
+    def get(name):
+        return created.setdefault(name, mcp_context.TestContext())
+
+    return get
+
+
+def test_least_recently_used_session_is_evicted(clock, contexts):
+    store = SessionStore(max_sessions=2, idle_ttl_seconds=60)
+    store.set("a", contexts("a"))
+    store.set("b", contexts("b"))
+    assert store.get("a") is contexts("a")
+
+    store.set("c", contexts("c"))
+
+    assert store.get("b") is None
+    assert store.get("a") is contexts("a")
+    assert len(store) == 2
+    assert store.stats()["evictions"] == 1
+
+
+def test_idle_sessions_expire(clock, contexts):
+    store = SessionStore(max_sessions=10, idle_ttl_seconds=60)
+    store.set("a", contexts("a"))
+    store.set("b", contexts("b"))
+
+    clock.now += 30
+    assert store.get("a") is contexts("a")
+    clock.now += 45
+
+    # "b" passou do TTL; "a" foi renovada pelo acesso
+    assert store.get("b") is None
+    assert store.get("a") is contexts("a")
+    assert store.stats()["expirations"] == 1
+
+
+def test_set_purges_expired_sessions(clock, contexts):
+    store = SessionStore(max_sessions=10, idle_ttl_seconds=60)
+    store.set("a", contexts("a"))
+    clock.now += 61
+
+    store.set("b", contexts("b"))
+
+    assert len(store) == 1
+    assert store.stats()["expirations"] == 1
+
+
+def test_get_or_create_reuses_existing_context(clock):
+    store = SessionStore(max_sessions=10, idle_ttl_seconds=60)
+    first = store.get_or_create("a", list)
+
+    assert store.get_or_create("a", list) is first
+    assert "a" in store
+    store.discard("a")
+    assert "a" not in store
+
+
+def test_stats_report_approximate_memory(clock):
+    store = SessionStore(max_sessions=10, idle_ttl_seconds=60)
+    context = mcp_context.TestContext()
+    store.set("a", context)
+    empty = store.stats()["approximate_bytes"]
+
+    context.learn_pattern(
+        test_data.TestCaseData(
+            name="test_soma", description="x" * 10000, test_code="pass"
+        )
+    )
+
+    stats = store.stats()
+    assert stats["patterns"] == 1
+    assert stats["approximate_bytes"] >= empty + 10000
+
+
+def test_approximate_size_counts_shared_objects_once():
+    text = "x" * 1000
+    single = approximate_size([text])
+
+    assert approximate_size([text, text]) < single + 1000
+    assert approximate_size({"a": [text], "b": (1, 2)}) > 1000
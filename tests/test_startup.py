@@ -0,0 +1,60 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Folga sobre os orçamentos de ``--check``: a suíte roda com cobertura e
+# outros testes disputando a máquina
+BUDGET_SCALE = 2.0
+
+
+def load_startup_benchmark():
+    path = os.path.join(ROOT, "scripts", "startup_benchmark.py")
+    spec = importlib.util.spec_from_file_location("startup_benchmark", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+startup_benchmark = load_startup_benchmark()
+
+
+@pytest.mark.parametrize("name", ["api.import", "cli.import", "watch.import"])
+def test_entry_point_import_stays_within_budget(name):
+    result = startup_benchmark.benchmark_target(name, repeat=3, source="")
+
+    assert startup_benchmark.check_budgets([result], BUDGET_SCALE) == []
+
+
+def test_importing_main_creates_no_services():
+    code = """
+import json
+import main
+from app.api.endpoints import test_endpoints
+from app.core.worker_pool import batch_worker_pool, worker_pool
+
+print(json.dumps({
+    "services": sorted(vars(test_endpoints.services)),
+    "executors": [
+        pool._executor is not None for pool in (worker_pool, batch_worker_pool)
+    ],
+}))
+"""
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+
+    assert json.loads(completed.stdout.splitlines()[-1]) == {
+        "services": [],
+        "executors": [False, False],
+    }
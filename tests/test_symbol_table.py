@@ -0,0 +1,105 @@
+from collections import Counter
+
+from app.core.parsed_module import ParsedModule
+from app.services import test_analyzer
+
+SOURCE = '''
+import os
+
+
+class Conta:
+    """Conta bancária."""
+
+    def depositar(self, valor):
+        return os.path.join(str(valor))
+
+    if os.name == "nt":
+
+        def caminho(self):
+            return "C:"
+
+    async def sincronizar(self):
+        pass
+
+    class Historico:
+        def registrar(self, evento):
+            return evento
+
+
+def transferir(origem, destino):
+    def validar(conta):
+        return Conta
+
+    return validar(origem)
+
+
+async def notificar(conta):
+    return conta
+'''
+
+
+def symbol_table():
+    return ParsedModule.from_source(SOURCE).symbols
+
+
+def test_methods_are_attached_to_their_class():
+    symbols = symbol_table()
+    classes = {symbol.qualname: symbol for symbol in symbols.classes}
+
+    assert list(classes) == ["Conta", "Conta.Historico"]
+    assert [method.qualname for method in classes["Conta"].methods] == [
+        "Conta.depositar",
+        "Conta.caminho",
+        "Conta.sincronizar",
+    ]
+    assert [method.is_async for method in classes["Conta"].methods] == [
+        False,
+        False,
+        True,
+    ]
+    assert [method.name for method in classes["Conta.Historico"].methods] == [
+        "registrar"
+    ]
+
+
+def test_methods_and_local_functions_are_not_free_functions():
+    symbols = symbol_table()
+
+    assert [symbol.qualname for symbol in symbols.functions] == [
+        "transferir",
+        "notificar",
+    ]
+    local = [symbol for symbol in symbols if symbol.local]
+    assert [(symbol.qualname, symbol.kind) for symbol in local] == [
+        ("transferir.<locals>.validar", "function")
+    ]
+
+
+def test_referenced_names_include_nested_definitions():
+    symbols = symbol_table()
+    transferir = symbols.functions[0]
+
+    assert {"Conta", "validar", "origem"} <= transferir.names
+    assert "os" in symbols.classes[0].names
+
+
+def test_analyzer_does_not_generate_function_tests_for_methods():
+    analysis = test_analyzer.build_code_analysis(ParsedModule.from_source(SOURCE))
+    names = [test_case.name for test_case in analysis.test_suite.test_cases]
+
+    assert [name for name, count in Counter(names).items() if count > 1] == []
+    assert "test_depositar_basic_functionality" not in names
+    assert "test_validar_basic_functionality" not in names
+    assert "test_conta_depositar" in names
+    assert "test_transferir_basic_functionality" in names
+
+
+def test_ast_analyzer_extracts_only_sync_free_functions():
+    analyzer = test_analyzer.ASTAnalyzer()
+    module = ParsedModule.from_source(SOURCE)
+
+    assert [cls.name for cls in analyzer.extract_classes(module)] == [
+        "Conta",
+        "Historico",
+    ]
+    assert [func.name for func in analyzer.extract_functions(module)] == ["transferir"]
@@ -0,0 +1,200 @@
+import random
+
+import pytest
+
+from app.models import test_data, test_models
+from app.services import test_generator
+
+FRAMEWORKS = list(test_models.TestFramework)
+
+
+class ReferenceRenderer:
+    """Renderização anterior aos templates pré-compilados, por f-strings.
+
+    Serve de referência byte a byte para o ``TestTemplateEngine``.
+    """
+
+    def render(self, test_suite, framework):
+        if framework == test_models.TestFramework.PYTEST:
+            return self.render_pytest(test_suite)
+        return self.render_unittest(test_suite)
+
+    def render_pytest(self, test_suite):
+        imports = self.imports(test_suite.imports)
+        fixtures = "\n\n".join(test_suite.fixtures.values())
+        parts = [f"{imports}\n\n{fixtures}\n\n"]
+        for index, test_case in enumerate(test_suite.test_cases):
+            parts.append(
+                ("\n\n" if index else "")
+                + f'def {test_case.name}():\n    """{test_case.description}"""\n'
+                + f"{self.indent(test_case.test_code)}\n"
+            )
+        parts.append("\n")
+        return "".join(parts)
+
+    def render_unittest(self, test_suite):
+        imports = self.imports(list(test_suite.imports) + ["unittest"])
+        # As linhas só com espaços fazem parte da saída original
+        parts = [
+            f"{imports}\n\n"
+            f"class {test_suite.class_name}(unittest.TestCase):\n"
+            f'    """\n    {test_suite.description}\n    """\n'
+            "    \n"
+            "    def setUp(self):\n"
+            '        """Setup para cada teste."""\n'
+            "        pass\n"
+            "    \n"
+            "    def tearDown(self):\n"
+            '        """Cleanup após cada teste."""\n'
+            "        pass\n"
+            "    \n"
+        ]
+        for index, test_case in enumerate(test_suite.test_cases):
+            parts.append(
+                ("\n" if index else "")
+                + f"    def {test_case.name}(self):\n"
+                + f'        """{test_case.description}"""\n'
+                + f"{self.indent(self.indent(test_case.test_code))}\n"
+            )
+        parts.append("\n")
+        return "".join(parts)
+
+    def imports(self, imports):
+        standard, third_party, local = [], [], []
+        for name in sorted(set(imports)):
+            if "." not in name:
+                if name in ["os", "sys", "typing"]:
+                    standard.append(f"import {name}")
+                else:
+                    third_party.append(f"import {name}")
+            else:
+                local.append(f"from {name}")
+
+        result = ""
+        if standard:
+            result += "\n".join(standard) + "\n"
+        if third_party:
+            if standard:
+                result += "\n"
+            result += "\n".join(third_party) + "\n"
+        if local:
+            if standard or third_party:
+                result += "\n"
+            result += "\n".join(local)
+        return result
+
+    def indent(self, code, level=1):
+        return "\n".join(f"{'    ' * level}{line}" for line in code.strip().split("\n"))
+
+
+FIXTURE = """
+        @pytest.fixture
+        def mock_repositorio():
+            with patch("pkg.service.Repositorio") as mock:
+                yield mock
+        """
+
+
+def make_suite(test_cases, imports=("pytest",), fixtures=None):
+    return test_data.TestSuiteData(
+        class_name="TestModulo",
+        description="Testes do módulo",
+        test_cases=list(test_cases),
+        imports=list(imports),
+        fixtures=dict(fixtures or {}),
+    )
+
+
+def make_case(name, test_code="assert True", description=None):
+    return test_data.TestCaseData(
+        name=name, description=description or f"Testa {name}", test_code=test_code
+    )
+
+
+def random_suite(generator, size):
+    statements = [
+        "assert resultado == 1",
+        "resultado = funcao(1)",
+        "with pytest.raises(ValueError):\n    funcao(None)",
+        "    # comentário com indentação\n",
+        "mock.return_value = {'chave': [1, 2]}",
+        "",
+    ]
+    test_cases = [
+        make_case(
+            f"test_caso_{index}",
+            "\n".join(generator.sample(statements, generator.randrange(1, 4))),
+        )
+        for index in range(size)
+    ]
+    imports = generator.sample(
+        ["pytest", "os", "sys", "unittest.mock import patch", "pkg.modelo import A"],
+        generator.randrange(0, 5),
+    )
+    fixtures = {
+        f"mock_{index}": FIXTURE.replace("repositorio", f"dependencia_{index}")
+        for index in range(generator.randrange(0, 3))
+    }
+    return make_suite(test_cases, imports, fixtures)
+
+
+SUITES = {
+    "vazia": make_suite([]),
+    "com_fixtures_e_imports": make_suite(
+        [
+            make_case("test_soma", "resultado = soma(1, 2)\nassert resultado == 3"),
+            make_case("test_erro", "with pytest.raises(TypeError):\n    soma(None)"),
+        ],
+        imports=[
+            "pytest",
+            "os",
+            "typing",
+            "unittest.mock import patch",
+            "pkg.a import B",
+        ],
+        fixtures={"mock_repositorio": FIXTURE},
+    ),
+    "codigo_com_espacos": make_suite(
+        [make_case("test_espacos", "\n\n    x = 1\n    assert x\n\n")]
+    ),
+}
+
+
+@pytest.fixture
+def engine():
+    return test_generator.TestTemplateEngine()
+
+
+@pytest.mark.parametrize("framework", FRAMEWORKS)
+@pytest.mark.parametrize("name", sorted(SUITES))
+def test_render_matches_reference(engine, framework, name):
+    suite = SUITES[name]
+
+    assert engine.render_test_suite(suite, framework) == ReferenceRenderer().render(
+        suite, framework
+    )
+
+
+@pytest.mark.parametrize("framework", FRAMEWORKS)
+def test_render_matches_reference_on_random_suites(engine, framework):
+    generator = random.Random(13)
+    for _ in range(50):
+        suite = random_suite(generator, generator.randrange(0, 12))
+
+        expected = ReferenceRenderer().render(suite, framework)
+        assert engine.render_test_suite(suite, framework) == expected
+
+
+@pytest.mark.parametrize("framework", FRAMEWORKS)
+def test_parts_rendered_in_chunks_join_to_the_reference(engine, framework):
+    suite = random_suite(random.Random(5), 10)
+    cases = suite.test_cases
+
+    parts = []
+    for start in range(0, len(cases), 3):
+        chunk = suite.with_test_cases(cases[start : start + 3])
+        parts.extend(
+            engine.render_parts(chunk, framework, start == 0, start + 3 >= len(cases))
+        )
+
+    assert "".join(parts) == ReferenceRenderer().render(suite, framework)
@@ -0,0 +1,44 @@
+import os
+import stat
+
+import pytest
+
+from app.core.test_files import mirrored_test_path, write_text_atomic
+
+
+@pytest.fixture
+def umask():
+    """Fixa a umask do processo durante o teste."""
+    previous = os.umask(0o027)
+    yield 0o027
+    os.umask(previous)
+
+
+def file_mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_respects_the_current_umask(tmp_path, umask):
+    path = tmp_path / "tests" / "test_modulo.py"
+
+    assert write_text_atomic(str(path), "assert True\n")
+
+    assert file_mode(path) == 0o666 & ~umask
+    assert path.read_text() == "assert True\n"
+
+
+def test_rewrite_keeps_the_existing_mode(tmp_path, umask):
+    path = tmp_path / "test_modulo.py"
+    path.write_text("antigo\n")
+    os.chmod(path, 0o600)
+
+    assert write_text_atomic(str(path), "novo\n")
+
+    assert file_mode(path) == 0o600
+    assert path.read_text() == "novo\n"
+    assert sorted(os.listdir(tmp_path)) == ["test_modulo.py"]
+
+
+def test_mirrored_test_path():
+    assert mirrored_test_path("pkg/models.py") == "pkg/test_models.py"
+    assert mirrored_test_path("models.py") == "test_models.py"
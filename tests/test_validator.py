@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.core import mcp_context
+from app.core.memory_backend import MemoryBackend
+from app.core.parsed_module import ParsedModule
+from app.core.worker_pool import WorkerPool
+from app.models import test_data
+from app.services import test_validator
+
+TEST_CODE = '''
+def test_soma():
+    """Soma dois números."""
+    assert 1 + 1 == 2
+'''
+
+
+@pytest.fixture
+def process_pool():
+    pool = WorkerPool("process", 1, 4)
+    yield pool
+    pool.shutdown()
+
+
+def test_suggestions_reuse_profiles_computed_in_the_worker(process_pool):
+    context = mcp_context.MCPContext(memory_backend=MemoryBackend())
+    validator = test_validator.TestValidator(
+        worker_pool=process_pool, mcp_context=context
+    )
+    module = ParsedModule.from_source(TEST_CODE, lazy=True)
+
+    async def scenario():
+        await context.open_session("sessao")
+        await context.learn_from_test_cases(
+            "sessao",
+            [
+                test_data.TestCaseData(
+                    name="test_a", description="a soma", test_code="assert True"
+                )
+            ],
+        )
+        result = await validator.validate_test(module, session_id="sessao")
+        suggestions = await context.get_test_suggestions("sessao", module)
+        return result, suggestions
+
+    result, suggestions = asyncio.run(scenario())
+
+    assert result.is_valid
+    assert len(suggestions) == 1
+    # O parse aconteceu apenas no processo do worker
+    assert module._tree is None
@@ -0,0 +1,80 @@
+import asyncio
+import os
+
+import pytest
+
+from app.core.analysis_cache import AnalysisCache
+from app.core.worker_pool import WorkerPool
+from app.models import test_models
+from app.services import test_generator, test_watcher
+
+SOURCE = "def soma(a, b):\n    return a + b\n"
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    source_root = tmp_path / "src"
+    (source_root / "pkg").mkdir(parents=True)
+    (source_root / "pkg" / "calculo.py").write_text(SOURCE)
+    generator = test_generator.TestGenerator(
+        cache=AnalysisCache(max_entries=16, ttl_seconds=60),
+        worker_pool=WorkerPool("inline", 1, 8),
+    )
+    return test_watcher.TestWatcher(
+        str(source_root),
+        str(source_root / "tests"),
+        test_models.TestFramework.PYTEST,
+        generator,
+    )
+
+
+def set_mtime(path, seconds_ago):
+    mtime = os.stat(path).st_mtime - seconds_ago
+    os.utime(path, (mtime, mtime))
+
+
+def test_modules_without_generated_test_are_stale(watcher):
+    assert watcher.stale_paths(watcher.scan()) == {"pkg/calculo.py"}
+
+
+def test_generated_module_is_no_longer_stale(watcher):
+    asyncio.run(watcher.process(["pkg/calculo.py"], ()))
+
+    assert watcher.generated == 1
+    with open(watcher.output_path("pkg/calculo.py")) as output:
+        assert "def test_soma" in output.read()
+    assert watcher.stale_paths(watcher.scan()) == set()
+
+
+def test_touched_module_with_same_tests_stops_being_stale(watcher):
+    asyncio.run(watcher.process(["pkg/calculo.py"], ()))
+    output_path = watcher.output_path("pkg/calculo.py")
+    # O módulo é salvo de novo sem mudanças depois da geração
+    set_mtime(output_path, 60)
+    assert watcher.stale_paths(watcher.scan()) == {"pkg/calculo.py"}
+
+    asyncio.run(watcher.process(["pkg/calculo.py"], ()))
+
+    assert watcher.unchanged == 1
+    assert watcher.stale_paths(watcher.scan()) == set()
+
+
+def test_removed_module_deletes_its_generated_test(watcher):
+    asyncio.run(watcher.process(["pkg/calculo.py"], ()))
+
+    asyncio.run(watcher.process((), ["pkg/calculo.py"]))
+
+    assert watcher.removed == 1
+    assert not os.path.exists(watcher.output_path("pkg/calculo.py"))
+
+
+def test_invalid_module_keeps_the_previous_test(watcher):
+    asyncio.run(watcher.process(["pkg/calculo.py"], ()))
+    with open(os.path.join(watcher.source_root, "pkg", "calculo.py"), "w") as source:
+        source.write("def soma(a, b:\n")
+
+    asyncio.run(watcher.process(["pkg/calculo.py"], ()))
+
+    assert watcher.errors == 1
+    with open(watcher.output_path("pkg/calculo.py")) as output:
+        assert "def test_soma" in output.read()
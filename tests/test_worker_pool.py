@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import mcp_context
+from app.core.analysis_cache import AnalysisCache
+from app.core.memory_backend import MemoryBackend
+from app.core.worker_pool import WorkerPool, WorkerPoolBusyError, worker_pool
+from app.models import test_models
+from app.services import test_analyzer, test_generator, test_validator
+
+from conftest import API_URL
+
+SOURCE = '''
+class Conta:
+    """Conta bancária."""
+
+    def __init__(self, saldo=0):
+        self.saldo = saldo
+
+    def depositar(self, valor):
+        if valor <= 0:
+            raise ValueError("valor inválido")
+        self.saldo += valor
+        return self.saldo
+
+
+async def buscar(cliente, conta_id):
+    return await cliente.get(conta_id)
+'''
+
+TEST_CODE = '''
+from unittest.mock import patch
+
+
+def test_depositar():
+    """Deposita um valor."""
+    with patch("banco.Conta") as conta:
+        conta.depositar(10)
+    assert conta.depositar.called
+
+
+def auxiliar():
+    pass
+'''
+
+# Cada endpoint recebe um código próprio, que não está no cache de análises
+BUSY_REQUESTS = [
+    ("/analyze", {"code": "def ocupado_analise(x):\n    return x\n"}),
+    ("/generate", {"code": "def ocupado_geracao(x):\n    return x\n"}),
+    ("/validate", {"test_code": "def test_ocupado():\n    assert True\n"}),
+]
+
+
+def test_run_rejects_tasks_over_max_pending():
+    pool = WorkerPool("thread", 1, 1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(WorkerPoolBusyError):
+            await pool.run(sum, [1, 2])
+        release.set()
+        await first
+
+    asyncio.run(scenario())
+
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["pending"] == 0
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("path,body", BUSY_REQUESTS)
+def test_busy_pool_returns_503(client, monkeypatch, path, body):
+    monkeypatch.setattr(worker_pool, "max_pending", 0)
+    rejected = worker_pool.rejected
+
+    response = client.post(f"{API_URL}{path}", json=body)
+
+    assert response.status_code == 503
+    assert worker_pool.rejected == rejected + 1
+
+
+def run_services(mode):
+    """Analisa, gera e valida os mesmos códigos com um pool no modo dado."""
+    pool = WorkerPool(mode, 2, 16)
+    context = mcp_context.MCPContext(memory_backend=MemoryBackend())
+    framework = test_models.TestFramework.PYTEST
+    analyzer = test_analyzer.TestAnalyzer(
+        cache=AnalysisCache(max_entries=16, ttl_seconds=60),
+        worker_pool=pool,
+        mcp_context=context,
+    )
+    generator = test_generator.TestGenerator(
+        cache=AnalysisCache(max_entries=16, ttl_seconds=60), worker_pool=pool
+    )
+    validator = test_validator.TestValidator(worker_pool=pool, mcp_context=context)
+
+    async def scenario():
+        analysis = await analyzer.analyze(SOURCE, framework)
+        test_code = await generator.generate_test_suite(SOURCE, framework)
+        validation = await validator.validate_test(TEST_CODE)
+        file_validation = await validator.validate_test_file(TEST_CODE)
+        return (
+            [case.name for case in analysis.test_suite.test_cases],
+            [metrics.model_dump() for metrics in analysis.function_metrics],
+            test_code,
+            validation.model_dump(),
+            file_validation.model_dump(),
+        )
+
+    try:
+        return asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+
+def test_pool_modes_produce_the_same_results():
+    inline = run_services("inline")
+
+    assert run_services("thread") == inline
+    assert run_services("process") == inline
@@ -0,0 +1,88 @@
+"""Observa uma árvore de código e mantém os testes gerados atualizados.
+
+    python watch.py src/ --output tests/generated
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.core.worker_pool import WORKER_POOL_MODES, WorkerPool
+from app.models.test_models import TestFramework
+from app.services.test_generator import TestGenerator
+from app.services.test_watcher import TestWatcher
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Regenera os testes dos arquivos alterados de uma árvore de código."
+    )
+    parser.add_argument("source", help="diretório do código observado")
+    parser.add_argument(
+        "--output", required=True, help="diretório dos testes gerados (espelhado)"
+    )
+    parser.add_argument(
+        "--framework",
+        type=TestFramework,
+        choices=list(TestFramework),
+        default=TestFramework(settings.DEFAULT_TEST_TEMPLATE),
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=settings.WATCH_POLL_INTERVAL_SECONDS
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=settings.WATCH_DEBOUNCE_SECONDS
+    )
+    parser.add_argument("--mode", choices=WORKER_POOL_MODES, default="process")
+    parser.add_argument("--workers", type=int, default=0, help="0 usa o número de CPUs")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args()
+
+
+async def watch(args: argparse.Namespace) -> None:
+    """Executa o observador até receber SIGINT ou SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C interrompe o loop com KeyboardInterrupt
+            pass
+
+    pool = WorkerPool(mode=args.mode, max_workers=args.workers, max_pending=1 << 20)
+    watcher = TestWatcher(
+        args.source,
+        args.output,
+        args.framework,
+        TestGenerator(worker_pool=pool),
+        poll_interval=args.poll_interval,
+        debounce=args.debounce,
+    )
+    logging.info("Observando %s (testes em %s)", args.source, args.output)
+    try:
+        await watcher.run(stop)
+    finally:
+        pool.shutdown()
+        logging.info(
+            "%d teste(s) gerado(s), %d sem mudança, %d removido(s), %d erro(s)",
+            watcher.generated,
+            watcher.unchanged,
+            watcher.removed,
+            watcher.errors,
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    asyncio.run(watch(args))
+
+
+if __name__ == "__main__":
+    main()